@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import axios from 'axios';
+import { postStream } from '../utils/stream';
 
 const API_BASE_URL = 'http://localhost:8080';
 
@@ -68,23 +69,21 @@ const ContentPage = () => {
     setFeedback('');
     
     try {
-      const response = await axios.post(`${API_BASE_URL}/api/content/create`, {
+      // Show the text as it is generated
+      setGeneratedContent('');
+      setShowPreview(true);
+      const result = await postStream(`${API_BASE_URL}/api/content/create`, {
         topic,
         content_type: contentType,
         tone,
         word_count: parseInt(wordCount),
         include_hashtags: hashtags
-      });
+      }, (token) => setGeneratedContent((text) => text + token));
       
-      if (response.data.success) {
-        setGeneratedContent(response.data.content);
-        setShowPreview(true);
-      } else {
-        setError(response.data.message || 'Failed to generate content');
-      }
+      setGeneratedContent(result.content);
     } catch (error) {
       console.error('Error generating content:', error);
-      setError('Error connecting to the server: ' + (error.response?.data?.message || error.message));
+      setError('Error generating content: ' + error.message);
     } finally {
       setIsLoading(false);
     }
@@ -50,7 +50,7 @@ const EngagementPage = () => {
       const response = await axios.post(`${API_BASE_URL}/api/engagement/interact`, apiData);
       
       if (response.data.success) {
-        setResponse(response.data.response);
+        setResponse(response.data.deferred ? response.data.message : response.data.response);
         // Refresh the recent interactions list
         fetchRecentInteractions();
       } else {
@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import axios from 'axios';
+import { postStream } from '../utils/stream';
 
 const API_BASE_URL = 'http://localhost:8080';
 
@@ -196,15 +197,13 @@ const PersonalityPage = () => {
     setError(null);
     
     try {
-      const response = await axios.post(`${API_BASE_URL}/api/personality/generate`, {
+      // Show the response as it is generated
+      setResponse('');
+      const result = await postStream(`${API_BASE_URL}/api/personality/generate`, {
         prompt: prompt
-      });
+      }, (token) => setResponse((text) => text + token));
       
-      if (response.data.success) {
-        setResponse(response.data.response);
-      } else {
-        setError(response.data.message || 'Failed to generate response');
-      }
+      setResponse(result.response);
     } catch (error) {
       console.error('Error generating response:', error);
       setError('Error connecting to the server');
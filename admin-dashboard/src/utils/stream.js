@@ -0,0 +1,43 @@
+// Read a Server-Sent Events response from a POST endpoint that supports
+// "stream": true. onToken is called with each chunk of generated text;
+// resolves with the payload of the final "done" event.
+export const postStream = async (url, body, onToken, signal) => {
+  const response = await fetch(url, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ ...body, stream: true }),
+    signal
+  });
+  if (!response.ok || !response.body) {
+    throw new Error(`Request failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = 'message';
+      let data = '';
+      block.split('\n').forEach((line) => {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        if (line.startsWith('data: ')) data += line.slice(6);
+      });
+      const payload = data ? JSON.parse(data) : {};
+
+      if (event === 'token') onToken(payload.text);
+      if (event === 'error') throw new Error(payload.message || 'Generation failed');
+      if (event === 'done') return payload;
+    }
+  }
+  throw new Error('Stream ended unexpectedly');
+};
@@ -0,0 +1,73 @@
+# benchmarks/bench_logging.py
+"""Measure what logging costs the request path, per call, on the calling thread.
+
+Usage: python -m benchmarks.bench_logging [--calls 20000]
+
+Logs a personality-update sized payload the way main.py used to
+(f-string at INFO, written synchronously by a FileHandler as
+basicConfig set up) and through the queue pipeline from
+setup_logging: eager f-strings at INFO, lazy %s arguments at INFO,
+and lazy arguments at DEBUG, which the INFO level filters out before
+anything is formatted.
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Callable, Dict
+from src.utils.config import load_config
+from src.utils.logging_setup import TEXT_FORMAT, setup_logging, stop_logging
+
+def time_calls(log: Callable[[int], None], calls: int, rounds: int) -> float:
+    """Microseconds per call, best of rounds"""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for n in range(calls):
+            log(n)
+        best = min(best, (time.perf_counter() - start) / calls)
+    return best * 1e6
+
+def scenarios(logger: logging.Logger, payload: Dict) -> Dict[str, Callable[[int], None]]:
+    return {
+        "f-string INFO": lambda n: logger.info(f"Updating personality with: {payload}"),
+        "lazy INFO": lambda n: logger.info("Updating personality with: %s", payload),
+        "lazy DEBUG": lambda n: logger.debug("Updating personality with: %s", payload),
+        "sections INFO": lambda n: logger.info("Updating personality sections: %s", ", ".join(payload)),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000, help="log calls per scenario")
+    parser.add_argument("--rounds", type=int, default=3, help="timed rounds per scenario; the best is reported")
+    args = parser.parse_args()
+
+    payload = load_config()["personality"]
+    logger = logging.getLogger("bench.logging")
+    logger.propagate = False
+    print(f"Logging a {len(json.dumps(payload))}-byte payload {args.calls} times per scenario\n")
+    print(f"{'pipeline':<12}{'call':<16}{'us/call':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        handler = logging.FileHandler(os.path.join(tmp, "sync.log"), encoding="utf-8")
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        for name, log in scenarios(logger, payload).items():
+            print(f"{'sync file':<12}{name:<16}{time_calls(log, args.calls, args.rounds):>10.2f}")
+        logger.removeHandler(handler)
+        handler.close()
+
+        # A queue big enough that no record is dropped, so every call does the full handoff
+        setup_logging(
+            {"path": os.path.join(tmp, "queued.log"), "console": False, "queue_size": args.calls * args.rounds + 1},
+            logger=logger
+        )
+        for name, log in scenarios(logger, payload).items():
+            print(f"{'queue':<12}{name:<16}{time_calls(log, args.calls, args.rounds):>10.2f}")
+        stop_logging()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+# benchmarks/bench_request_path.py
+"""Drive the API end to end against a fake LLM and compare with a saved baseline.
+
+Usage: python -m benchmarks.bench_request_path [--requests 500] [--concurrency 32] [--save-baseline]
+
+Builds the app from main.py with the shared components swapped for
+in-process ones (a seeded fake chat model, mongomock, in-memory job
+queue and dedup stores, a Fansly client that only counts sends) and
+sends requests through an ASGI client:
+
+  engagement.interact  POST /api/engagement/interact, replaying data/interaction_log.jsonl
+  content.create       POST /api/content/create
+  fansly.webhook       POST /webhook/fansly, timed until the job queue has answered every event
+
+For each scenario it reports req/s, p50/p95/p99 latency and resident
+memory. Results are compared with baselines/request_path.json: a
+throughput drop or p95 rise beyond --tolerance exits with status 1.
+Baselines only compare on the same machine and settings; when the
+baseline is missing or was recorded with other settings the comparison
+is skipped, which exits with status 2 under --require-baseline.
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import importlib
+import itertools
+import json
+import math
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import httpx
+import mongomock
+from tests.fake_llm import FakeChatModel
+from src.api.webhook_signing import WebhookVerifier
+from src.core import registry
+from src.core.conversation_memory import ConversationMemoryStore
+from src.core.personality import PersonalityEngine
+from src.utils.database import AsyncDatabaseManager, DatabaseManager
+from src.utils.idempotency import IdempotencyStore
+from src.utils.job_queue import JobQueue
+from src.utils.logging_setup import setup_logging
+from src.utils.rate_limiter import RateLimiter
+from src.utils.scheduler import Scheduler
+
+SECRET = "bench-secret-0123456789abcdef"
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "request_path.json")
+# Settings that must match for a baseline to be comparable
+COMPARED_SETTINGS = ("requests", "concurrency", "latency", "distribution", "spread", "tokens_per_second", "seed")
+
+# (method, url, httpx request kwargs)
+Request = Tuple[str, str, Dict[str, Any]]
+
+class CountingFanslyClient:
+    """Answers like FanslyClient without leaving the process"""
+
+    def __init__(self):
+        self.sent = 0
+
+    async def _send(self, kind: str) -> Dict:
+        self.sent += 1
+        return {"status": "success", f"{kind}_id": f"{kind}-{self.sent}", "sent_at": datetime.now().isoformat()}
+
+    async def send_dm(self, user_id: str, message: str) -> Dict:
+        return await self._send("message")
+
+    async def reply_to_comment(self, post_id: str, comment: str, message: str) -> Dict:
+        return await self._send("comment")
+
+    async def post_content(self, content: Dict) -> Dict:
+        return await self._send("post")
+
+    async def close(self) -> None:
+        pass
+
+    def stats(self) -> Dict:
+        return {"sent": self.sent}
+
+def load_interactions() -> List[Dict]:
+    with open(os.path.join(DATA_DIR, "interaction_log.jsonl"), encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def rss_mb() -> float:
+    """Current resident set size, or the peak where /proc isn't available"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+def install_fakes(args: argparse.Namespace) -> FakeChatModel:
+    """Register in-process stand-ins for everything main.py would connect to"""
+    registry.reset()
+    llm = FakeChatModel(
+        latency=args.latency,
+        latency_distribution=args.distribution,
+        latency_spread=args.spread,
+        tokens_per_second=args.tokens_per_second,
+        seed=args.seed
+    )
+    database = AsyncDatabaseManager(manager=DatabaseManager(client=mongomock.MongoClient()))
+    job_queue = JobQueue(poll_interval=0.01)
+    registry.register("database", database)
+    registry.register(
+        "personality_engine", PersonalityEngine(llm=llm, memory_store=ConversationMemoryStore(database=database))
+    )
+    # No quotas: the benchmark measures the request path, not the limits
+    registry.register("rate_limiter", RateLimiter())
+    registry.register("job_queue", job_queue)
+    registry.register("scheduler", Scheduler(job_queue))
+    registry.register("webhook_dedup", IdempotencyStore())
+    registry.register("webhook_verifier", WebhookVerifier([SECRET]))
+    registry.register("fansly_client", CountingFanslyClient())
+    return llm
+
+def interaction_request(interactions: List[Dict]) -> Callable[[int], Request]:
+    def make(n: int) -> Request:
+        return "POST", "/api/engagement/interact", {"json": interactions[n % len(interactions)]}
+    return make
+
+def content_request(n: int) -> Request:
+    topics = ("weekend plans", "game day", "morning coffee", "road trip")
+    return "POST", "/api/content/create", {"json": {"content_type": "post", "topic": topics[n % len(topics)]}}
+
+def webhook_request(n: int) -> Request:
+    body = json.dumps({
+        "type": "message",
+        "event_id": f"bench-evt-{n}",
+        "user_id": f"fan-{n % 100}",
+        "message": "hey! loved your last post, what are you up to this weekend?"
+    }).encode()
+    signature = hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+    return "POST", "/webhook/fansly", {"content": body, "headers": {"X-Fansly-Signature": signature}}
+
+async def drive(
+    client: httpx.AsyncClient,
+    make_request: Callable[[int], Request],
+    first: int,
+    requests: int,
+    concurrency: int
+) -> Tuple[List[float], int]:
+    """Send requests numbered first.. from concurrency workers; returns latencies and errors"""
+    numbers = iter(range(first, first + requests))
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        for n in numbers:
+            method, url, kwargs = make_request(n)
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors
+
+async def wait_for_jobs(job_queue: JobQueue, finished: int, timeout: float = 300.0) -> None:
+    """Wait until finished jobs have completed or failed in total"""
+    deadline = time.monotonic() + timeout
+    while job_queue.completed + job_queue.failed < finished:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"job queue finished {job_queue.completed + job_queue.failed} of {finished} jobs")
+        await asyncio.sleep(0.005)
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    make_request: Callable[[int], Request],
+    args: argparse.Namespace,
+    counter: Any
+) -> Dict:
+    job_queue = registry.get_job_queue()
+    # Warm up caches and code paths before timing
+    warmup = min(args.warmup, args.requests)
+    jobs_before = job_queue.completed + job_queue.failed
+    await drive(client, make_request, next(counter), warmup, args.concurrency)
+    if name == "fansly.webhook":
+        await wait_for_jobs(job_queue, jobs_before + warmup)
+
+    jobs_before = job_queue.completed + job_queue.failed
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    latencies, errors = await drive(client, make_request, next(counter), args.requests, args.concurrency)
+    if name == "fansly.webhook":
+        # A webhook isn't done when it is acknowledged, but when it is answered
+        await wait_for_jobs(job_queue, jobs_before + args.requests)
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "req_per_s": round(args.requests / wall, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "errors": errors,
+        "rss_mb": round(rss_mb(), 1),
+        "rss_growth_mb": round(rss_mb() - rss_before, 1)
+    }
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict]:
+    with tempfile.TemporaryDirectory(prefix="bench-request-path-") as work_dir:
+        install_fakes(args)
+        main = importlib.import_module("main")
+        # main.py set up the app log; keep the benchmark's records out of it and off the console
+        setup_logging({"path": os.path.join(work_dir, "bench.log"), "console": False})
+
+        await main.startup()
+        scenarios = {
+            "engagement.interact": interaction_request(load_interactions()),
+            "content.create": content_request,
+            "fansly.webhook": webhook_request,
+        }
+        # Each batch of requests gets fresh numbers, so webhook event ids never repeat
+        counter = itertools.count(0, args.requests + args.warmup)
+        results = {}
+        try:
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                for name in args.scenarios or scenarios:
+                    results[name] = await run_scenario(client, name, scenarios[name], args, counter)
+        finally:
+            # Also stops the log pipeline, closing bench.log before the directory goes
+            await main.shutdown()
+            registry.reset()
+    return results
+
+def settings(args: argparse.Namespace) -> Dict:
+    return {name: getattr(args, name) for name in COMPARED_SETTINGS}
+
+def compare(results: Dict[str, Dict], baseline: Dict, args: argparse.Namespace) -> Optional[List[str]]:
+    """Regressions against the baseline, as messages, or None if the baseline isn't comparable"""
+    if baseline.get("settings") != settings(args):
+        return None
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        if result["req_per_s"] < before["req_per_s"] * (1 - args.tolerance):
+            regressions.append(f"{name}: {result['req_per_s']:,.1f} req/s, baseline {before['req_per_s']:,.1f}")
+        if result["p95_ms"] > before["p95_ms"] * (1 + args.tolerance):
+            regressions.append(f"{name}: p95 {result['p95_ms']:.1f} ms, baseline {before['p95_ms']:.1f}")
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500, help="timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=50, help="untimed requests before each scenario")
+    parser.add_argument("--concurrency", type=int, default=32, help="requests in flight at once")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake LLM time to first token in seconds")
+    parser.add_argument("--distribution", choices=("constant", "uniform", "lognormal"), default="lognormal",
+                        help="fake LLM latency distribution")
+    parser.add_argument("--spread", type=float, default=0.5,
+                        help="uniform: +/- fraction of --latency; lognormal: sigma")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="fake LLM completion rate")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the fake LLM latencies")
+    parser.add_argument("--scenarios", nargs="*", help="run only these scenarios")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline file to compare with or save to")
+    parser.add_argument("--save-baseline", action="store_true", help="save this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed fractional drop in req/s or rise in p95 before failing")
+    parser.add_argument("--require-baseline", action="store_true",
+                        help="fail (status 2) instead of skipping when there is no comparable baseline")
+    args = parser.parse_args()
+
+    print(
+        f"{args.requests} requests per scenario, {args.concurrency} in flight, fake LLM "
+        f"{args.distribution} {args.latency * 1000:.0f} ms to first token at {args.tokens_per_second:.0f} tokens/s\n"
+    )
+    results = asyncio.run(run(args))
+
+    print(f"{'scenario':<22}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}{'RSS MB':>9}{'growth':>8}")
+    for name, result in results.items():
+        print(
+            f"{name:<22}{result['req_per_s']:>9,.1f}{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}"
+            f"{result['p99_ms']:>9.1f}{result['errors']:>8}{result['rss_mb']:>9.1f}{result['rss_growth_mb']:>8.1f}"
+        )
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "settings": settings(args),
+                "environment": {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "cpus": os.cpu_count()
+                },
+                "recorded_at": datetime.now().isoformat(timespec="seconds"),
+                "results": results
+            }, f, indent=2)
+            f.write("\n")
+        print(f"\nSaved baseline to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one")
+        sys.exit(2 if args.require_baseline else 0)
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args)
+    if regressions is None:
+        print(f"\nBaseline settings {baseline.get('settings')} differ from this run; comparison skipped")
+        sys.exit(2 if args.require_baseline else 0)
+    if regressions:
+        print("\nRegressions against the baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print(f"\nWithin {args.tolerance:.0%} of the baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/bench_response_cache.py
+"""Replay a recorded interaction log with and without the response cache.
+
+Usage: python -m benchmarks.bench_response_cache [--latency 0.05]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import Dict, List, Optional
+from tests.fake_llm import FakeChatModel
+from src.core.engagement import EngagementSystem
+from src.core.personality import PersonalityEngine
+from src.core.response_cache import ResponseCache
+from src.utils.rate_limiter import RateLimiter
+
+LOG_PATH = os.path.join(os.path.dirname(__file__), "data", "interaction_log.jsonl")
+
+def load_log(path: str = LOG_PATH) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+async def replay(log: List[Dict], cache: Optional[ResponseCache], latency: float) -> Dict:
+    llm = FakeChatModel(latency=latency)
+    engine = PersonalityEngine(llm=llm, response_cache=cache)
+    # ResponseCache.from_config may have enabled a cache; honour the scenario
+    engine.response_cache = cache
+    # No quotas, so every interaction in the log is answered
+    engagement = EngagementSystem(personality=engine, rate_limiter=RateLimiter())
+
+    latencies = []
+    start = time.perf_counter()
+    for interaction in log:
+        t0 = time.perf_counter()
+        await engagement.process_interaction(interaction)
+        latencies.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "llm_calls": llm.calls,
+        "tokens": llm.prompt_tokens + llm.completion_tokens,
+        "cost_usd": llm.estimated_cost,
+        "wall_s": wall,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "hit_rate": cache.stats()["hit_rate"] if cache else 0.0
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.05, help="fake LLM latency in seconds")
+    parser.add_argument("--similarity", type=float, default=0.8, help="similarity threshold for the n-gram tier")
+    args = parser.parse_args()
+
+    log = load_log()
+    scenarios = {
+        "no cache": None,
+        "exact cache": ResponseCache(),
+        "exact + n-gram": ResponseCache(similarity_threshold=args.similarity),
+    }
+
+    print(f"Replaying {len(log)} interactions (fake LLM latency {args.latency * 1000:.0f} ms)\n")
+    print(f"{'scenario':<16}{'LLM calls':>10}{'tokens':>9}{'cost $':>11}{'wall s':>9}{'mean ms':>9}{'p95 ms':>9}{'hit rate':>10}")
+    baseline = None
+    for name, cache in scenarios.items():
+        result = asyncio.run(replay(log, cache, args.latency))
+        baseline = baseline or result
+        print(
+            f"{name:<16}{result['llm_calls']:>10}{result['tokens']:>9}{result['cost_usd']:>11.5f}"
+            f"{result['wall_s']:>9.2f}{result['mean_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['hit_rate']:>10.1%}"
+        )
+    print(f"\nBaseline cost ${baseline['cost_usd']:.5f} for {baseline['llm_calls']} LLM calls")
+
+if __name__ == "__main__":
+    main()
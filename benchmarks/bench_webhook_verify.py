@@ -0,0 +1,117 @@
+# benchmarks/bench_webhook_verify.py
+"""Measure webhook signature verification throughput on a single core.
+
+Usage: taskset -c 0 python -m benchmarks.bench_webhook_verify [--requests 5000]
+
+Compares the old per-request path (look up the config and secret,
+encode it, HMAC the body to hex, parse the JSON) with WebhookVerifier,
+for one active secret and while rotating between two, then pushes
+signed webhooks through the router end to end with in-memory queue and
+dedup stores.
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import time
+from typing import Callable, Dict
+import httpx
+from fastapi import FastAPI
+from src.api.webhook_handlers import WEBHOOK_JOB_KIND, router, run_fansly_event_job
+from src.api.webhook_signing import WebhookVerifier
+from src.core import registry
+from src.utils.config import load_config
+from src.utils.idempotency import IdempotencyStore
+from src.utils.job_queue import JobQueue
+
+SECRET = "bench-secret-0123456789abcdef"
+OLD_SECRET = "bench-secret-previous"
+
+def make_body(n: int) -> bytes:
+    return json.dumps({
+        "type": "message",
+        "event_id": f"evt-{n}",
+        "user_id": f"fan-{n % 100}",
+        "message": "hey! loved your last post, what are you up to this weekend?"
+    }).encode()
+
+def sign(secret: str, body: bytes) -> str:
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+def legacy_verify(body: bytes, signature: str) -> Dict:
+    """The per-request work done before WebhookVerifier"""
+    load_config()
+    secret = os.getenv("FANSLY_WEBHOOK_SECRET", SECRET)
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(expected, signature):
+        raise ValueError("bad signature")
+    return json.loads(body)
+
+def verifier_verify(verifier: WebhookVerifier) -> Callable[[bytes, str], Dict]:
+    def verify(body: bytes, signature: str) -> Dict:
+        if not verifier.verify(body, signature):
+            raise ValueError("bad signature")
+        return json.loads(body)
+    return verify
+
+def time_verify(verify: Callable[[bytes, str], Dict], requests: int, rounds: int) -> float:
+    """Webhooks per second through verify, best of rounds"""
+    signed = [(body, sign(SECRET, body)) for body in map(make_body, range(requests))]
+    best = 0.0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for body, signature in signed:
+            verify(body, signature)
+        best = max(best, requests / (time.perf_counter() - start))
+    return best
+
+async def time_endpoint(requests: int) -> float:
+    """Webhooks per second through the router, from request to 202"""
+    registry.reset()
+    queue = JobQueue()
+    queue.register(WEBHOOK_JOB_KIND, run_fansly_event_job)  # registered but never started
+    registry.register("job_queue", queue)
+    registry.register("webhook_dedup", IdempotencyStore())
+    registry.register("webhook_verifier", WebhookVerifier([SECRET]))
+
+    app = FastAPI()
+    app.include_router(router)
+    signed = [(body, sign(SECRET, body)) for body in map(make_body, range(requests))]
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        start = time.perf_counter()
+        for body, signature in signed:
+            response = await client.post("/webhook/fansly", content=body, headers={"X-Fansly-Signature": signature})
+            assert response.status_code == 202, response.text
+        elapsed = time.perf_counter() - start
+    await queue.stop()
+    await registry.get_webhook_dedup().close()
+    registry.reset()
+    return requests / elapsed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000, help="webhooks per scenario")
+    parser.add_argument("--rounds", type=int, default=5, help="timed rounds per scenario; the best is reported")
+    args = parser.parse_args()
+
+    os.environ.setdefault("FANSLY_WEBHOOK_SECRET", SECRET)
+    scenarios = {
+        "legacy": legacy_verify,
+        "verifier": verifier_verify(WebhookVerifier([SECRET])),
+        # The new secret is tried first, so rotation only costs the stale signers
+        "verifier, 2 keys": verifier_verify(WebhookVerifier([SECRET, OLD_SECRET])),
+    }
+
+    print(f"Verifying {args.requests} signed webhooks per scenario\n")
+    print(f"{'scenario':<20}{'webhooks/s':>12}{'us/webhook':>12}")
+    for name, verify in scenarios.items():
+        rate = time_verify(verify, args.requests, args.rounds)
+        print(f"{name:<20}{rate:>12,.0f}{1e6 / rate:>12.1f}")
+
+    rate = asyncio.run(time_endpoint(args.requests))
+    print(f"\n{'endpoint (202)':<20}{rate:>12,.0f}{1e6 / rate:>12.1f}")
+
+if __name__ == "__main__":
+    main()
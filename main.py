@@ -1,378 +1,599 @@
-# main.py
-from fastapi import FastAPI, Request, Body
-from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
-from datetime import datetime
-from typing import Dict, Any, Optional
-import logging
-import os
-from dotenv import load_dotenv
-
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("app.log"),
-        logging.StreamHandler()
-    ]
-)
-
-logger = logging.getLogger(__name__)
-
-# Load environment variables
-load_dotenv()
-openai_key = os.getenv("OPENAI_API_KEY")
-print(f"OpenAI Key loaded: {openai_key is not None}")
-if openai_key:
-    print(f"First few characters of key if present: {openai_key[:5]}...")
-
-# Import core components
-from src.core.engagement import EngagementSystem
-from src.core.personality import PersonalityEngine
-from src.core.content_manager import ContentManager
-from src.utils.database import DatabaseManager # Import DatabaseManager
-
-# Initialize components
-engagement_system = EngagementSystem()
-personality_engine = PersonalityEngine()
-content_manager = ContentManager()
-db_manager = DatabaseManager() # Initialize DatabaseManager
-
-# Initialize FastAPI app
-app = FastAPI(
-    title="NSFW Influencer Engine",
-    description="API for AI Influencer Engine",
-    version="0.1.0"
-)
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Allow all origins for development
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-@app.get("/", response_class=HTMLResponse)
-async def root():
-    """Simple HTML response for the root endpoint"""
-    html_content = """
-    <!DOCTYPE html>
-    <html>
-        <head>
-            <title>NSFW Influencer Engine</title>
-        </head>
-        <body>
-            <h1>NSFW Influencer Engine API</h1>
-            <p>API is running correctly!</p>
-            <p>Try the <a href="/health">/health</a> endpoint to check the API status.</p>
-            <p>Admin dashboard is available at <a href="http://localhost:3000">http://localhost:3000</a></p>
-        </body>
-    </html>
-    """
-    return HTMLResponse(content=html_content)
-
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
-
-@app.get("/test")
-async def test():
-    """Test endpoint"""
-    return {"message": "Test endpoint working", "timestamp": datetime.now().isoformat()}
-
-# Engagement API endpoints
-@app.post("/api/engagement/interact")
-async def process_interaction(interaction_data: Dict[str, Any] = Body(...)):
-    """Process a user interaction and generate a response"""
-    try:
-        logger.info(f"Received interaction: {interaction_data}")
-        result = await engagement_system.process_interaction(interaction_data)
-        return {
-            "success": True,
-            "response": result["response"],
-            "processed_at": result["processed_at"]
-        }
-    except Exception as e:
-        logger.error(f"Error processing interaction: {str(e)}")
-        return JSONResponse(
-            status_code=500,
-            content={"success": False, "message": f"Error processing interaction: {str(e)}"}
-        )
-
-@app.get("/api/engagement/stats")
-async def get_engagement_stats():
-    """Get current engagement statistics"""
-    try:
-        stats = await engagement_system.get_engagement_stats()
-        return {"success": True, "stats": stats}
-    except Exception as e:
-        logger.error(f"Error getting engagement stats: {str(e)}")
-        return JSONResponse(
-            status_code=500,
-            content={"success": False, "message": f"Error getting stats: {str(e)}"}
-        )
-
-@app.get("/api/engagement/recent")
-async def get_recent_interactions(limit: int = 10):
-    """Get recent interactions history"""
-    try:
-        interactions = await engagement_system.get_recent_interactions(limit)
-        return {"success": True, "interactions": interactions}
-    except Exception as e:
-        logger.error(f"Error getting recent interactions: {str(e)}")
-        return JSONResponse(
-            status_code=500,
-            content={"success": False, "message": f"Error getting recent interactions: {str(e)}"}
-        )
-
-# Content Generation API endpoints
-@app.post("/api/content/create")
-async def create_content(content_data: Dict[str, Any] = Body(...)):
-    """Generate content based on provided parameters"""
-    try:
-        logger.info(f"Content generation request: {content_data}")
-        
-        content_type = content_data.get("content_type", "post")
-        topic = content_data.get("topic", "general")
-        tone = content_data.get("tone", "casual")
-        word_count = content_data.get("word_count", 150)
-        
-        # Prepare params for content generation
-        params = {
-            "topic": topic,
-            "tone": tone,
-            "word_count": word_count
-        }
-        
-        logger.info(f"Calling content_manager.generate_content with: {content_type}, {params}")
-        result = await content_manager.generate_content(content_type, params)
-        logger.info(f"Content generation result: {result}")
-        
-        return {
-            "success": True,
-            "content": result["text"],
-            "created_at": result["created_at"]
-        }
-    except Exception as e:
-        logger.error(f"Error generating content: {str(e)}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        return JSONResponse(
-            status_code=500,
-            content={"success": False, "message": f"Error generating content: {str(e)}"}
-        )
-
-@app.post("/api/content/schedule")
-async def schedule_content(schedule_data: Dict[str, Any] = Body(...)):
-    """Schedule content for publishing"""
-    try:
-        content = schedule_data.get("content", {})
-        publish_time = schedule_data.get("publish_time")
-        
-        result = await content_manager.schedule_content(content, publish_time)
-        
-        return {
-            "success": True,
-            "scheduled_content": result
-        }
-    except Exception as e:
-        logger.error(f"Error scheduling content: {str(e)}")
-        return JSONResponse(
-            status_code=500,
-            content={"success": False, "message": f"Error scheduling content: {str(e)}"}
-        )
-
-@app.post("/api/content/save")
-async def save_content_to_library(content_data: Dict[str, Any] = Body(...)):
-    """Save generated content to the database library"""
-    try:
-        logger.info(f"Saving content to library: {content_data}")
-        
-        # Add a timestamp
-        content_data_with_timestamp = {
-            **content_data,
-            "saved_at": datetime.now().isoformat(),
-            "status": "saved" # Add a status
-        }
-        
-        # Use the DatabaseManager instance to store content
-        inserted_id = db_manager.store_content(content_data_with_timestamp)
-        
-        logger.info(f"Content saved with ID: {inserted_id}")
-        return {
-            "success": True,
-            "message": "Content saved successfully",
-            "content_id": inserted_id
-        }
-    except Exception as e:
-        logger.error(f"Error saving content to library: {str(e)}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        return JSONResponse(
-            status_code=500,
-            content={"success": False, "message": f"Error saving content: {str(e)}"}
-        )
-
-# Personality API endpoints
-@app.get("/api/personality/config")
-async def get_personality_config():
-    """Get current personality configuration"""
-    try:
-        logger.info("Received request for personality config")
-        config = await personality_engine.get_personality_stats()
-        logger.info(f"Retrieved personality config: {config}")
-        return {
-            "success": True,
-            "config": config
-        }
-    except Exception as e:
-        logger.error(f"Error getting personality config: {str(e)}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        return JSONResponse(
-            status_code=500, 
-            content={"success": False, "message": f"Error getting personality config: {str(e)}"}
-        )
-
-@app.post("/api/personality/update")
-async def update_personality(traits_data: Dict[str, Any] = Body(...)):
-    """Update personality traits"""
-    try:
-        logger.info(f"Updating personality with: {traits_data}")
-        await personality_engine.update_personality(traits_data)
-        
-        return {
-            "success": True,
-            "message": "Personality updated successfully"
-        }
-    except Exception as e:
-        logger.error(f"Error updating personality: {str(e)}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        return JSONResponse(
-            status_code=500,
-            content={"success": False, "message": f"Error updating personality: {str(e)}"}
-        )
-
-@app.post("/api/personality/generate")
-async def generate_personality_response(prompt_data: Dict[str, Any] = Body(...)):
-    """Generate a response with current personality settings"""
-    try:
-        logger.info(f"Generating personality response with: {prompt_data}")
-        prompt = prompt_data.get("prompt", "")
-        context = prompt_data.get("context", {})
-        
-        response = await personality_engine.generate_response(prompt, context)
-        logger.info(f"Generated response: {response[:50]}...")
-        
-        return {
-            "success": True,
-            "response": response
-        }
-    except Exception as e:
-        logger.error(f"Error generating personality response: {str(e)}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        return JSONResponse(
-            status_code=500,
-            content={"success": False, "message": f"Error generating personality response: {str(e)}"}
-        )
-
-# System Settings API endpoints
-@app.get("/api/settings")
-async def get_system_settings():
-    """Get current system settings"""
-    try:
-        logger.info("Retrieving system settings")
-        
-        # Load system config
-        from src.utils.config import load_config
-        system_config = load_config().get("system", {})
-        
-        # Format settings for the frontend
-        settings = {
-            "openaiApiKey": "sk-***************", # Don't send actual key, just a placeholder
-            "mongoDbUri": system_config.get("database", {}).get("uri", ""),
-            "postGenerationLimit": 10,
-            "responseTime": {
-                "comments": 5,
-                "directMessages": 10
-            },
-            "backupFrequency": "daily",
-            "enableNotifications": True
-        }
-        
-        logger.info("Successfully retrieved system settings")
-        return {
-            "success": True,
-            "settings": settings
-        }
-    except Exception as e:
-        logger.error(f"Error retrieving system settings: {str(e)}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        return JSONResponse(
-            status_code=500,
-            content={"success": False, "message": f"Error retrieving system settings: {str(e)}"}
-        )
-
-@app.post("/api/settings")
-async def update_system_settings(settings_data: Dict[str, Any] = Body(...)):
-    """Update system settings"""
-    try:
-        logger.info(f"Updating system settings: {settings_data}")
-        
-        # Here you would update system config
-        # For now, just return success
-        
-        logger.info("Successfully updated system settings")
-        return {
-            "success": True,
-            "message": "Settings updated successfully"
-        }
-    except Exception as e:
-        logger.error(f"Error updating system settings: {str(e)}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        return JSONResponse(
-            status_code=500,
-            content={"success": False, "message": f"Error updating system settings: {str(e)}"}
-        )
-
-@app.post("/api/test-connection")
-async def test_connection(connection_data: Dict[str, Any] = Body(...)):
-    """Test connection to a service"""
-    try:
-        service = connection_data.get("service", "")
-        logger.info(f"Testing connection to {service}")
-        
-        if service == "mongodb":
-            # Here you would test the MongoDB connection
-            # For now, just return success
-            return {"success": True}
-        elif service == "openai":
-            # Here you would test the OpenAI connection
-            # For now, just return success
-            return {"success": True}
-        else:
-            return JSONResponse(
-                status_code=400,
-                content={"success": False, "message": f"Unknown service: {service}"}
-            )
-    except Exception as e:
-        logger.error(f"Error testing connection to {connection_data.get('service')}: {str(e)}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        return JSONResponse(
-            status_code=500,
-            content={"success": False, "message": f"Error testing connection: {str(e)}"}
-        )
-
-if __name__ == "__main__":
-    logger.info("Starting API server...")
-    uvicorn.run("main:app", host="127.0.0.1", port=8080, log_level="info")
+# main.py
+from fastapi import FastAPI, Request, Body
+from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.middleware.cors import CORSMiddleware
+import uvicorn
+from datetime import datetime
+from typing import Dict, Any, Optional
+import logging
+import math
+import os
+from dotenv import load_dotenv
+from src.utils.config import CONFIG_DIR, load_config
+from src.utils.logging_setup import setup_logging, stop_logging
+
+# Set up logging: records are queued and written by a background thread
+# as rotated JSON lines, so handlers never wait on disk
+setup_logging(load_config()["system"].get("logging", {}), project_root=os.path.dirname(CONFIG_DIR))
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+openai_key = os.getenv("OPENAI_API_KEY")
+print(f"OpenAI Key loaded: {openai_key is not None}")
+if openai_key:
+    print(f"First few characters of key if present: {openai_key[:5]}...")
+
+# Import core components
+from src.api.metrics import MetricsMiddleware, router as metrics_router
+from src.api.streaming import sse_response, sse_results_response
+from src.api.webhook_handlers import WEBHOOK_JOB_KIND, router as webhook_router, run_fansly_event_job
+from src.core.registry import (
+    get_content_manager,
+    get_database,
+    get_engagement_analytics,
+    get_engagement_system,
+    get_fansly_client,
+    get_job_queue,
+    get_personality_engine,
+    get_scheduler,
+    get_webhook_dedup,
+)
+from src.utils.database import MAX_PAGE_SIZE
+from src.utils.job_queue import RetryLater
+from src.utils.rate_limiter import RateLimitExceeded
+
+# Initialize components (shared with the webhook router through the registry)
+personality_engine = get_personality_engine()
+engagement_system = get_engagement_system()
+engagement_analytics = get_engagement_analytics() # Rolling interaction counters, checkpointed to metrics
+content_manager = get_content_manager()
+db_manager = get_database() # Async MongoDB access; connects on first use
+job_queue = get_job_queue()
+scheduler = get_scheduler() # Hands scheduled posts to the job queue when due
+webhook_dedup = get_webhook_dedup() # Drops redelivered webhook events
+
+async def run_content_job(payload: Dict[str, Any]) -> Dict:
+    """Background job: generate content"""
+    return await content_manager.generate_content(payload.get("content_type", "post"), payload.get("params"))
+
+async def run_interaction_job(payload: Dict[str, Any]) -> Dict:
+    """Background job: answer an interaction that was deferred by the rate limiter"""
+    try:
+        return await engagement_system.process_interaction(payload)
+    except RateLimitExceeded as e:
+        raise RetryLater(e.retry_after, str(e))
+
+async def run_publish_job(payload: Dict[str, Any]) -> Dict:
+    """Background job: post scheduled content to Fansly"""
+    return await get_fansly_client().post_content(payload["content"])
+
+job_queue.register("content.generate", run_content_job)
+job_queue.register("content.publish", run_publish_job)
+job_queue.register("engagement.interaction", run_interaction_job)
+job_queue.register(WEBHOOK_JOB_KIND, run_fansly_event_job)
+
+# Initialize FastAPI app
+app = FastAPI(
+    title="NSFW Influencer Engine",
+    description="API for AI Influencer Engine",
+    version="0.1.0"
+)
+
+# Add CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],  # Allow all origins for development
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# Request counts and latencies for /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Fansly webhooks are acknowledged at once and handled by the job queue
+app.include_router(webhook_router)
+app.include_router(metrics_router)
+
+@app.on_event("startup")
+async def startup():
+    """Create database indexes and start the background workers"""
+    try:
+        await db_manager.ensure_indexes()
+    except Exception as e:
+        logger.error(f"Could not create database indexes: {str(e)}")
+    await job_queue.start()
+    await scheduler.start()
+    await engagement_analytics.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Release shared resources"""
+    await scheduler.stop()
+    await job_queue.stop()
+    await webhook_dedup.close()
+    await get_fansly_client().close()
+    await personality_engine.memory_store.persist_all()
+    await engagement_system.persist_history()
+    await engagement_analytics.stop()
+    await db_manager.close()
+    stop_logging()
+
+@app.get("/", response_class=HTMLResponse)
+async def root():
+    """Simple HTML response for the root endpoint"""
+    html_content = """
+    <!DOCTYPE html>
+    <html>
+        <head>
+            <title>NSFW Influencer Engine</title>
+        </head>
+        <body>
+            <h1>NSFW Influencer Engine API</h1>
+            <p>API is running correctly!</p>
+            <p>Try the <a href="/health">/health</a> endpoint to check the API status.</p>
+            <p>Admin dashboard is available at <a href="http://localhost:3000">http://localhost:3000</a></p>
+        </body>
+    </html>
+    """
+    return HTMLResponse(content=html_content)
+
+@app.get("/health")
+async def health_check():
+    """Health check endpoint"""
+    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+
+@app.get("/test")
+async def test():
+    """Test endpoint"""
+    return {"message": "Test endpoint working", "timestamp": datetime.now().isoformat()}
+
+# Engagement API endpoints
+@app.post("/api/engagement/interact")
+async def process_interaction(interaction_data: Dict[str, Any] = Body(...)):
+    """Process a user interaction and generate a response"""
+    try:
+        logger.debug("Received interaction: %s", interaction_data)
+        result = await engagement_system.process_interaction(interaction_data)
+        return {
+            "success": True,
+            "response": result["response"],
+            "processed_at": result["processed_at"]
+        }
+    except RateLimitExceeded as e:
+        # Over quota: answer once a slot frees up rather than dropping it
+        job_id = await job_queue.enqueue("engagement.interaction", interaction_data, delay=e.retry_after)
+        if e.retry_after < 60:
+            wait = f"{math.ceil(e.retry_after)} seconds"
+        else:
+            wait = f"{math.ceil(e.retry_after / 60)} minutes"
+        return JSONResponse(
+            status_code=202,
+            content={
+                "success": True,
+                "deferred": True,
+                "message": f"Reply limit reached; queued to answer in about {wait}",
+                "job_id": job_id,
+                "retry_after": round(e.retry_after, 1)
+            }
+        )
+    except Exception as e:
+        logger.error(f"Error processing interaction: {str(e)}")
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "message": f"Error processing interaction: {str(e)}"}
+        )
+
+@app.get("/api/engagement/stats")
+async def get_engagement_stats():
+    """Get current engagement statistics"""
+    try:
+        stats = await engagement_system.get_engagement_stats()
+        return {"success": True, "stats": stats}
+    except Exception as e:
+        logger.error(f"Error getting engagement stats: {str(e)}")
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "message": f"Error getting stats: {str(e)}"}
+        )
+
+@app.get("/api/engagement/recent")
+async def get_recent_interactions(limit: int = 10, offset: int = 0):
+    """Get recent interactions history, newest first"""
+    try:
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        offset = max(0, offset)
+        interactions = await engagement_system.get_recent_interactions(limit, offset)
+        return {"success": True, "interactions": interactions, "limit": limit, "offset": offset}
+    except Exception as e:
+        logger.error(f"Error getting recent interactions: {str(e)}")
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "message": f"Error getting recent interactions: {str(e)}"}
+        )
+
+@app.get("/api/conversations/{user_id}")
+async def get_conversation_history(user_id: str, limit: int = 50, cursor: Optional[str] = None):
+    """Get a page of a user's conversation history, newest first"""
+    try:
+        page = await db_manager.get_conversation_page(user_id, limit=limit, cursor=cursor)
+        return {"success": True, **page}
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "message": str(e)}
+        )
+    except Exception as e:
+        logger.error(f"Error getting conversation history: {str(e)}")
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "message": f"Error getting conversation history: {str(e)}"}
+        )
+
+# Content Generation API endpoints
+@app.post("/api/content/create")
+async def create_content(request: Request, content_data: Dict[str, Any] = Body(...)):
+    """Generate content based on provided parameters
+    
+    Set "stream": true to receive the text as Server-Sent Events, or
+    "background": true to queue the work and poll /api/jobs/{job_id}.
+    """
+    try:
+        logger.debug("Content generation request: %s", content_data)
+        
+        content_type = content_data.get("content_type", "post")
+        topic = content_data.get("topic", "general")
+        tone = content_data.get("tone", "casual")
+        word_count = content_data.get("word_count", 150)
+        
+        # Prepare params for content generation
+        params = {
+            "topic": topic,
+            "tone": tone,
+            "word_count": word_count
+        }
+        
+        if content_data.get("background"):
+            job_id = await job_queue.enqueue("content.generate", {"content_type": content_type, "params": params})
+            return JSONResponse(
+                status_code=202,
+                content={"success": True, "job_id": job_id, "status": "queued"}
+            )
+        
+        if content_data.get("stream"):
+            return sse_response(
+                request,
+                content_manager.stream_content(content_type, params),
+                done=lambda text: {"content": text, "created_at": datetime.now().isoformat()}
+            )
+        
+        logger.debug("Calling content_manager.generate_content with: %s, %s", content_type, params)
+        result = await content_manager.generate_content(content_type, params)
+        logger.debug("Content generation result: %s", result)
+        
+        return {
+            "success": True,
+            "content": result["text"],
+            "created_at": result["created_at"]
+        }
+    except Exception as e:
+        logger.error(f"Error generating content: {str(e)}")
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "message": f"Error generating content: {str(e)}"}
+        )
+
+@app.post("/api/content/batch")
+async def create_content_batch(request: Request, batch_data: Dict[str, Any] = Body(...)):
+    """Generate a list of content specs concurrently
+    
+    Each item takes the same fields as /api/content/create. Results are
+    streamed back as Server-Sent Events in completion order, one "result"
+    event per item (with its index), followed by a "done" summary.
+    """
+    items = batch_data.get("items")
+    if not isinstance(items, list) or not items:
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "message": "items must be a non-empty list"}
+        )
+    if len(items) > content_manager.batch_max_items:
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "message": f"At most {content_manager.batch_max_items} items per batch"}
+        )
+    
+    logger.info("Batch content generation request: %d items", len(items))
+    return sse_results_response(request, content_manager.generate_batch(items))
+
+@app.post("/api/content/schedule")
+async def schedule_content(schedule_data: Dict[str, Any] = Body(...)):
+    """Schedule content for publishing"""
+    try:
+        content = schedule_data.get("content", {})
+        publish_time = schedule_data.get("publish_time")
+        
+        result = await content_manager.schedule_content(content, publish_time)
+        
+        return {
+            "success": True,
+            "scheduled_content": result
+        }
+    except Exception as e:
+        logger.error(f"Error scheduling content: {str(e)}")
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "message": f"Error scheduling content: {str(e)}"}
+        )
+
+@app.get("/api/content/scheduled")
+async def get_scheduled_content(limit: int = 50, cursor: Optional[str] = None):
+    """Get a page of upcoming scheduled posts, soonest first"""
+    try:
+        page = await scheduler.list_upcoming(limit=min(limit, 500), cursor=cursor)
+        return {"success": True, **page}
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "message": str(e)}
+        )
+    except Exception as e:
+        logger.error(f"Error getting scheduled content: {str(e)}")
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "message": f"Error getting scheduled content: {str(e)}"}
+        )
+
+@app.post("/api/content/scheduled/{schedule_id}/cancel")
+async def cancel_scheduled_content(schedule_id: str):
+    """Cancel a scheduled post that hasn't been published yet"""
+    if await scheduler.cancel(schedule_id):
+        return {"success": True, "message": "Scheduled post cancelled"}
+    return JSONResponse(
+        status_code=404,
+        content={"success": False, "message": f"No pending scheduled post: {schedule_id}"}
+    )
+
+@app.post("/api/content/save")
+async def save_content_to_library(content_data: Dict[str, Any] = Body(...)):
+    """Save generated content to the database library"""
+    try:
+        logger.debug("Saving content to library: %s", content_data)
+        
+        # Add a timestamp
+        content_data_with_timestamp = {
+            **content_data,
+            "saved_at": datetime.now().isoformat(),
+            "status": "saved" # Add a status
+        }
+        
+        # Use the DatabaseManager instance to store content
+        inserted_id = await db_manager.store_content(content_data_with_timestamp)
+        
+        logger.info("Content saved with ID: %s", inserted_id)
+        return {
+            "success": True,
+            "message": "Content saved successfully",
+            "content_id": inserted_id
+        }
+    except Exception as e:
+        logger.error(f"Error saving content to library: {str(e)}")
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "message": f"Error saving content: {str(e)}"}
+        )
+
+# Background job API endpoints
+@app.get("/api/jobs")
+async def list_jobs(status: Optional[str] = None, limit: int = 50):
+    """List recent background jobs"""
+    try:
+        jobs = await job_queue.list_jobs(status=status, limit=min(limit, 500))
+        return {"success": True, "jobs": jobs, "stats": await job_queue.stats()}
+    except Exception as e:
+        logger.error(f"Error listing jobs: {str(e)}")
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "message": f"Error listing jobs: {str(e)}"}
+        )
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get the status and result of a background job"""
+    job = await job_queue.get(job_id)
+    if job is None:
+        return JSONResponse(
+            status_code=404,
+            content={"success": False, "message": f"Job not found: {job_id}"}
+        )
+    return {"success": True, "job": job}
+
+@app.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running background job"""
+    if await job_queue.cancel(job_id):
+        return {"success": True, "message": "Job cancelled"}
+    job = await job_queue.get(job_id)
+    return JSONResponse(
+        status_code=404 if job is None else 409,
+        content={
+            "success": False,
+            "message": f"Job not found: {job_id}" if job is None else f"Job already {job['status']}"
+        }
+    )
+
+@app.get("/api/webhooks/stats")
+async def get_webhook_stats():
+    """Get counts of accepted and duplicate webhook deliveries"""
+    return {"success": True, "stats": webhook_dedup.stats()}
+
+# Personality API endpoints
+@app.get("/api/personality/config")
+async def get_personality_config():
+    """Get current personality configuration"""
+    try:
+        logger.info("Received request for personality config")
+        config = await personality_engine.get_personality_stats()
+        logger.debug("Retrieved personality config: %s", config)
+        return {
+            "success": True,
+            "config": config
+        }
+    except Exception as e:
+        logger.error(f"Error getting personality config: {str(e)}")
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return JSONResponse(
+            status_code=500, 
+            content={"success": False, "message": f"Error getting personality config: {str(e)}"}
+        )
+
+@app.post("/api/personality/update")
+async def update_personality(traits_data: Dict[str, Any] = Body(...)):
+    """Update personality traits"""
+    try:
+        logger.info("Updating personality sections: %s", ", ".join(traits_data))
+        await personality_engine.update_personality(traits_data)
+        
+        return {
+            "success": True,
+            "message": "Personality updated successfully"
+        }
+    except Exception as e:
+        logger.error(f"Error updating personality: {str(e)}")
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "message": f"Error updating personality: {str(e)}"}
+        )
+
+@app.post("/api/personality/generate")
+async def generate_personality_response(request: Request, prompt_data: Dict[str, Any] = Body(...)):
+    """Generate a response with current personality settings
+    
+    Set "stream": true to receive the response as Server-Sent Events.
+    """
+    try:
+        logger.debug("Generating personality response with: %s", prompt_data)
+        prompt = prompt_data.get("prompt", "")
+        context = prompt_data.get("context", {})
+        
+        if prompt_data.get("stream"):
+            return sse_response(request, personality_engine.stream_response(prompt, context))
+        
+        response = await personality_engine.generate_response(prompt, context)
+        logger.debug("Generated response: %.50s...", response)
+        
+        return {
+            "success": True,
+            "response": response
+        }
+    except Exception as e:
+        logger.error(f"Error generating personality response: {str(e)}")
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "message": f"Error generating personality response: {str(e)}"}
+        )
+
+# System Settings API endpoints
+@app.get("/api/settings")
+async def get_system_settings():
+    """Get current system settings"""
+    try:
+        logger.info("Retrieving system settings")
+        
+        # Load system config
+        from src.utils.config import load_config
+        system_config = load_config().get("system", {})
+        
+        # Format settings for the frontend
+        settings = {
+            "openaiApiKey": "sk-***************", # Don't send actual key, just a placeholder
+            "mongoDbUri": system_config.get("database", {}).get("uri", ""),
+            "postGenerationLimit": 10,
+            "responseTime": {
+                "comments": 5,
+                "directMessages": 10
+            },
+            "backupFrequency": "daily",
+            "enableNotifications": True
+        }
+        
+        logger.info("Successfully retrieved system settings")
+        return {
+            "success": True,
+            "settings": settings
+        }
+    except Exception as e:
+        logger.error(f"Error retrieving system settings: {str(e)}")
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "message": f"Error retrieving system settings: {str(e)}"}
+        )
+
+@app.post("/api/settings")
+async def update_system_settings(settings_data: Dict[str, Any] = Body(...)):
+    """Update system settings"""
+    try:
+        logger.info("Updating system settings: %s", ", ".join(settings_data))
+        
+        # Here you would update system config
+        # For now, just return success
+        
+        logger.info("Successfully updated system settings")
+        return {
+            "success": True,
+            "message": "Settings updated successfully"
+        }
+    except Exception as e:
+        logger.error(f"Error updating system settings: {str(e)}")
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "message": f"Error updating system settings: {str(e)}"}
+        )
+
+@app.post("/api/test-connection")
+async def test_connection(connection_data: Dict[str, Any] = Body(...)):
+    """Test connection to a service"""
+    try:
+        service = connection_data.get("service", "")
+        logger.info(f"Testing connection to {service}")
+        
+        if service == "mongodb":
+            # Here you would test the MongoDB connection
+            # For now, just return success
+            return {"success": True}
+        elif service == "openai":
+            # Here you would test the OpenAI connection
+            # For now, just return success
+            return {"success": True}
+        else:
+            return JSONResponse(
+                status_code=400,
+                content={"success": False, "message": f"Unknown service: {service}"}
+            )
+    except Exception as e:
+        logger.error(f"Error testing connection to {connection_data.get('service')}: {str(e)}")
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "message": f"Error testing connection: {str(e)}"}
+        )
+
+if __name__ == "__main__":
+    logger.info("Starting API server...")
+    uvicorn.run("main:app", host="127.0.0.1", port=8080, log_level="info")
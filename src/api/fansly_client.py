@@ -1,42 +1,211 @@
-# src/api/fansly_client.py
-from typing import Dict, Optional
-import aiohttp
-import logging
-from datetime import datetime
-from src.utils.config import load_config
-
-logger = logging.getLogger(__name__)
-
-class FanslyClient:
-    def __init__(self):
-        self.config = load_config()["fansly"]
-        self.base_url = self.config["api_url"]
-        self.api_key = self.config["api_key"]
-        
-    async def post_content(self, content: Dict) -> Dict:
-        """Post content to Fansly"""
-        try:
-            # TODO: Implement actual API call
-            logger.info(f"Posting content to Fansly: {content}")
-            return {
-                "status": "success",
-                "post_id": "placeholder_id",
-                "posted_at": datetime.now().isoformat()
-            }
-        except Exception as e:
-            logger.error(f"Error posting to Fansly: {str(e)}")
-            raise
-            
-    async def send_dm(self, user_id: str, message: str) -> Dict:
-        """Send a direct message to a user"""
-        try:
-            # TODO: Implement actual API call
-            logger.info(f"Sending DM to user {user_id}")
-            return {
-                "status": "success",
-                "message_id": "placeholder_id",
-                "sent_at": datetime.now().isoformat()
-            }
-        except Exception as e:
-            logger.error(f"Error sending DM: {str(e)}")
-            raise
\ No newline at end of file
+# src/api/fansly_client.py
+from typing import Any, Dict, Optional
+import aiohttp
+import asyncio
+import logging
+import os
+import random
+from datetime import datetime
+from src.utils.circuit_breaker import CircuitBreaker
+from src.utils.config import load_config
+from src.utils.metrics import timed_stage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_CONNECTIONS_PER_HOST = 20
+DEFAULT_KEEPALIVE_TIMEOUT = 30.0
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_REQUEST_TIMEOUT = 30.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 10.0
+
+# Statuses worth retrying; other 4xx responses are our fault and won't improve
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Methods that are safe to resend whatever happened to the first attempt
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+class FanslyAPIError(Exception):
+    """A Fansly API call failed"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+class FanslyClient:
+    """Client for the Fansly API
+
+    One aiohttp session (and so one keep-alive connection pool) is shared
+    by every call and opened on first use; call close() on shutdown.
+    Timeouts, 429 and 5xx responses are retried with jittered exponential
+    backoff, and a circuit breaker stops calls for a while once Fansly
+    keeps failing. A POST is only resent when Fansly provably never acted
+    on it (see _never_processed), so a fan can't get the same DM twice.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        self.config = config if config is not None else load_config()["system"].get("fansly", {})
+        self.base_url = (self.config.get("api_url") or "").rstrip("/")
+        self.api_key = os.getenv("FANSLY_API_KEY")
+        self.max_retries = self.config.get("max_retries", DEFAULT_MAX_RETRIES)
+        self.backoff_base = self.config.get("backoff_base", DEFAULT_BACKOFF_BASE)
+        self.backoff_max = self.config.get("backoff_max", DEFAULT_BACKOFF_MAX)
+        self.breaker = CircuitBreaker(
+            "fansly",
+            failure_threshold=self.config.get("breaker_failure_threshold", 5),
+            reset_timeout=self.config.get("breaker_reset_timeout", 30.0)
+        )
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.requests = 0
+        self.retries = 0
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.config.get("max_connections", DEFAULT_MAX_CONNECTIONS),
+                limit_per_host=self.config.get("max_connections_per_host", DEFAULT_MAX_CONNECTIONS_PER_HOST),
+                keepalive_timeout=self.config.get("keepalive_timeout", DEFAULT_KEEPALIVE_TIMEOUT),
+                ttl_dns_cache=300
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=self.config.get("request_timeout", DEFAULT_REQUEST_TIMEOUT),
+                connect=self.config.get("connect_timeout", DEFAULT_CONNECT_TIMEOUT)
+            )
+            headers = {"Authorization": self.api_key} if self.api_key else {}
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers)
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(self.backoff_max, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        backoff = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return random.uniform(backoff / 2, backoff)
+
+    @staticmethod
+    def _never_processed(status: int, retry_after: Optional[str]) -> bool:
+        """Whether an error response means the request was turned away unprocessed
+
+        429 is a rejection by the rate limiter, and a 503 carrying
+        Retry-After is the server shedding load; any other 5xx may have
+        come after the write landed.
+        """
+        return status == 429 or (status == 503 and bool(retry_after))
+
+    async def _request(self, endpoint: str, method: str, path: str, payload: Optional[Dict] = None) -> Dict[str, Any]:
+        """Call the API, retrying transient failures; returns the JSON response
+
+        endpoint names the call in the latency metrics, where path may
+        carry ids.
+        """
+        with timed_stage(f"fansly.{endpoint}"):
+            return await self._request_with_retries(method, path, payload)
+
+    async def _request_with_retries(self, method: str, path: str, payload: Optional[Dict]) -> Dict[str, Any]:
+        if not self.base_url:
+            raise FanslyAPIError("Fansly api_url is not configured")
+        self.breaker.check()
+        session = self._get_session()
+        url = f"{self.base_url}{path}"
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            retryable = True
+            self.requests += 1
+            try:
+                async with session.request(method, url, json=payload) as response:
+                    if response.status < 400:
+                        self.breaker.record_success()
+                        if response.content_type == "application/json":
+                            return await response.json()
+                        return {}
+                    body = await response.text()
+                    error = FanslyAPIError(
+                        f"{method} {path} returned {response.status}: {body[:200]}", status=response.status
+                    )
+                    if response.status not in RETRY_STATUSES:
+                        # Our request was rejected; Fansly itself is fine
+                        self.breaker.record_success()
+                        raise error
+                    retry_after = response.headers.get("Retry-After")
+                    retryable = idempotent or self._never_processed(response.status, retry_after)
+            except aiohttp.ClientConnectorError as e:
+                # No connection was made, so nothing was sent
+                error = FanslyAPIError(f"{method} {path} failed: {type(e).__name__}: {str(e)}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                # The request may have been sent and acted on before this
+                error = FanslyAPIError(f"{method} {path} failed: {type(e).__name__}: {str(e)}")
+                retryable = idempotent
+
+            if not retryable:
+                break
+            if attempt < self.max_retries:
+                delay = self._backoff(attempt, retry_after)
+                self.retries += 1
+                logger.warning(f"Fansly {str(error)}; retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+        self.breaker.record_failure()
+        logger.error(f"Fansly {str(error)}; giving up after {attempt + 1} attempts")
+        raise error
+
+    async def post_content(self, content: Dict) -> Dict:
+        """Post content to Fansly"""
+        try:
+            logger.info("Posting %s content to Fansly", content.get("type", "post"))
+            result = await self._request("post", "POST", "/post", {
+                "content": content.get("text", ""),
+                "attachments": content.get("attachments", [])
+            })
+            return {
+                "status": "success",
+                "post_id": result.get("id"),
+                "posted_at": datetime.now().isoformat()
+            }
+        except Exception as e:
+            logger.error(f"Error posting to Fansly: {str(e)}")
+            raise
+
+    async def send_dm(self, user_id: str, message: str) -> Dict:
+        """Send a direct message to a user"""
+        try:
+            logger.info("Sending DM to user %s", user_id)
+            result = await self._request("message", "POST", "/message", {"recipientId": user_id, "content": message})
+            return {
+                "status": "success",
+                "message_id": result.get("id"),
+                "sent_at": datetime.now().isoformat()
+            }
+        except Exception as e:
+            logger.error(f"Error sending DM: {str(e)}")
+            raise
+
+    async def reply_to_comment(self, post_id: str, comment: str, message: str) -> Dict:
+        """Reply to a comment on one of our posts"""
+        try:
+            logger.info("Replying to comment on post %s", post_id)
+            result = await self._request("comment", "POST", f"/post/{post_id}/comment", {
+                "content": message,
+                "replyTo": comment
+            })
+            return {
+                "status": "success",
+                "comment_id": result.get("id"),
+                "sent_at": datetime.now().isoformat()
+            }
+        except Exception as e:
+            logger.error(f"Error replying to comment: {str(e)}")
+            raise
+
+    def stats(self) -> Dict:
+        return {"requests": self.requests, "retries": self.retries, "circuit": self.breaker.stats()}
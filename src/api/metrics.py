@@ -0,0 +1,84 @@
+# src/api/metrics.py
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from typing import Iterable
+import time
+from src.core import registry
+from src.utils.metrics import REGISTRY, Family
+
+router = APIRouter()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "influencer_http_requests_total", "HTTP requests by route and status", ["method", "route", "status"]
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge("influencer_http_requests_in_flight", "HTTP requests being handled")
+HTTP_SECONDS = REGISTRY.histogram(
+    "influencer_http_request_duration_seconds", "Time to handle an HTTP request", ["method", "route"]
+)
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests per route template and status
+
+    Routes are labelled by their template (e.g. /api/jobs/{job_id}), so
+    the label set stays bounded. Streaming responses are timed until the
+    last chunk is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            # The router records the matched route in the scope
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=str(status))
+            HTTP_SECONDS.observe(time.perf_counter() - start, method=scope["method"], route=route)
+
+def collect_engine_metrics() -> Iterable[Family]:
+    """Token counts and response cache hits, read from the shared engine at scrape time"""
+    engine = registry.peek("personality_engine")
+    if engine is None:
+        return
+    telemetry = engine.telemetry.stats()
+    yield ("influencer_llm_calls_total", "counter", "LLM calls by request type", [
+        ({"request_type": request_type}, stats["calls"]) for request_type, stats in telemetry.items()
+    ])
+    yield ("influencer_llm_tokens_total", "counter", "Prompt and completion tokens by request type", [
+        ({"request_type": request_type, "direction": direction}, stats[f"{direction}_tokens"])
+        for request_type, stats in telemetry.items() for direction in ("input", "output")
+    ])
+    if engine.response_cache is not None:
+        cache = engine.response_cache.stats()
+        yield ("influencer_response_cache_lookups_total", "counter", "Response cache lookups by result", [
+            ({"result": "hit"}, cache["hits"]),
+            ({"result": "similar_hit"}, cache["similar_hits"]),
+            ({"result": "miss"}, cache["misses"])
+        ])
+        yield ("influencer_response_cache_hit_ratio", "gauge", "Share of lookups served from the response cache", [
+            ({}, cache["hit_rate"])
+        ])
+        yield ("influencer_response_cache_entries", "gauge", "Responses held in the cache", [({}, cache["size"])])
+
+REGISTRY.register_collector(collect_engine_metrics)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Metrics in the Prometheus text exposition format"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
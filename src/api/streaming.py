@@ -0,0 +1,79 @@
+# src/api/streaming.py
+from typing import AsyncIterator, Callable, Dict, Optional
+from contextlib import aclosing
+import json
+import logging
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Stop reverse proxies from buffering the stream
+    "X-Accel-Buffering": "no"
+}
+
+def format_sse(event: str, data: Dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def sse_events(
+    request: Request,
+    chunks: AsyncIterator[str],
+    done: Optional[Callable[[str], Dict]] = None
+) -> AsyncIterator[str]:
+    """Relay generated text chunks as Server-Sent Events
+
+    Every chunk is sent as a "token" event. The full text follows in a
+    "done" event (built by done, if given), or an "error" event if
+    generation fails. The chunk iterator is closed as soon as the client
+    goes away, which cancels the upstream LLM call.
+    """
+    text = []
+    async with aclosing(chunks) as stream:
+        try:
+            async for chunk in stream:
+                if await request.is_disconnected():
+                    logger.info("Client disconnected, cancelling generation")
+                    return
+                text.append(chunk)
+                yield format_sse("token", {"text": chunk})
+        except Exception as e:
+            logger.error(f"Error while streaming response: {str(e)}")
+            yield format_sse("error", {"success": False, "message": str(e)})
+            return
+
+    response = "".join(text)
+    payload = done(response) if done else {"response": response}
+    yield format_sse("done", {"success": True, **payload})
+
+async def sse_results(request: Request, results: AsyncIterator[Dict]) -> AsyncIterator[str]:
+    """Relay per-item results as "result" events, then a "done" summary"""
+    succeeded = failed = 0
+    async with aclosing(results) as stream:
+        async for result in stream:
+            if await request.is_disconnected():
+                logger.info("Client disconnected, cancelling remaining items")
+                return
+            if result.get("success"):
+                succeeded += 1
+            else:
+                failed += 1
+            yield format_sse("result", result)
+    yield format_sse("done", {"success": True, "succeeded": succeeded, "failed": failed})
+
+def sse_response(
+    request: Request,
+    chunks: AsyncIterator[str],
+    done: Optional[Callable[[str], Dict]] = None
+) -> StreamingResponse:
+    """Stream generated text to the client as Server-Sent Events"""
+    return _event_stream(sse_events(request, chunks, done))
+
+def sse_results_response(request: Request, results: AsyncIterator[Dict]) -> StreamingResponse:
+    """Stream per-item results to the client as Server-Sent Events"""
+    return _event_stream(sse_results(request, results))
+
+def _event_stream(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
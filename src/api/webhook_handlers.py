@@ -1,249 +1,353 @@
-# src/api/webhook_handlers.py
-from fastapi import APIRouter, HTTPException, Request, Header, Depends
-from typing import Optional, Dict
-import logging
-from datetime import datetime
-import json
-import hmac
-import hashlib
-from src.core.personality import PersonalityEngine
-from src.core.content_manager import ContentManager
-from src.core.engagement import EngagementSystem
-from src.api.fansly_client import FanslyClient
-from src.utils.config import load_config
-
-logger = logging.getLogger(__name__)
-router = APIRouter()
-
-# Initialize core systems
-personality_engine = PersonalityEngine()
-content_manager = ContentManager()
-engagement_system = EngagementSystem()
-fansly_client = FanslyClient()
-
-async def verify_webhook_signature(
-    request: Request,
-    x_fansly_signature: Optional[str] = Header(None)
-) -> bool:
-    """Verify webhook signature from Fansly"""
-    if not x_fansly_signature:
-        raise HTTPException(status_code=401, detail="Missing signature header")
-    
-    config = load_config()
-    webhook_secret = config["fansly"]["webhook_secret"]
-    
-    try:
-        body = await request.body()
-        signature = hmac.new(
-            webhook_secret.encode(),
-            body,
-            hashlib.sha256
-        ).hexdigest()
-        return hmac.compare_digest(signature, x_fansly_signature)
-    except Exception as e:
-        logger.error(f"Signature verification failed: {str(e)}")
-        return False
-
-@router.post("/webhook/fansly")
-async def fansly_webhook(
-    request: Request,
-    verified: bool = Depends(verify_webhook_signature)
-):
-    """Handle incoming webhooks from Fansly"""
-    if not verified:
-        raise HTTPException(status_code=401, detail="Invalid webhook signature")
-    
-    try:
-        payload = await request.json()
-        event_type = payload.get("type")
-        
-        response = await process_fansly_event(event_type, payload)
-        return response
-        
-    except Exception as e:
-        logger.error(f"Error processing webhook: {str(e)}")
-        raise HTTPException(status_code=500, detail="Webhook processing failed")
-
-async def process_fansly_event(event_type: str, payload: Dict) -> Dict:
-    """Process different types of Fansly events"""
-    handlers = {
-        "message": handle_message_event,
-        "subscription": handle_subscription_event,
-        "tip": handle_tip_event,
-        "comment": handle_comment_event,
-        "like": handle_like_event
-    }
-    
-    handler = handlers.get(event_type)
-    if not handler:
-        logger.warning(f"Unhandled event type: {event_type}")
-        return {"status": "ignored", "reason": "unsupported_event_type"}
-        
-    return await handler(payload)
-
-async def handle_message_event(payload: Dict) -> Dict:
-    """Handle incoming direct messages"""
-    try:
-        user_id = payload.get("user_id")
-        message = payload.get("message")
-        
-        # Generate personality-driven response
-        response = await personality_engine.generate_response(
-            prompt=message,
-            context={"user_id": user_id}
-        )
-        
-        # Send response through Fansly
-        await fansly_client.send_dm(user_id, response)
-        
-        # Track engagement
-        await engagement_system.process_interaction({
-            "type": "message",
-            "user_id": user_id,
-            "content": message,
-            "response": response,
-            "timestamp": datetime.now().isoformat()
-        })
-        
-        return {
-            "status": "success",
-            "event": "message",
-            "user_id": user_id
-        }
-        
-    except Exception as e:
-        logger.error(f"Error handling message event: {str(e)}")
-        raise
-
-async def handle_subscription_event(payload: Dict) -> Dict:
-    """Handle new subscriptions"""
-    try:
-        user_id = payload.get("user_id")
-        tier = payload.get("tier")
-        
-        # Generate welcome message
-        welcome_msg = await personality_engine.generate_response(
-            prompt="new_subscriber_welcome",
-            context={"user_id": user_id, "tier": tier}
-        )
-        
-        # Send welcome message
-        await fansly_client.send_dm(user_id, welcome_msg)
-        
-        # Track subscription
-        await engagement_system.process_interaction({
-            "type": "subscription",
-            "user_id": user_id,
-            "tier": tier,
-            "timestamp": datetime.now().isoformat()
-        })
-        
-        return {
-            "status": "success",
-            "event": "subscription",
-            "user_id": user_id,
-            "tier": tier
-        }
-        
-    except Exception as e:
-        logger.error(f"Error handling subscription event: {str(e)}")
-        raise
-
-async def handle_tip_event(payload: Dict) -> Dict:
-    """Handle tips from users"""
-    try:
-        user_id = payload.get("user_id")
-        amount = payload.get("amount")
-        
-        # Generate thank you message
-        thank_you = await personality_engine.generate_response(
-            prompt="tip_thanks",
-            context={"user_id": user_id, "amount": amount}
-        )
-        
-        # Send thank you message
-        await fansly_client.send_dm(user_id, thank_you)
-        
-        # Track tip
-        await engagement_system.process_interaction({
-            "type": "tip",
-            "user_id": user_id,
-            "amount": amount,
-            "timestamp": datetime.now().isoformat()
-        })
-        
-        return {
-            "status": "success",
-            "event": "tip",
-            "user_id": user_id,
-            "amount": amount
-        }
-        
-    except Exception as e:
-        logger.error(f"Error handling tip event: {str(e)}")
-        raise
-
-async def handle_comment_event(payload: Dict) -> Dict:
-    """Handle comments on content"""
-    try:
-        user_id = payload.get("user_id")
-        comment = payload.get("comment")
-        post_id = payload.get("post_id")
-        
-        # Generate response if needed
-        if should_respond_to_comment(comment):
-            response = await personality_engine.generate_response(
-                prompt=comment,
-                context={"user_id": user_id, "post_id": post_id}
-            )
-            await fansly_client.reply_to_comment(post_id, comment, response)
-        
-        # Track comment
-        await engagement_system.process_interaction({
-            "type": "comment",
-            "user_id": user_id,
-            "post_id": post_id,
-            "content": comment,
-            "timestamp": datetime.now().isoformat()
-        })
-        
-        return {
-            "status": "success",
-            "event": "comment",
-            "user_id": user_id,
-            "post_id": post_id
-        }
-        
-    except Exception as e:
-        logger.error(f"Error handling comment event: {str(e)}")
-        raise
-
-async def handle_like_event(payload: Dict) -> Dict:
-    """Handle likes on content"""
-    try:
-        user_id = payload.get("user_id")
-        post_id = payload.get("post_id")
-        
-        # Track like
-        await engagement_system.process_interaction({
-            "type": "like",
-            "user_id": user_id,
-            "post_id": post_id,
-            "timestamp": datetime.now().isoformat()
-        })
-        
-        return {
-            "status": "success",
-            "event": "like",
-            "user_id": user_id,
-            "post_id": post_id
-        }
-        
-    except Exception as e:
-        logger.error(f"Error handling like event: {str(e)}")
-        raise
-
-def should_respond_to_comment(comment: str) -> bool:
-    """Determine if a comment needs a response"""
-    # TODO: Implement comment response logic
+# src/api/webhook_handlers.py
+from fastapi import APIRouter, HTTPException, Request, Header, Depends
+from fastapi.responses import JSONResponse
+from typing import Any, Iterator, NamedTuple, Optional, Dict
+from contextlib import contextmanager
+import logging
+from datetime import datetime
+import json
+from src.core.registry import (
+    get_engagement_system,
+    get_fansly_client,
+    get_job_queue,
+    get_personality_engine,
+    get_rate_limiter,
+    get_webhook_dedup,
+    get_webhook_verifier,
+    get_work_queue,
+)
+from src.utils.idempotency import event_key
+from src.utils.job_queue import RetryLater
+from src.utils.rate_limiter import RateLimitExceeded
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+# Job kind for webhook events; main registers run_fansly_event_job for it
+WEBHOOK_JOB_KIND = "fansly.event"
+
+class VerifiedWebhook(NamedTuple):
+    body: bytes
+    payload: Dict[str, Any]
+
+async def verified_webhook(
+    request: Request,
+    x_fansly_signature: Optional[str] = Header(None)
+) -> VerifiedWebhook:
+    """Read the webhook body once, check its signature and parse it"""
+    if not x_fansly_signature:
+        raise HTTPException(status_code=401, detail="Missing signature header")
+    
+    verifier = get_webhook_verifier()
+    if not verifier.has_secrets:
+        logger.error("No Fansly webhook secret configured; rejecting webhook")
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    
+    body = await request.body()
+    if not verifier.verify(body, x_fansly_signature):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON payload")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Webhook payload must be a JSON object")
+    return VerifiedWebhook(body, payload)
+
+@contextmanager
+def outbound_quota(action: str) -> Iterator[None]:
+    """Take Fansly quota for a reply before generating it; give it back if the reply isn't sent"""
+    limiter = get_rate_limiter()
+    limiter.acquire("fansly", action)
+    try:
+        yield
+    except Exception:
+        limiter.release("fansly", action)
+        raise
+
+def reply_priority(payload: Dict) -> str:
+    """Priority class the reply to an event waits for the model in"""
+    return get_engagement_system().priority_for(payload.get("user_type", "follower"))
+
+def event_ordering_key(payload: Dict) -> Optional[str]:
+    """Events from the same user are processed one at a time, in order"""
+    user_id = payload.get("user_id")
+    return f"fansly:{user_id}" if user_id is not None else None
+
+@router.post("/webhook/fansly")
+async def fansly_webhook(
+    webhook: VerifiedWebhook = Depends(verified_webhook)
+):
+    """Accept a webhook from Fansly and queue it for processing
+
+    The event is stored in the job queue before we answer 202, so Fansly
+    gets a response without waiting on the model and nothing is lost if
+    we restart before it has been handled. Redeliveries of an event we
+    already accepted are acknowledged and dropped.
+    """
+    body, payload = webhook
+    
+    event_type = payload.get("type")
+    if event_type not in EVENT_HANDLERS:
+        logger.warning(f"Unhandled event type: {event_type}")
+        return {"status": "ignored", "reason": "unsupported_event_type"}
+    
+    key = event_key(payload, body)
+    dedup = get_webhook_dedup()
+    if not await dedup.claim(key):
+        logger.info("Dropped duplicate %s webhook %s", event_type, key)
+        return {"status": "duplicate", "event": event_type}
+    
+    try:
+        # The job ID doubles as a second guard should the key have expired
+        job_id = await get_job_queue().enqueue(
+            WEBHOOK_JOB_KIND, payload, job_id=f"fansly-{key}", ordering_key=event_ordering_key(payload)
+        )
+    except Exception as e:
+        logger.error(f"Error queueing webhook: {str(e)}")
+        # Let Fansly's retry through rather than dropping it as a duplicate
+        await dedup.release(key)
+        raise HTTPException(status_code=500, detail="Webhook processing failed")
+    
+    return JSONResponse(
+        status_code=202,
+        content={"status": "accepted", "event": event_type, "job_id": job_id}
+    )
+
+async def run_fansly_event_job(payload: Dict[str, Any]) -> Dict:
+    """Background job: handle a queued Fansly webhook event
+
+    Events over the outbound quota wait in the queue until a slot frees.
+    """
+    try:
+        return await process_fansly_event(payload.get("type"), payload)
+    except RateLimitExceeded as e:
+        raise RetryLater(e.retry_after, str(e))
+
+async def process_fansly_event(event_type: str, payload: Dict) -> Dict:
+    """Process different types of Fansly events"""
+    handler = EVENT_HANDLERS.get(event_type)
+    if not handler:
+        logger.warning(f"Unhandled event type: {event_type}")
+        return {"status": "ignored", "reason": "unsupported_event_type"}
+        
+    return await handler(payload)
+
+async def track_interaction(record: Dict) -> None:
+    """Record an interaction whose reply has already been sent
+
+    A failure here is logged rather than raised: failing the job would
+    make the queue retry it and send the fan a second reply.
+    """
+    try:
+        await get_engagement_system().record_interaction(record)
+    except Exception as e:
+        logger.error(f"Failed to record {record.get('type')} interaction for {record.get('user_id')}: {str(e)}")
+
+async def handle_message_event(payload: Dict) -> Dict:
+    """Handle incoming direct messages"""
+    try:
+        user_id = payload.get("user_id")
+        engine = get_personality_engine()
+        message = engine.prompt_builder.clip_message("webhook", payload.get("message") or "")
+        
+        with outbound_quota("message"):
+            # Generate personality-driven response
+            async with get_work_queue().slot(reply_priority(payload)):
+                response = await engine.generate_response(
+                    prompt=message,
+                    context={"user_id": user_id},
+                    request_type="webhook"
+                )
+            
+            # Send response through Fansly
+            await get_fansly_client().send_dm(user_id, response)
+        
+        # Track engagement
+        await track_interaction({
+            "type": "message",
+            "platform": "fansly",
+            "user_id": user_id,
+            "message": message,
+            "response": response,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+        return {
+            "status": "success",
+            "event": "message",
+            "user_id": user_id
+        }
+        
+    except RateLimitExceeded:
+        raise
+    except Exception as e:
+        logger.error(f"Error handling message event: {str(e)}")
+        raise
+
+async def handle_subscription_event(payload: Dict) -> Dict:
+    """Handle new subscriptions"""
+    try:
+        user_id = payload.get("user_id")
+        tier = payload.get("tier")
+        
+        with outbound_quota("message"):
+            # Generate welcome message
+            async with get_work_queue().slot(reply_priority(payload)):
+                welcome_msg = await get_personality_engine().generate_response(
+                    prompt="new_subscriber_welcome",
+                    context={"user_id": user_id, "tier": tier},
+                    request_type="webhook"
+                )
+            
+            # Send welcome message
+            await get_fansly_client().send_dm(user_id, welcome_msg)
+        
+        # Track subscription
+        await track_interaction({
+            "type": "subscription",
+            "platform": "fansly",
+            "user_id": user_id,
+            "response": welcome_msg,
+            "tier": tier,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+        return {
+            "status": "success",
+            "event": "subscription",
+            "user_id": user_id,
+            "tier": tier
+        }
+        
+    except RateLimitExceeded:
+        raise
+    except Exception as e:
+        logger.error(f"Error handling subscription event: {str(e)}")
+        raise
+
+async def handle_tip_event(payload: Dict) -> Dict:
+    """Handle tips from users"""
+    try:
+        user_id = payload.get("user_id")
+        amount = payload.get("amount")
+        
+        with outbound_quota("message"):
+            # Generate thank you message
+            async with get_work_queue().slot(reply_priority(payload)):
+                thank_you = await get_personality_engine().generate_response(
+                    prompt="tip_thanks",
+                    context={"user_id": user_id, "amount": amount},
+                    request_type="webhook"
+                )
+            
+            # Send thank you message
+            await get_fansly_client().send_dm(user_id, thank_you)
+        
+        # Track tip
+        await track_interaction({
+            "type": "tip",
+            "platform": "fansly",
+            "user_id": user_id,
+            "response": thank_you,
+            "amount": amount,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+        return {
+            "status": "success",
+            "event": "tip",
+            "user_id": user_id,
+            "amount": amount
+        }
+        
+    except RateLimitExceeded:
+        raise
+    except Exception as e:
+        logger.error(f"Error handling tip event: {str(e)}")
+        raise
+
+async def handle_comment_event(payload: Dict) -> Dict:
+    """Handle comments on content"""
+    try:
+        user_id = payload.get("user_id")
+        engine = get_personality_engine()
+        comment = engine.prompt_builder.clip_message("webhook", payload.get("comment") or "")
+        post_id = payload.get("post_id")
+        
+        # Generate response if needed
+        response = None
+        if should_respond_to_comment(comment):
+            with outbound_quota("comment"):
+                async with get_work_queue().slot(reply_priority(payload)):
+                    response = await engine.generate_response(
+                        prompt=comment,
+                        context={"user_id": user_id, "post_id": post_id},
+                        cache_namespace="fansly:comment",
+                        request_type="webhook"
+                    )
+                await get_fansly_client().reply_to_comment(post_id, comment, response)
+        
+        # Track comment
+        await track_interaction({
+            "type": "comment",
+            "platform": "fansly",
+            "user_id": user_id,
+            "post_id": post_id,
+            "message": comment,
+            "response": response,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+        return {
+            "status": "success",
+            "event": "comment",
+            "user_id": user_id,
+            "post_id": post_id
+        }
+        
+    except RateLimitExceeded:
+        raise
+    except Exception as e:
+        logger.error(f"Error handling comment event: {str(e)}")
+        raise
+
+async def handle_like_event(payload: Dict) -> Dict:
+    """Handle likes on content"""
+    try:
+        user_id = payload.get("user_id")
+        post_id = payload.get("post_id")
+        
+        # Track like
+        await get_engagement_system().record_interaction({
+            "type": "like",
+            "platform": "fansly",
+            "user_id": user_id,
+            "post_id": post_id,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+        return {
+            "status": "success",
+            "event": "like",
+            "user_id": user_id,
+            "post_id": post_id
+        }
+        
+    except Exception as e:
+        logger.error(f"Error handling like event: {str(e)}")
+        raise
+
+EVENT_HANDLERS = {
+    "message": handle_message_event,
+    "subscription": handle_subscription_event,
+    "tip": handle_tip_event,
+    "comment": handle_comment_event,
+    "like": handle_like_event
+}
+
+def should_respond_to_comment(comment: str) -> bool:
+    """Determine if a comment needs a response"""
+    # TODO: Implement comment response logic
     return True
\ No newline at end of file
@@ -0,0 +1,68 @@
+# src/api/webhook_signing.py
+from typing import Dict, List, Optional
+import hashlib
+import hmac
+import logging
+import os
+from src.utils.config import load_config, subscribe
+
+logger = logging.getLogger(__name__)
+
+SECRET_ENV_VAR = "FANSLY_WEBHOOK_SECRET"
+
+def configured_secrets(config: Dict) -> List[str]:
+    """Active webhook secrets, newest first
+
+    FANSLY_WEBHOOK_SECRET may hold several comma-separated secrets; the
+    fansly config section may add more under webhook_secrets. Keeping the
+    old secret listed while Fansly switches over lets keys be rotated
+    without rejecting webhooks.
+    """
+    secrets = [s.strip() for s in os.getenv(SECRET_ENV_VAR, "").split(",")]
+    fansly_config = config["system"].get("fansly", {})
+    secrets.extend(fansly_config.get("webhook_secrets", []))
+    if fansly_config.get("webhook_secret"):
+        secrets.append(fansly_config["webhook_secret"])
+    # Drop blanks and repeats but keep the order
+    return list(dict.fromkeys(s for s in secrets if s))
+
+class WebhookVerifier:
+    """Checks HMAC-SHA256 webhook signatures against the active secrets
+
+    An HMAC keyed with each secret is built once and copied per request,
+    so verifying doesn't re-encode or re-hash the key every time. The
+    keys are rebuilt when the config is reloaded.
+    """
+
+    def __init__(self, secrets: Optional[List[str]] = None):
+        self._keyed: List["hmac.HMAC"] = []
+        self.set_secrets(secrets or [])
+
+    @classmethod
+    def from_config(cls) -> "WebhookVerifier":
+        verifier = cls(configured_secrets(load_config()))
+        subscribe(verifier._on_config_reload)
+        return verifier
+
+    @property
+    def has_secrets(self) -> bool:
+        return bool(self._keyed)
+
+    def set_secrets(self, secrets: List[str]) -> None:
+        self._keyed = [hmac.new(secret.encode(), digestmod=hashlib.sha256) for secret in secrets]
+
+    def _on_config_reload(self, config: Dict) -> None:
+        self.set_secrets(configured_secrets(config))
+
+    def verify(self, body: bytes, signature: str) -> bool:
+        """True if signature is the hex HMAC of body under any active secret"""
+        try:
+            expected = bytes.fromhex(signature)
+        except ValueError:
+            return False
+        for keyed in self._keyed:
+            mac = keyed.copy()
+            mac.update(body)
+            if hmac.compare_digest(mac.digest(), expected):
+                return True
+        return False
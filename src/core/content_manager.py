@@ -1,77 +1,148 @@
-# src/core/content_manager.py
-from typing import Dict, Optional, List
-import logging
-from datetime import datetime
-import os
-import json
-from src.utils.config import load_config
-from src.core.personality import PersonalityEngine
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-logger = logging.getLogger(__name__)
-
-class ContentManager:
-    def __init__(self):
-        self.config = load_config()["personality"]
-        self.post_templates = self.config["content_preferences"]
-        self.personality = PersonalityEngine()
-        
-    async def generate_content(self, content_type: str, params: Optional[Dict] = None) -> Dict:
-        """Generate new content including text and images"""
-        try:
-            # Get content preferences
-            topics = self.post_templates["topics"]
-            content_style = self.post_templates["content_style"]
-            
-            # Create prompt for content generation
-            if content_type == "post":
-                prompt = f"""Create a social media post about one of these topics: {', '.join(topics[:3])}.
-                The post should be {content_style['text_length']['medium']} in length.
-                Use a {content_style['tone_variations'][0]} tone.
-                Include hashtags at the end."""
-            elif content_type == "story":
-                prompt = f"""Create a short story or anecdote about {topics[0]} or {topics[1]}.
-                Keep it brief and engaging, perfect for a social media story.
-                Use a {content_style['tone_variations'][1]} tone."""
-            elif content_type == "reply":
-                prompt = f"""Create a reply to a fan who said: '{params.get('comment', 'I love your content!')}' 
-                Keep it personal and authentic.
-                Use a {content_style['tone_variations'][2]} tone."""
-            else:
-                prompt = f"""Create some engaging content about {topics[0]}.
-                Make it {content_style['text_length']['short']} in length.
-                Use a {content_style['tone_variations'][3]} tone."""
-            
-            # Generate content using personality engine
-            content_text = await self.personality.generate_response(prompt)
-            
-            logger.info(f"Generated {content_type} content")
-            return {
-                "type": content_type,
-                "text": content_text,
-                "image_url": None,  # No image generation in MVP
-                "created_at": datetime.now().isoformat(),
-                "topics": topics[:3],
-                "tone": content_style['tone_variations'][0]
-            }
-        except Exception as e:
-            logger.error(f"Error generating content: {str(e)}")
-            raise
-            
-    async def schedule_content(self, content: Dict, publish_time: Optional[str] = None) -> Dict:
-        """Schedule content for publishing (simplified for MVP)"""
-        try:
-            # For MVP, we'll just return the content with a scheduled time
-            scheduled_time = publish_time or (datetime.now().isoformat())
-            
-            return {
-                **content,
-                "scheduled_for": scheduled_time,
-                "status": "scheduled"
-            }
-        except Exception as e:
-            logger.error(f"Error scheduling content: {str(e)}")
+# src/core/content_manager.py
+from typing import AsyncIterator, Dict, Optional, List
+import asyncio
+import logging
+from contextlib import aclosing
+from datetime import datetime
+import os
+import json
+from src.utils.config import load_config, subscribe
+from src.core.personality import PersonalityEngine
+from src.core.registry import get_personality_engine, get_scheduler
+from src.utils.scheduler import Scheduler
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_CONCURRENCY = 4
+DEFAULT_BATCH_MAX_ITEMS = 50
+
+class ContentManager:
+    def __init__(self, personality: Optional[PersonalityEngine] = None, scheduler: Optional[Scheduler] = None):
+        self.config = load_config()["personality"]
+        self.post_templates = self.config["content_preferences"]
+        self.personality = personality or get_personality_engine()
+        self.scheduler = scheduler or get_scheduler()
+        self._load_batch_limits(load_config())
+        
+        subscribe(self._on_config_reload)
+    
+    def _load_batch_limits(self, config: Dict) -> None:
+        batch_config = config.get("system", {}).get("content_batch", {})
+        self.batch_max_concurrency = batch_config.get("max_concurrency", DEFAULT_BATCH_CONCURRENCY)
+        self.batch_max_items = batch_config.get("max_items", DEFAULT_BATCH_MAX_ITEMS)
+    
+    def _on_config_reload(self, config: Dict) -> None:
+        """Refresh content preferences from a reloaded config file"""
+        self.config = config["personality"]
+        self.post_templates = self.config["content_preferences"]
+        self._load_batch_limits(config)
+        
+    def _build_prompt(self, content_type: str, params: Optional[Dict] = None) -> str:
+        """Create the generation prompt for a type of content"""
+        params = params or {}
+        topics = self.post_templates["topics"]
+        content_style = self.post_templates["content_style"]
+        
+        if content_type == "post":
+            prompt = f"""Create a social media post about one of these topics: {', '.join(topics[:3])}.
+            The post should be {content_style['text_length']['medium']} in length.
+            Use a {content_style['tone_variations'][0]} tone.
+            Include hashtags at the end."""
+        elif content_type == "story":
+            prompt = f"""Create a short story or anecdote about {topics[0]} or {topics[1]}.
+            Keep it brief and engaging, perfect for a social media story.
+            Use a {content_style['tone_variations'][1]} tone."""
+        elif content_type == "reply":
+            comment = self.personality.prompt_builder.clip_message(
+                "content", params.get('comment', 'I love your content!')
+            )
+            prompt = f"""Create a reply to a fan who said: '{comment}' 
+            Keep it personal and authentic.
+            Use a {content_style['tone_variations'][2]} tone."""
+        else:
+            prompt = f"""Create some engaging content about {topics[0]}.
+            Make it {content_style['text_length']['short']} in length.
+            Use a {content_style['tone_variations'][3]} tone."""
+        return prompt
+    
+    async def generate_content(self, content_type: str, params: Optional[Dict] = None) -> Dict:
+        """Generate new content including text and images"""
+        try:
+            # Get content preferences
+            topics = self.post_templates["topics"]
+            content_style = self.post_templates["content_style"]
+            prompt = self._build_prompt(content_type, params)
+            
+            # Generate content using personality engine
+            content_text = await self.personality.generate_response(prompt, request_type="content")
+            
+            logger.info("Generated %s content", content_type)
+            return {
+                "type": content_type,
+                "text": content_text,
+                "image_url": None,  # No image generation in MVP
+                "created_at": datetime.now().isoformat(),
+                "topics": topics[:3],
+                "tone": content_style['tone_variations'][0]
+            }
+        except Exception as e:
+            logger.error(f"Error generating content: {str(e)}")
+            raise
+    
+    async def stream_content(self, content_type: str, params: Optional[Dict] = None) -> AsyncIterator[str]:
+        """Stream generated content text as it is produced"""
+        prompt = self._build_prompt(content_type, params)
+        async with aclosing(self.personality.stream_response(prompt, request_type="content")) as stream:
+            async for chunk in stream:
+                yield chunk
+        logger.info("Streamed %s content", content_type)
+            
+    async def generate_batch(self, specs: List[Dict], max_concurrency: Optional[int] = None) -> AsyncIterator[Dict]:
+        """Generate several pieces of content concurrently
+        
+        Yields one result per spec as soon as it completes, so results are
+        not in input order; each carries the spec's index and either the
+        generated content or the error that item failed with. Closing the
+        iterator cancels the items still in progress.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.batch_max_concurrency)
+        
+        async def run(index: int, spec: Dict) -> Dict:
+            async with semaphore:
+                try:
+                    content = await self.generate_content(spec.get("content_type", "post"), spec)
+                    return {"index": index, "success": True, "content": content}
+                except Exception as e:
+                    logger.error(f"Batch item {index} failed: {str(e)}")
+                    return {"index": index, "success": False, "message": str(e)}
+        
+        tasks = [asyncio.create_task(run(index, spec)) for index, spec in enumerate(specs)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def schedule_content(self, content: Dict, publish_time: Optional[str] = None) -> Dict:
+        """Schedule content to be posted to Fansly at publish_time (default: now)"""
+        try:
+            item = await self.scheduler.schedule(
+                "content.publish",
+                {"content": content},
+                publish_time or datetime.now()
+            )
+            
+            return {
+                **content,
+                "schedule_id": item["id"],
+                "scheduled_for": item["scheduled_for"],
+                "status": "scheduled"
+            }
+        except Exception as e:
+            logger.error(f"Error scheduling content: {str(e)}")
             raise
\ No newline at end of file
@@ -0,0 +1,247 @@
+# src/core/conversation_memory.py
+from typing import Any, Dict, List, Set
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+import asyncio
+import logging
+from datetime import datetime
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from src.utils.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_TURNS = 10
+DEFAULT_MAX_USERS = 10000
+DEFAULT_MAX_TOTAL_TOKENS = 2_000_000
+DEFAULT_SUMMARY_MAX_TOKENS = 200
+# Characters kept from each side of an exchange when folding it into the summary
+SUMMARY_SNIPPET_CHARS = 80
+
+@dataclass(slots=True)
+class Turn:
+    """One fan message and the response to it"""
+    message: str
+    response: str
+    tokens: int
+    timestamp: str
+
+class UserMemory:
+    """Sliding window of recent turns plus a summary of older ones"""
+    __slots__ = ("user_id", "turns", "summary", "summary_tokens", "turn_tokens", "summary_dirty")
+
+    def __init__(self, user_id: str, window_turns: int):
+        self.user_id = user_id
+        self.turns: deque = deque(maxlen=window_turns)
+        self.summary = ""
+        self.summary_tokens = 0
+        self.turn_tokens = 0
+        self.summary_dirty = False
+
+    @property
+    def tokens(self) -> int:
+        return self.summary_tokens + self.turn_tokens
+
+class ConversationMemoryStore:
+    """Per-fan conversation memory with an LRU over hot users
+
+    Each exchange is queued for the conversations collection through the
+    database's write-behind buffer. Users are evicted least-recently-used
+    first once max_users or max_total_tokens is exceeded; their summary
+    is spilled to the database and reloaded, along with the latest turns,
+    on next use. Reloading a user evicted since the last flush writes
+    out the buffer first so none of their turns are missed.
+    """
+
+    def __init__(
+        self,
+        database: Any = None,
+        window_turns: int = DEFAULT_WINDOW_TURNS,
+        max_users: int = DEFAULT_MAX_USERS,
+        max_total_tokens: int = DEFAULT_MAX_TOTAL_TOKENS,
+        summary_max_tokens: int = DEFAULT_SUMMARY_MAX_TOKENS
+    ):
+        self.database = database
+        self.window_turns = window_turns
+        self.max_users = max_users
+        self.max_total_tokens = max_total_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self._users: "OrderedDict[str, UserMemory]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Task] = {}
+        # Users evicted since the last flush, whose writes may still be buffered
+        self._unflushed: Set[str] = set()
+        self.total_tokens = 0
+        self.total_turns = 0
+        self.loads = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, memory_config: Dict, database: Any = None) -> "ConversationMemoryStore":
+        """Build a store from the conversation_memory section of system_config.json"""
+        return cls(
+            database=database,
+            window_turns=memory_config.get("window_turns", DEFAULT_WINDOW_TURNS),
+            max_users=memory_config.get("max_users", DEFAULT_MAX_USERS),
+            max_total_tokens=memory_config.get("max_total_tokens", DEFAULT_MAX_TOTAL_TOKENS),
+            summary_max_tokens=memory_config.get("summary_max_tokens", DEFAULT_SUMMARY_MAX_TOKENS)
+        )
+
+    async def get(self, user_id: str) -> UserMemory:
+        """Get a user's memory, loading it from the database on a miss"""
+        memory = self._users.get(user_id)
+        if memory is not None:
+            self._users.move_to_end(user_id)
+            return memory
+
+        # Share one load between concurrent requests for the same user
+        task = self._loading.get(user_id)
+        if task is None:
+            task = asyncio.ensure_future(self._load(user_id))
+            self._loading[user_id] = task
+        try:
+            memory = await asyncio.shield(task)
+        finally:
+            self._loading.pop(user_id, None)
+
+        if user_id not in self._users:
+            self._users[user_id] = memory
+            self.total_tokens += memory.tokens
+            self.total_turns += len(memory.turns)
+            await self._evict()
+        return self._users.get(user_id, memory)
+
+    async def add_exchange(self, user_id: str, message: str, response: str) -> None:
+        """Record a fan message and the response sent back"""
+        memory = await self.get(user_id)
+        turn = Turn(
+            message=message,
+            response=response,
+            tokens=count_tokens(message) + count_tokens(response),
+            timestamp=datetime.now().isoformat()
+        )
+        if len(memory.turns) == memory.turns.maxlen:
+            self._fold_into_summary(memory, memory.turns[0])
+        before, turns_before = memory.tokens, len(memory.turns)
+        memory.turns.append(turn)
+        memory.turn_tokens = sum(t.tokens for t in memory.turns)
+        self.total_tokens += memory.tokens - before
+        self.total_turns += len(memory.turns) - turns_before
+
+        if self.database is not None:
+            try:
+                await self.database.store_conversation({
+                    "user_id": user_id,
+                    "kind": "turn",
+                    "message": message,
+                    "response": response,
+                    "tokens": turn.tokens,
+                    "timestamp": turn.timestamp
+                }, buffered=True)
+            except Exception as e:
+                logger.error(f"Failed to persist conversation turn for {user_id}: {str(e)}")
+
+        await self._evict()
+
+    def history_messages(self, memory: UserMemory) -> List[BaseMessage]:
+        """Render a user's memory as chat messages for the prompt"""
+        messages: List[BaseMessage] = []
+        if memory.summary:
+            messages.append(SystemMessage(content=f"Earlier conversation with this fan: {memory.summary}"))
+        for turn in memory.turns:
+            messages.append(HumanMessage(content=turn.message))
+            messages.append(AIMessage(content=turn.response))
+        return messages
+
+    def _fold_into_summary(self, memory: UserMemory, turn: Turn) -> None:
+        """Compact the oldest turn into the running summary"""
+        snippet = (
+            f"Fan said \"{turn.message[:SUMMARY_SNIPPET_CHARS]}\", "
+            f"you replied \"{turn.response[:SUMMARY_SNIPPET_CHARS]}\"."
+        )
+        summary = f"{memory.summary} {snippet}".strip()
+        # Keep the most recent part of the summary within budget
+        while count_tokens(summary) > self.summary_max_tokens and ". " in summary:
+            summary = summary.split(". ", 1)[1]
+        self.total_tokens -= memory.summary_tokens
+        memory.summary = summary
+        memory.summary_tokens = count_tokens(summary)
+        memory.summary_dirty = True
+        self.total_tokens += memory.summary_tokens
+
+    async def _load(self, user_id: str) -> UserMemory:
+        memory = UserMemory(user_id, self.window_turns)
+        if self.database is None:
+            return memory
+
+        self.loads += 1
+        try:
+            if user_id in self._unflushed:
+                await self.database.flush()
+                self._unflushed.clear()
+            summary_page = await self.database.find_page(
+                "conversations", {"user_id": user_id, "kind": "summary"}, limit=1
+            )
+            if summary_page["items"]:
+                memory.summary = summary_page["items"][0].get("summary", "")
+                memory.summary_tokens = count_tokens(memory.summary)
+
+            turns_page = await self.database.find_page(
+                "conversations", {"user_id": user_id, "kind": "turn"}, limit=self.window_turns
+            )
+            for doc in reversed(turns_page["items"]):
+                memory.turns.append(Turn(
+                    message=doc.get("message", ""),
+                    response=doc.get("response", ""),
+                    tokens=doc.get("tokens") or count_tokens(doc.get("message", "")) + count_tokens(doc.get("response", "")),
+                    timestamp=doc.get("timestamp", "")
+                ))
+            memory.turn_tokens = sum(t.tokens for t in memory.turns)
+        except Exception as e:
+            logger.error(f"Failed to load conversation memory for {user_id}: {str(e)}")
+        return memory
+
+    async def _evict(self) -> None:
+        """Drop least-recently-used users until under the memory caps"""
+        while len(self._users) > 1 and (
+            len(self._users) > self.max_users or self.total_tokens > self.max_total_tokens
+        ):
+            user_id, memory = self._users.popitem(last=False)
+            self.total_tokens -= memory.tokens
+            self.total_turns -= len(memory.turns)
+            self.evictions += 1
+            await self._spill(memory)
+            if self.database is not None:
+                self._unflushed.add(user_id)
+        if len(self._unflushed) > self.max_users:
+            # Keep the set bounded when evicted users don't come back
+            await self.database.flush()
+            self._unflushed.clear()
+
+    async def _spill(self, memory: UserMemory) -> None:
+        if self.database is None or not memory.summary_dirty:
+            return
+        try:
+            await self.database.store_conversation({
+                "user_id": memory.user_id,
+                "kind": "summary",
+                "summary": memory.summary,
+                "timestamp": datetime.now().isoformat()
+            })
+            memory.summary_dirty = False
+        except Exception as e:
+            logger.error(f"Failed to spill conversation summary for {memory.user_id}: {str(e)}")
+
+    async def persist_all(self) -> None:
+        """Write out every unsaved summary (e.g. on shutdown)"""
+        for memory in list(self._users.values()):
+            await self._spill(memory)
+
+    def stats(self) -> Dict:
+        return {
+            "users": len(self._users),
+            "turns": self.total_turns,
+            "total_tokens": self.total_tokens,
+            "max_users": self.max_users,
+            "max_total_tokens": self.max_total_tokens,
+            "loads": self.loads,
+            "evictions": self.evictions
+        }
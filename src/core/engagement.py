@@ -1,115 +1,286 @@
-# src/core/engagement.py
-from typing import Dict, Optional, List
-import logging
-from datetime import datetime
-import json
-import os
-from src.utils.config import load_config
-from src.core.personality import PersonalityEngine
-
-logger = logging.getLogger(__name__)
-
-class EngagementSystem:
-    def __init__(self):
-        self.config = load_config()["personality"]
-        self.engagement_rules = self.config["engagement_rules"]
-        self.personality = PersonalityEngine()
-        self.recent_interactions = []
-        self.max_stored_interactions = 20
-        self.platforms = ["x", "fansly"]  # Supported platforms
-        
-        # Map user types to priority values
-        self.user_type_map = {
-            "follower": "subscribers",  # Map follower to subscribers
-            "visitor": "new_users",     # Map visitor to new_users
-            "regular": "regular_engagers"  # Map regular to regular_engagers
-        }
-
-    async def process_interaction(self, interaction_data: Dict) -> Dict:
-        """Process and respond to user interactions"""
-        try:
-            # Extract interaction details
-            interaction_type = interaction_data.get("type", "comment")
-            user_id = interaction_data.get("user_id", "anonymous")
-            user_message = interaction_data.get("message", "")
-            user_type = interaction_data.get("user_type", "follower")
-            platform = interaction_data.get("platform", "x")
-            
-            logger.info(f"Processing {interaction_type} from {user_type} on {platform}: {user_message[:50]}...")
-            
-            # Determine response priority based on user type with mapping
-            mapped_user_type = self.user_type_map.get(user_type, "new_users")
-            priority = self.engagement_rules["response_priority"].get(
-                mapped_user_type, self.engagement_rules["response_priority"]["new_users"]
-            )
-            
-            # Create prompt for response generation based on interaction type
-            if interaction_type == "directMessage":
-                prompt = f"""This is a direct message from a {user_type} on {platform}: "{user_message}"
-                Respond in a personal and engaging way that fits the platform {platform}.
-                The user is a {user_type} so give them {priority} priority attention."""
-            elif interaction_type == "comment":
-                prompt = f"""This is a comment on your {platform} post: "{user_message}"
-                Respond in a way that encourages further engagement on {platform}.
-                The user is a {user_type} so give them {priority} priority attention."""
-            elif interaction_type == "mention":
-                prompt = f"""You've been mentioned on {platform}: "{user_message}"
-                Respond in a way that's appropriate for a public mention on {platform}.
-                The user is a {user_type} so give them {priority} priority attention."""
-            else:
-                prompt = f"""Respond to this user interaction on {platform}: "{user_message}"
-                Be authentic and on-brand in your response.
-                The user is a {user_type} so give them {priority} priority attention."""
-            
-            # Generate response using personality engine
-            response_text = await self.personality.generate_response(prompt)
-            
-            # Store interaction for history
-            interaction_record = {
-                "id": f"int_{datetime.now().timestamp()}",
-                "user_id": user_id,
-                "user_type": user_type,
-                "platform": platform,
-                "interaction_type": interaction_type,
-                "message": user_message,
-                "response": response_text,
-                "priority": priority,
-                "processed_at": datetime.now().isoformat()
-            }
-            
-            self._store_interaction(interaction_record)
-            
-            logger.info(f"Processed {interaction_type} from {user_id} - Response length: {len(response_text)}")
-            
-            return {
-                "status": "success",
-                "response": response_text,
-                "user_id": user_id,
-                "interaction_type": interaction_type,
-                "platform": platform,
-                "processed_at": datetime.now().isoformat(),
-                "priority": priority
-            }
-        except Exception as e:
-            logger.error(f"Error processing interaction: {str(e)}")
-            raise
-    
-    def _store_interaction(self, interaction: Dict):
-        """Store interaction in recent history"""
-        self.recent_interactions.insert(0, interaction)  # Add to beginning of list
-        if len(self.recent_interactions) > self.max_stored_interactions:
-            self.recent_interactions = self.recent_interactions[:self.max_stored_interactions]
-            
-    async def get_engagement_stats(self) -> Dict:
-        """Get current engagement statistics"""
-        return {
-            "response_times": self.engagement_rules["response_priority"],
-            "interaction_limits": self.engagement_rules["interaction_limits"],
-            "platforms": self.platforms,
-            "recent_count": len(self.recent_interactions),
-            "last_updated": datetime.now().isoformat()
-        }
-        
-    async def get_recent_interactions(self, limit: int = 10) -> List[Dict]:
-        """Get recent interactions history"""
-        return self.recent_interactions[:limit]
\ No newline at end of file
+# src/core/engagement.py
+from typing import Any, Dict, Optional, List
+from dataclasses import dataclass
+import logging
+from datetime import datetime
+import json
+import os
+from src.utils.config import load_config, subscribe
+from src.core.engagement_analytics import EngagementAnalytics
+from src.core.personality import PersonalityEngine
+from src.core.registry import get_engagement_analytics, get_personality_engine, get_rate_limiter, get_work_queue
+from src.utils.priority_queue import PriorityWorkQueue
+from src.utils.rate_limiter import RateLimiter, RateLimitExceeded
+from src.utils.ring_buffer import RingBuffer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_CAPACITY = 1000
+
+# Outbound rate-limited action each interaction type's reply counts against
+INTERACTION_ACTIONS = {
+    "directMessage": "message",
+    "comment": "comment",
+    "mention": "comment",
+}
+
+# Fields every stored interaction may carry; anything else is kept in extra
+RECORD_FIELDS = (
+    "id", "interaction_type", "processed_at", "user_id", "user_type", "platform", "message", "response", "priority"
+)
+
+@dataclass(slots=True)
+class InteractionRecord:
+    """One handled interaction; fields outside the common set go in extra"""
+    id: str
+    interaction_type: str
+    processed_at: str
+    user_id: Optional[str] = None
+    user_type: Optional[str] = None
+    platform: Optional[str] = None
+    message: Optional[str] = None
+    response: Optional[str] = None
+    priority: Optional[str] = None
+    extra: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "InteractionRecord":
+        fields = {key: data.get(key) for key in RECORD_FIELDS}
+        extra = {key: value for key, value in data.items() if key not in RECORD_FIELDS}
+        return cls(**fields, extra=extra or None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {key: getattr(self, key) for key in RECORD_FIELDS if getattr(self, key) is not None}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+class EngagementSystem:
+    def __init__(
+        self,
+        personality: Optional[PersonalityEngine] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        work_queue: Optional[PriorityWorkQueue] = None,
+        database: Any = None,
+        history_capacity: Optional[int] = None,
+        analytics: Optional[EngagementAnalytics] = None
+    ):
+        config = load_config()
+        self.config = config["personality"]
+        self.engagement_rules = self.config["engagement_rules"]
+        self.personality = personality or get_personality_engine()
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        # Generation waits here so subscribers are answered before visitors
+        self.work_queue = work_queue or get_work_queue()
+        # The newest interactions stay in memory; older ones are spilled to
+        # the user_interactions collection as they fall out of the window
+        self.database = database
+        self.history_capacity = history_capacity or config.get("system", {}).get(
+            "interaction_history", {}
+        ).get("capacity", DEFAULT_HISTORY_CAPACITY)
+        self.recent_interactions: RingBuffer[InteractionRecord] = RingBuffer(self.history_capacity)
+        self.analytics = analytics or get_engagement_analytics()
+        self.platforms = ["x", "fansly"]  # Supported platforms
+        
+        # Map user types to priority values
+        self.user_type_map = {
+            "follower": "subscribers",  # Map follower to subscribers
+            "visitor": "new_users",     # Map visitor to new_users
+            "regular": "regular_engagers"  # Map regular to regular_engagers
+        }
+        
+        subscribe(self._on_config_reload)
+    
+    def _on_config_reload(self, config: Dict) -> None:
+        """Refresh engagement rules from a reloaded config file"""
+        self.config = config["personality"]
+        self.engagement_rules = self.config["engagement_rules"]
+        self.rate_limiter.set_limits(
+            RateLimiter.limits_from_config(self.engagement_rules.get("interaction_limits", {}))
+        )
+
+    def user_class(self, user_type: str) -> str:
+        """Engagement class ("subscribers", "new_users", ...) for a user type"""
+        return self.user_type_map.get(user_type, "new_users")
+
+    def priority_for(self, user_type: str) -> str:
+        """Response priority ("high", "medium", ...) for a user type"""
+        mapped_user_type = self.user_class(user_type)
+        return self.engagement_rules["response_priority"].get(
+            mapped_user_type, self.engagement_rules["response_priority"]["new_users"]
+        )
+
+    async def process_interaction(self, interaction_data: Dict) -> Dict:
+        """Process and respond to user interactions
+
+        Raises RateLimitExceeded, before any generation, when the reply
+        would go over the platform's quota for its action.
+        """
+        try:
+            # Extract interaction details
+            interaction_type = interaction_data.get("type", "comment")
+            user_id = interaction_data.get("user_id", "anonymous")
+            # Clip oversized fan messages before they reach the prompt
+            user_message = self.personality.prompt_builder.clip_message(
+                "interaction", interaction_data.get("message", "")
+            )
+            user_type = interaction_data.get("user_type", "follower")
+            platform = interaction_data.get("platform", "x")
+            
+            logger.debug("Processing %s from %s on %s: %.50s...", interaction_type, user_type, platform, user_message)
+            
+            # Determine response priority based on user type with mapping
+            priority = self.priority_for(user_type)
+            
+            # Create prompt for response generation based on interaction type
+            if interaction_type == "directMessage":
+                prompt = f"""This is a direct message from a {user_type} on {platform}: "{user_message}"
+                Respond in a personal and engaging way that fits the platform {platform}.
+                The user is a {user_type} so give them {priority} priority attention."""
+            elif interaction_type == "comment":
+                prompt = f"""This is a comment on your {platform} post: "{user_message}"
+                Respond in a way that encourages further engagement on {platform}.
+                The user is a {user_type} so give them {priority} priority attention."""
+            elif interaction_type == "mention":
+                prompt = f"""You've been mentioned on {platform}: "{user_message}"
+                Respond in a way that's appropriate for a public mention on {platform}.
+                The user is a {user_type} so give them {priority} priority attention."""
+            else:
+                prompt = f"""Respond to this user interaction on {platform}: "{user_message}"
+                Be authentic and on-brand in your response.
+                The user is a {user_type} so give them {priority} priority attention."""
+            
+            # Don't spend an LLM call on a reply we aren't allowed to send
+            action = INTERACTION_ACTIONS.get(interaction_type, "message")
+            self.rate_limiter.acquire(platform, action)
+            
+            # Generate response using personality engine. Public interactions
+            # are served from the response cache when repeated; direct
+            # messages get the fan's conversation memory instead.
+            try:
+                async with self.work_queue.slot(priority):
+                    if interaction_type == "directMessage":
+                        response_text = await self.personality.generate_response(
+                            prompt,
+                            context={"user_id": user_id, "message": user_message},
+                            request_type="interaction"
+                        )
+                    else:
+                        response_text = await self.personality.generate_response(
+                            prompt,
+                            cache_namespace=f"{interaction_type}:{platform}:{user_type}",
+                            cache_text=user_message,
+                            request_type="interaction"
+                        )
+            except Exception:
+                # Nothing will be sent, so give the quota back
+                self.rate_limiter.release(platform, action)
+                raise
+            
+            # Store interaction for history
+            interaction_record = {
+                "id": f"int_{datetime.now().timestamp()}",
+                "user_id": user_id,
+                "user_type": user_type,
+                "platform": platform,
+                "interaction_type": interaction_type,
+                "message": user_message,
+                "response": response_text,
+                "priority": priority,
+                "processed_at": datetime.now().isoformat()
+            }
+            
+            await self._store_interaction(interaction_record)
+            
+            logger.info("Processed %s from %s - Response length: %d", interaction_type, user_id, len(response_text))
+            
+            return {
+                "status": "success",
+                "response": response_text,
+                "user_id": user_id,
+                "interaction_type": interaction_type,
+                "platform": platform,
+                "processed_at": datetime.now().isoformat(),
+                "priority": priority
+            }
+        except RateLimitExceeded as e:
+            logger.info("Deferring %s reply: %s", interaction_data.get("type", "comment"), e)
+            raise
+        except Exception as e:
+            logger.error(f"Error processing interaction: {str(e)}")
+            raise
+    
+    async def record_interaction(self, interaction_data: Dict) -> Dict:
+        """Record an interaction that was already answered (or needs no answer)"""
+        record = {key: value for key, value in interaction_data.items() if key != "type"}
+        record.update({
+            "id": f"int_{datetime.now().timestamp()}",
+            "interaction_type": interaction_data.get("type", "comment"),
+            "processed_at": datetime.now().isoformat()
+        })
+        await self._store_interaction(record)
+        return record
+
+    async def _store_interaction(self, interaction: Dict):
+        """Store interaction in recent history, spilling the oldest one once full"""
+        self.analytics.record(
+            interaction.get("platform") or "unknown",
+            interaction.get("interaction_type") or "unknown",
+            self.user_class(interaction["user_type"]) if interaction.get("user_type") else "unknown"
+        )
+        evicted = self.recent_interactions.append(InteractionRecord.from_dict(interaction))
+        if evicted is not None:
+            await self._spill(evicted)
+
+    async def _spill(self, record: InteractionRecord) -> None:
+        if self.database is None:
+            return
+        try:
+            await self.database.store_interaction({**record.to_dict(), "timestamp": record.processed_at})
+        except Exception as e:
+            logger.error(f"Failed to spill interaction {record.id}: {str(e)}")
+
+    async def persist_history(self) -> None:
+        """Write out the in-memory window (e.g. on shutdown)"""
+        for record in self.recent_interactions:
+            await self._spill(record)
+        self.recent_interactions.clear()
+
+
+    async def get_engagement_stats(self) -> Dict:
+        """Get current engagement statistics"""
+        return {
+            "activity": self.analytics.snapshot(),
+            "response_times": self.engagement_rules["response_priority"],
+            "interaction_limits": self.engagement_rules["interaction_limits"],
+            "platforms": self.platforms,
+            "recent_count": len(self.recent_interactions),
+            "history_capacity": self.history_capacity,
+            "rate_limits": self.rate_limiter.stats(self.platforms),
+            "work_queue": self.work_queue.stats(),
+            "last_updated": datetime.now().isoformat()
+        }
+        
+    async def get_recent_interactions(self, limit: int = 10, offset: int = 0) -> List[Dict]:
+        """Get recent interactions history, newest first
+
+        Reads past the in-memory window continue in the database.
+        """
+        interactions = [record.to_dict() for record in self.recent_interactions.newest(limit, offset)]
+        missing = limit - len(interactions)
+        if missing > 0 and self.database is not None:
+            interactions.extend(await self._load_older(max(0, offset - len(self.recent_interactions)), missing))
+        return interactions
+
+    async def _load_older(self, offset: int, limit: int) -> List[Dict]:
+        try:
+            # Make recently spilled interactions visible first
+            await self.database.flush()
+            documents = await self.database.find_slice("user_interactions", offset=offset, limit=limit)
+        except Exception as e:
+            logger.error(f"Failed to load older interactions: {str(e)}")
+            return []
+        for document in documents:
+            document.pop("_id", None)
+            document.pop("timestamp", None)
+        return documents
\ No newline at end of file
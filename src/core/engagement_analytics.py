@@ -0,0 +1,159 @@
+# src/core/engagement_analytics.py
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import logging
+import time
+from datetime import datetime
+from src.utils.rolling_counter import RollingCounter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_INTERVAL = 60.0
+# Window name -> (seconds, buckets)
+DEFAULT_WINDOWS = {"1m": (60, 60), "1h": (3600, 60), "24h": (86400, 96)}
+DIMENSIONS = ("platform", "interaction_type", "user_class")
+CHECKPOINT_KIND = "engagement_analytics"
+
+class EngagementAnalytics:
+    """Interaction counters per platform, interaction type and user class
+
+    Every interaction bumps an all-time total and rolling 1m/1h/24h
+    counters for each dimension it falls in, so reading the stats costs
+    the same however much history there is. The state is checkpointed to
+    a single metrics document every checkpoint_interval seconds (and on
+    stop) and restored from it on start.
+    """
+
+    def __init__(
+        self,
+        database: Any = None,
+        checkpoint_interval: float = DEFAULT_CHECKPOINT_INTERVAL,
+        windows: Optional[Dict[str, Tuple[float, int]]] = None
+    ):
+        self.database = database
+        self.checkpoint_interval = checkpoint_interval
+        self.windows = dict(windows or DEFAULT_WINDOWS)
+        self._totals: Dict[Tuple[str, str], int] = {}
+        self._rolling: Dict[Tuple[str, str], Dict[str, RollingCounter]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.last_checkpoint: Optional[str] = None
+
+    @classmethod
+    def from_config(cls, analytics_config: Dict, database: Any = None) -> "EngagementAnalytics":
+        """Build analytics from the engagement_analytics section of system_config.json"""
+        return cls(
+            database=database,
+            checkpoint_interval=analytics_config.get("checkpoint_interval", DEFAULT_CHECKPOINT_INTERVAL)
+        )
+
+    def _series(self, key: Tuple[str, str]) -> Dict[str, RollingCounter]:
+        rolling = self._rolling.get(key)
+        if rolling is None:
+            rolling = self._rolling[key] = {
+                name: RollingCounter(seconds, buckets) for name, (seconds, buckets) in self.windows.items()
+            }
+            self._totals[key] = 0
+        return rolling
+
+    def record(self, platform: str, interaction_type: str, user_class: str, now: Optional[float] = None) -> None:
+        """Count one interaction"""
+        now = time.time() if now is None else now
+        keys = (("all", "all"), ("platform", platform), ("interaction_type", interaction_type), ("user_class", user_class))
+        for key in keys:
+            for counter in self._series(key).values():
+                counter.add(now=now)
+            self._totals[key] += 1
+
+    def _summary(self, key: Tuple[str, str], now: float) -> Dict[str, int]:
+        return {
+            "total": self._totals[key],
+            **{name: counter.total(now) for name, counter in self._rolling[key].items()}
+        }
+
+    def snapshot(self, now: Optional[float] = None) -> Dict:
+        now = time.time() if now is None else now
+        self._series(("all", "all"))
+        snapshot = {"total": self._summary(("all", "all"), now)}
+        for dimension in DIMENSIONS:
+            snapshot[f"by_{dimension}"] = {
+                key[1]: self._summary(key, now) for key in sorted(self._rolling) if key[0] == dimension
+            }
+        snapshot["last_checkpoint"] = self.last_checkpoint
+        return snapshot
+
+    def to_state(self) -> Dict:
+        return {
+            "series": [
+                {
+                    "dimension": dimension,
+                    "value": value,
+                    "total": self._totals[(dimension, value)],
+                    "windows": {name: counter.to_state() for name, counter in rolling.items()}
+                }
+                for (dimension, value), rolling in self._rolling.items()
+            ]
+        }
+
+    def load_state(self, state: Dict, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        for series in state.get("series", []):
+            key = (series["dimension"], series["value"])
+            rolling = self._series(key)
+            self._totals[key] = series.get("total", 0)
+            for name, counter_state in series.get("windows", {}).items():
+                if name in rolling:
+                    rolling[name].load_state(counter_state, now)
+
+    async def checkpoint(self) -> None:
+        """Save the counters as a non-expiring metrics document"""
+        if self.database is None:
+            return
+        try:
+            # One document, replaced each time and kept out of the raw-metrics TTL
+            await self.database.replace_metrics(
+                {"kind": CHECKPOINT_KIND}, {"kind": CHECKPOINT_KIND, "raw": False, **self.to_state()}
+            )
+            self.last_checkpoint = datetime.now().isoformat()
+        except Exception as e:
+            logger.error(f"Failed to checkpoint engagement analytics: {str(e)}")
+
+    async def restore(self) -> None:
+        """Load the checkpoint, if there is one"""
+        if self.database is None:
+            return
+        try:
+            page = await self.database.find_page(
+                "metrics", {"kind": CHECKPOINT_KIND}, limit=1, sort_field="created_at"
+            )
+            if page["items"]:
+                self.load_state(page["items"][0])
+                logger.info("Restored engagement analytics from checkpoint")
+        except Exception as e:
+            logger.error(f"Failed to restore engagement analytics: {str(e)}")
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Restore the checkpoint and start checkpointing periodically"""
+        if self.running:
+            return
+        await self.restore()
+        self._task = asyncio.create_task(self._run(), name="engagement-analytics-checkpoint")
+
+    async def stop(self) -> None:
+        """Stop the periodic checkpoints and write a final one"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.checkpoint()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            await self.checkpoint()
@@ -1,126 +1,397 @@
-from typing import Dict, Optional, List
-import logging
-from datetime import datetime
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnablePassthrough
-from langchain.memory import ConversationBufferMemory
-from src.utils.config import load_config
-from dotenv import load_dotenv
-import os
-
-# Load environment variables
-load_dotenv()
-
-logger = logging.getLogger(__name__)
-
-class PersonalityEngine:
-    def __init__(self):
-        self.config = load_config()["personality"]
-        self.traits = self.config["base_traits"]
-        self.conversation_style = self.config["conversation_style"]
-        
-        # Get API key from environment
-        openai_key = os.getenv('OPENAI_API_KEY')
-        if not openai_key:
-            raise ValueError("OpenAI API key not found in environment")
-        
-        # Initialize LangChain components
-        self.llm = ChatOpenAI(
-            temperature=0.7,
-            model_name="gpt-3.5-turbo",
-            api_key=openai_key
-        )
-        
-        # Create personality-specific system prompt
-        self.system_prompt = self._create_system_prompt()
-        
-        # Initialize conversation memory
-        self.memory = ConversationBufferMemory(
-            memory_key="chat_history",
-            return_messages=True
-        )
-        
-        # Initialize the prompt template
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", self.system_prompt),
-            ("human", "{input}"),
-        ])
-        
-        # Create the chain
-        self.chain = self.prompt | self.llm | StrOutputParser()
-    
-    def _create_system_prompt(self) -> str:
-        """Create a system prompt based on personality traits"""
-        prompt = f"""You are a {self.traits['age']} content creator with the following traits:
-- Personality: {self.traits['personality']}
-- Interests: {', '.join(self.traits['background']['interests'])}
-
-Your communication style is:
-- Formality: {self.conversation_style['formality']}
-- Humor Level: {self.conversation_style['humor_level']}
-- Response Length: {self.conversation_style['response_length']}
-- Tone: {self.traits['tone']}
-
-Always maintain consistency with these traits while interacting. Your responses should be:
-1. Authentic and aligned with your personality
-2. Engaging and relatable
-3. Appropriate for your platform and audience
-4. Reflective of your core values and interests
-
-Ensure all responses are platform-appropriate and maintain brand consistency.
-"""
-        return prompt
-    
-    async def generate_response(self, prompt: str, context: Optional[Dict] = None) -> str:
-        """Generate a personality-driven response"""
-        try:
-            # Add context to prompt if provided
-            input_dict = {"input": prompt}
-            if context:
-                input_dict.update(context)
-            
-            # Generate response
-            logger.info(f"Generating response for prompt: {prompt}")
-            response = self.chain.invoke(input_dict)
-            
-            # Log interaction
-            logger.info("Response generated successfully")
-            return response
-            
-        except Exception as e:
-            logger.error(f"Error generating response: {str(e)}")
-            raise
-    
-    async def update_personality(self, new_traits: Dict) -> None:
-        """Update personality traits and refresh system prompt"""
-        try:
-            # Update traits
-            if "base_traits" in new_traits:
-                self.traits.update(new_traits.get("base_traits", {}))
-            if "conversation_style" in new_traits:
-                self.conversation_style.update(new_traits.get("conversation_style", {}))
-            
-            # Refresh system prompt
-            self.system_prompt = self._create_system_prompt()
-            
-            # Update prompt template
-            self.prompt = ChatPromptTemplate.from_messages([
-                ("system", self.system_prompt),
-                ("human", "{input}"),
-            ])
-            
-            logger.info("Personality traits updated successfully")
-        except Exception as e:
-            logger.error(f"Error updating personality: {str(e)}")
-            raise
-    
-    async def get_personality_stats(self) -> Dict:
-        """Get current personality statistics"""
-        return {
-            "traits": self.traits,
-            "conversation_style": self.conversation_style,
-            "memory_size": len(self.memory.chat_memory.messages) if hasattr(self.memory, 'chat_memory') else 0,
-            "last_updated": datetime.now().isoformat()
+from typing import AsyncIterator, Dict, NamedTuple, Optional, List, Tuple
+from collections import OrderedDict
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+from datetime import datetime
+from langchain_core.language_models import BaseChatModel
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_openai import ChatOpenAI
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import Runnable, RunnablePassthrough
+from src.core.conversation_memory import ConversationMemoryStore
+from src.core.prompt_builder import PromptBuilder, PromptTelemetry
+from src.core.response_cache import ResponseCache
+from src.utils.config import load_config, subscribe
+from src.utils.metrics import timed_stage
+from src.utils.tokens import count_tokens
+from dotenv import load_dotenv
+import os
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 8
+MAX_COMPILED_CHAINS = 8
+
+class CompiledPersonality(NamedTuple):
+    """Immutable snapshot of a personality and the chain compiled for it"""
+    version: int
+    prompt_hash: str
+    traits: Dict
+    conversation_style: Dict
+    system_prompt: str
+    system_prompt_tokens: int
+    prompt: ChatPromptTemplate
+    chain: Runnable
+    updated_at: str
+
+class PersonalityEngine:
+    def __init__(
+        self,
+        llm: Optional[BaseChatModel] = None,
+        max_concurrency: Optional[int] = None,
+        response_cache: Optional[ResponseCache] = None,
+        memory_store: Optional[ConversationMemoryStore] = None
+    ):
+        config = load_config()
+        self.config = config["personality"]
+        
+        llm_config = config.get("system", {}).get("llm", {})
+        if llm is None:
+            # Get API key from environment
+            openai_key = os.getenv('OPENAI_API_KEY')
+            if not openai_key:
+                raise ValueError("OpenAI API key not found in environment")
+            
+            # Initialize LangChain components
+            llm = ChatOpenAI(
+                temperature=0.7,
+                model_name="gpt-3.5-turbo",
+                max_tokens=llm_config.get("max_output_tokens"),
+                api_key=openai_key
+            )
+        self.llm = llm
+        
+        # Bound the number of in-flight LLM calls so a burst of requests
+        # waits here instead of piling onto the upstream API
+        self.max_concurrency = max_concurrency or llm_config.get("max_concurrency", DEFAULT_MAX_CONCURRENCY)
+        self._llm_semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        # Cache for repeated fan messages (disabled unless configured)
+        self.response_cache = response_cache or ResponseCache.from_config(
+            config.get("system", {}).get("response_cache", {})
+        )
+        
+        # Token budgets for prompts and per-call token counts
+        self.prompt_builder = PromptBuilder.from_config(config.get("system", {}).get("prompt_budgets", {}))
+        self.telemetry = PromptTelemetry()
+        
+        # Per-fan conversation memory
+        self.memory_store = memory_store or ConversationMemoryStore.from_config(
+            config.get("system", {}).get("conversation_memory", {})
+        )
+        
+        # Compiled chains keyed by a hash of traits + conversation style, so
+        # switching back to a known personality costs nothing
+        self._compiled_chains: OrderedDict = OrderedDict()
+        self._active = self._compile(
+            copy.deepcopy(self.config["base_traits"]),
+            copy.deepcopy(self.config["conversation_style"]),
+            version=1
+        )
+        self._config_hash = self._active.prompt_hash
+        
+        # Pick up edits to personality_config.json without a restart
+        subscribe(self._on_config_reload)
+    
+    @property
+    def traits(self) -> Dict:
+        return self._active.traits
+    
+    @property
+    def conversation_style(self) -> Dict:
+        return self._active.conversation_style
+    
+    @property
+    def system_prompt(self) -> str:
+        return self._active.system_prompt
+    
+    @property
+    def prompt(self) -> ChatPromptTemplate:
+        return self._active.prompt
+    
+    @property
+    def chain(self) -> Runnable:
+        return self._active.chain
+    
+    @property
+    def version(self) -> int:
+        return self._active.version
+    
+    @staticmethod
+    def _personality_hash(traits: Dict, conversation_style: Dict) -> str:
+        """Hash the inputs of the system prompt"""
+        payload = json.dumps(
+            {"base_traits": traits, "conversation_style": conversation_style},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+    
+    def _compile(self, traits: Dict, conversation_style: Dict, version: int) -> CompiledPersonality:
+        """Build a personality snapshot, reusing a cached chain when possible"""
+        prompt_hash = self._personality_hash(traits, conversation_style)
+        cached = self._compiled_chains.get(prompt_hash)
+        if cached is None:
+            system_prompt = self._create_system_prompt(traits, conversation_style)
+            prompt = ChatPromptTemplate.from_messages([
+                ("system", system_prompt),
+                MessagesPlaceholder("history", optional=True),
+                ("human", "{input}"),
+            ])
+            cached = (system_prompt, prompt, prompt | self.llm | StrOutputParser())
+            self._compiled_chains[prompt_hash] = cached
+            if len(self._compiled_chains) > MAX_COMPILED_CHAINS:
+                self._compiled_chains.popitem(last=False)
+        else:
+            self._compiled_chains.move_to_end(prompt_hash)
+        
+        system_prompt, prompt, chain = cached
+        return CompiledPersonality(
+            version=version,
+            prompt_hash=prompt_hash,
+            traits=traits,
+            conversation_style=conversation_style,
+            system_prompt=system_prompt,
+            system_prompt_tokens=count_tokens(system_prompt),
+            prompt=prompt,
+            chain=chain,
+            updated_at=datetime.now().isoformat()
+        )
+    
+    def _on_config_reload(self, config: Dict) -> None:
+        """Swap in the personality from a reloaded config file"""
+        self.config = config["personality"]
+        config_hash = self._personality_hash(self.config["base_traits"], self.config["conversation_style"])
+        if config_hash == self._config_hash:
+            return
+        
+        self._config_hash = config_hash
+        self._active = self._compile(
+            copy.deepcopy(self.config["base_traits"]),
+            copy.deepcopy(self.config["conversation_style"]),
+            version=self._active.version + 1
+        )
+        logger.info(f"Personality reloaded from config (version {self._active.version})")
+    
+    def _create_system_prompt(self, traits: Optional[Dict] = None, conversation_style: Optional[Dict] = None) -> str:
+        """Create a system prompt based on personality traits"""
+        traits = traits if traits is not None else self.traits
+        conversation_style = conversation_style if conversation_style is not None else self.conversation_style
+        prompt = f"""You are a {traits['age']} content creator with the following traits:
+- Personality: {traits['personality']}
+- Interests: {', '.join(traits['background']['interests'])}
+
+Your communication style is:
+- Formality: {conversation_style['formality']}
+- Humor Level: {conversation_style['humor_level']}
+- Response Length: {conversation_style['response_length']}
+- Tone: {traits['tone']}
+
+Always maintain consistency with these traits while interacting. Your responses should be:
+1. Authentic and aligned with your personality
+2. Engaging and relatable
+3. Appropriate for your platform and audience
+4. Reflective of your core values and interests
+
+Ensure all responses are platform-appropriate and maintain brand consistency.
+"""
+        return prompt
+    
+    async def generate_response(
+        self,
+        prompt: str,
+        context: Optional[Dict] = None,
+        cache_namespace: Optional[str] = None,
+        cache_text: Optional[str] = None,
+        request_type: str = "default"
+    ) -> str:
+        """Generate a personality-driven response
+        
+        Passing cache_namespace makes the response cacheable: it is keyed on
+        the namespace, the personality version and cache_text (the raw fan
+        message, defaulting to the prompt).
+        
+        Uncached requests whose context carries a user_id include that fan's
+        conversation memory, and the exchange is recorded afterwards using
+        context["message"] (or the prompt) as the fan's side.
+        
+        request_type selects the token budget the prompt and history are
+        clipped to and the bucket the token counts are recorded under.
+        """
+        try:
+            # Pin the current chain so a concurrent personality update
+            # doesn't change the prompt halfway through this request
+            active = self._active
+            
+            use_cache = cache_namespace is not None and self.response_cache is not None
+            if use_cache:
+                cache_text = prompt if cache_text is None else cache_text
+                cached = self.response_cache.get(cache_namespace, active.version, cache_text)
+                if cached is not None:
+                    logger.debug("Serving cached response for %s", cache_namespace)
+                    return cached
+            
+            # Cached responses are shared between fans, so only uncached
+            # requests get per-fan history
+            user_id = None if use_cache else self._memory_user(context)
+            input_dict, input_tokens = await self._prepare_input(active, prompt, context, request_type, user_id)
+            
+            # Generate response without blocking the event loop
+            logger.debug("Generating response for prompt: %s", prompt)
+            async with self._llm_semaphore:
+                with timed_stage("llm.chain"):
+                    response = await active.chain.ainvoke(input_dict)
+            
+            if use_cache:
+                self.response_cache.put(cache_namespace, active.version, cache_text, response)
+            await self._record_response(prompt, context, request_type, user_id, input_tokens, response)
+            
+            # Log interaction
+            logger.debug("Response generated successfully")
+            return response
+            
+        except Exception as e:
+            logger.error(f"Error generating response: {str(e)}")
+            raise
+    
+    async def stream_response(
+        self,
+        prompt: str,
+        context: Optional[Dict] = None,
+        request_type: str = "default"
+    ) -> AsyncIterator[str]:
+        """Stream a personality-driven response as it is generated
+        
+        Uses the same prompt assembly and conversation memory as
+        generate_response but bypasses the response cache. Closing the
+        iterator early (e.g. the client disconnected) cancels the upstream
+        LLM call, and the partial exchange is not recorded.
+        """
+        active = self._active
+        user_id = self._memory_user(context)
+        input_dict, input_tokens = await self._prepare_input(active, prompt, context, request_type, user_id)
+        
+        logger.debug("Streaming response for prompt: %s", prompt)
+        # The LLM call runs in its own task so closing this iterator can
+        # cancel it outright instead of leaving it parked mid-request
+        queue: asyncio.Queue = asyncio.Queue()
+        producer = asyncio.create_task(self._produce_stream(active, input_dict, queue))
+        chunks = []
+        try:
+            while (chunk := await queue.get()) is not None:
+                chunks.append(chunk)
+                yield chunk
+            await producer
+        except Exception as e:
+            logger.error(f"Error streaming response: {str(e)}")
+            raise
+        finally:
+            if not producer.done():
+                producer.cancel()
+                await asyncio.wait([producer])
+        
+        await self._record_response(prompt, context, request_type, user_id, input_tokens, "".join(chunks))
+        logger.debug("Response streamed successfully")
+    
+    async def _produce_stream(self, active: CompiledPersonality, input_dict: Dict, queue: asyncio.Queue) -> None:
+        """Feed streamed chunks into queue, ending with None"""
+        try:
+            async with self._llm_semaphore:
+                with timed_stage("llm.stream"):
+                    async for chunk in active.chain.astream(input_dict):
+                        queue.put_nowait(chunk)
+        finally:
+            queue.put_nowait(None)
+    
+    @staticmethod
+    def _memory_user(context: Optional[Dict]) -> Optional[str]:
+        """The fan whose conversation memory applies to a request, if any"""
+        user_id = (context or {}).get("user_id")
+        if user_id is None or user_id == "anonymous":
+            return None
+        return str(user_id)
+    
+    async def _prepare_input(
+        self,
+        active: CompiledPersonality,
+        prompt: str,
+        context: Optional[Dict],
+        request_type: str,
+        user_id: Optional[str]
+    ) -> Tuple[Dict, int]:
+        """Build the chain input within budget and count its tokens"""
+        with timed_stage("prompt.assemble"):
+            # Add context to prompt if provided
+            input_dict = dict(context) if context else {}
+            input_dict["input"] = self.prompt_builder.clip_prompt(request_type, prompt)
+            input_tokens = active.system_prompt_tokens + count_tokens(input_dict["input"])
+            
+            if user_id is not None:
+                memory = await self.memory_store.get(user_id)
+                history = self.prompt_builder.clip_history(
+                    request_type, self.memory_store.history_messages(memory)
+                )
+                input_tokens += sum(count_tokens(str(m.content)) for m in history)
+                input_dict["history"] = history
+        return input_dict, input_tokens
+    
+    async def _record_response(
+        self,
+        prompt: str,
+        context: Optional[Dict],
+        request_type: str,
+        user_id: Optional[str],
+        input_tokens: int,
+        response: str
+    ) -> None:
+        """Record token telemetry and the fan's conversation memory"""
+        self.telemetry.record(request_type, input_tokens=input_tokens, output_tokens=count_tokens(response))
+        if user_id is not None:
+            await self.memory_store.add_exchange(user_id, context.get("message", prompt), response)
+    
+    async def update_personality(self, new_traits: Dict) -> None:
+        """Update personality traits and refresh system prompt"""
+        try:
+            # Update copies of the traits; the active snapshot is never mutated
+            traits = copy.deepcopy(self.traits)
+            conversation_style = copy.deepcopy(self.conversation_style)
+            if "base_traits" in new_traits:
+                traits.update(new_traits.get("base_traits", {}))
+            if "conversation_style" in new_traits:
+                conversation_style.update(new_traits.get("conversation_style", {}))
+            
+            if self._personality_hash(traits, conversation_style) == self._active.prompt_hash:
+                logger.info("Personality traits unchanged")
+                return
+            
+            # Swap in the new snapshot in a single assignment; in-flight
+            # requests keep the chain they already picked up
+            self._active = self._compile(traits, conversation_style, version=self._active.version + 1)
+            
+            logger.info(f"Personality traits updated successfully (version {self._active.version})")
+        except Exception as e:
+            logger.error(f"Error updating personality: {str(e)}")
+            raise
+    
+    async def get_personality_stats(self) -> Dict:
+        """Get current personality statistics"""
+        active = self._active
+        memory_stats = self.memory_store.stats()
+        return {
+            "traits": active.traits,
+            "conversation_style": active.conversation_style,
+            "version": active.version,
+            "prompt_hash": active.prompt_hash,
+            "memory_size": memory_stats["turns"],
+            "memory": memory_stats,
+            "response_cache": self.response_cache.stats() if self.response_cache else None,
+            "prompt_telemetry": self.telemetry.stats(),
+            "prompt_truncations": dict(self.prompt_builder.truncations),
+            "last_updated": active.updated_at
         }
\ No newline at end of file
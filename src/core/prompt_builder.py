@@ -0,0 +1,128 @@
+# src/core/prompt_builder.py
+from typing import Dict, List, NamedTuple, Optional
+from collections import defaultdict
+import logging
+from langchain_core.messages import BaseMessage, SystemMessage
+from src.utils.tokens import count_tokens, truncate_tokens
+
+logger = logging.getLogger(__name__)
+
+class PromptBudget(NamedTuple):
+    """Token limits for one type of request"""
+    max_message_tokens: int
+    max_prompt_tokens: int
+    max_history_tokens: int
+
+DEFAULT_BUDGETS: Dict[str, PromptBudget] = {
+    "interaction": PromptBudget(max_message_tokens=300, max_prompt_tokens=600, max_history_tokens=1200),
+    "content": PromptBudget(max_message_tokens=200, max_prompt_tokens=500, max_history_tokens=0),
+    "webhook": PromptBudget(max_message_tokens=300, max_prompt_tokens=600, max_history_tokens=1200),
+    "default": PromptBudget(max_message_tokens=500, max_prompt_tokens=1000, max_history_tokens=1200),
+}
+
+class PromptBuilder:
+    """Enforces per-request-type token budgets on prompts
+
+    Fan input is clipped before it is interpolated into a prompt
+    template, the finished prompt is clipped as a safety net, and
+    conversation history is trimmed oldest-first to fit its budget.
+    All truncation is deterministic so the same input always produces
+    the same prompt (and the same response cache key).
+    """
+
+    def __init__(self, budgets: Optional[Dict[str, PromptBudget]] = None):
+        self.budgets = dict(DEFAULT_BUDGETS)
+        self.budgets.update(budgets or {})
+        self.truncations: Dict[str, int] = defaultdict(int)
+
+    @classmethod
+    def from_config(cls, budget_config: Dict) -> "PromptBuilder":
+        """Build a prompt builder from the prompt_budgets section of system_config.json"""
+        budgets = {}
+        for request_type, limits in budget_config.items():
+            default = DEFAULT_BUDGETS.get(request_type, DEFAULT_BUDGETS["default"])
+            budgets[request_type] = default._replace(**limits)
+        return cls(budgets)
+
+    def budget(self, request_type: str) -> PromptBudget:
+        return self.budgets.get(request_type, self.budgets["default"])
+
+    def clip_message(self, request_type: str, message: str) -> str:
+        """Clip a fan message to the request type's message budget"""
+        return self._clip(request_type, message, self.budget(request_type).max_message_tokens)
+
+    def clip_prompt(self, request_type: str, prompt: str) -> str:
+        """Clip a finished prompt to the request type's prompt budget"""
+        return self._clip(request_type, prompt, self.budget(request_type).max_prompt_tokens)
+
+    def clip_history(self, request_type: str, messages: List[BaseMessage]) -> List[BaseMessage]:
+        """Drop the oldest turns (and shorten the summary) until history fits its budget"""
+        max_tokens = self.budget(request_type).max_history_tokens
+        if max_tokens <= 0 or not messages:
+            return []
+
+        summary = None
+        turns = list(messages)
+        if isinstance(turns[0], SystemMessage):
+            summary = turns.pop(0)
+
+        sizes = [count_tokens(str(m.content)) for m in turns]
+        total = sum(sizes)
+        dropped = 0
+        # Drop whole human/ai pairs from the front
+        while total > max_tokens and turns:
+            pair = 2 if len(turns) >= 2 else 1
+            total -= sum(sizes[:pair])
+            del turns[:pair], sizes[:pair]
+            dropped += pair
+
+        if summary is not None:
+            remaining = max_tokens - total
+            summary_text = str(summary.content)
+            if count_tokens(summary_text) > remaining:
+                summary_text = truncate_tokens(summary_text, remaining) if remaining > 0 else ""
+                dropped += 1
+            if summary_text:
+                turns.insert(0, SystemMessage(content=summary_text))
+
+        if dropped:
+            self.truncations[request_type] += 1
+        return turns
+
+    def _clip(self, request_type: str, text: str, max_tokens: int) -> str:
+        clipped = truncate_tokens(text, max_tokens)
+        if clipped != text:
+            self.truncations[request_type] += 1
+            logger.info("Clipped %s text from %d to %d tokens", request_type, count_tokens(text), max_tokens)
+        return clipped
+
+class PromptTelemetry:
+    """Per-request-type counters of prompt and completion sizes"""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {
+            "calls": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "max_input_tokens": 0,
+            "max_output_tokens": 0
+        })
+
+    def record(self, request_type: str, input_tokens: int, output_tokens: int) -> None:
+        stats = self._stats[request_type]
+        stats["calls"] += 1
+        stats["input_tokens"] += input_tokens
+        stats["output_tokens"] += output_tokens
+        stats["max_input_tokens"] = max(stats["max_input_tokens"], input_tokens)
+        stats["max_output_tokens"] = max(stats["max_output_tokens"], output_tokens)
+
+    def stats(self) -> Dict[str, Dict]:
+        result = {}
+        for request_type, stats in self._stats.items():
+            calls = stats["calls"] or 1
+            result[request_type] = {
+                **stats,
+                "avg_input_tokens": stats["input_tokens"] / calls,
+                "avg_output_tokens": stats["output_tokens"] / calls
+            }
+        return result
@@ -0,0 +1,151 @@
+# src/core/registry.py
+from typing import Any, Callable, Dict
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Process-wide instances shared by main.py, the core subsystems and the
+# webhook router so they all talk to the same engine and LLM client
+_instances: Dict[str, Any] = {}
+_lock = threading.RLock()
+
+def _get_or_create(name: str, factory: Callable[[], Any]) -> Any:
+    """Return the shared instance for name, creating it on first use"""
+    instance = _instances.get(name)
+    if instance is not None:
+        return instance
+    with _lock:
+        if name not in _instances:
+            logger.info(f"Creating shared {name}")
+            _instances[name] = factory()
+        return _instances[name]
+
+def peek(name: str) -> Any:
+    """Return the shared instance for name if it has been created, else None"""
+    return _instances.get(name)
+
+def register(name: str, instance: Any) -> None:
+    """Install an instance (e.g. one built around a fake LLM) under name"""
+    with _lock:
+        _instances[name] = instance
+
+def reset() -> None:
+    """Drop all shared instances so the next lookup builds fresh ones"""
+    with _lock:
+        _instances.clear()
+
+def get_personality_engine():
+    """Get the shared PersonalityEngine"""
+    from src.core.conversation_memory import ConversationMemoryStore
+    from src.core.personality import PersonalityEngine
+    from src.utils.config import load_config
+
+    def create():
+        memory_config = load_config()["system"].get("conversation_memory", {})
+        return PersonalityEngine(
+            memory_store=ConversationMemoryStore.from_config(memory_config, database=get_database())
+        )
+    return _get_or_create("personality_engine", create)
+
+def get_content_manager():
+    """Get the shared ContentManager"""
+    from src.core.content_manager import ContentManager
+    return _get_or_create("content_manager", lambda: ContentManager(get_personality_engine()))
+
+def get_engagement_system():
+    """Get the shared EngagementSystem"""
+    from src.core.engagement import EngagementSystem
+    return _get_or_create(
+        "engagement_system",
+        lambda: EngagementSystem(
+            get_personality_engine(),
+            rate_limiter=get_rate_limiter(),
+            work_queue=get_work_queue(),
+            database=get_database(),
+            analytics=get_engagement_analytics()
+        )
+    )
+
+def get_engagement_analytics():
+    """Get the shared EngagementAnalytics counters"""
+    from src.core.engagement_analytics import EngagementAnalytics
+    from src.utils.config import load_config
+
+    def create():
+        return EngagementAnalytics.from_config(
+            load_config()["system"].get("engagement_analytics", {}), database=get_database()
+        )
+    return _get_or_create("engagement_analytics", create)
+
+def get_rate_limiter():
+    """Get the shared RateLimiter for outbound replies"""
+    from src.utils.config import load_config
+    from src.utils.rate_limiter import RateLimiter
+
+    def create():
+        return RateLimiter.from_config(load_config()["personality"]["engagement_rules"].get("interaction_limits", {}))
+    return _get_or_create("rate_limiter", create)
+
+def get_work_queue():
+    """Get the shared PriorityWorkQueue that orders LLM work by response priority"""
+    from src.utils.config import load_config
+    from src.utils.priority_queue import DEFAULT_MAX_CONCURRENCY, PriorityWorkQueue
+
+    def create():
+        system_config = load_config()["system"]
+        # Default to the LLM concurrency so waiting happens here, in priority order
+        llm_concurrency = system_config.get("llm", {}).get("max_concurrency")
+        return PriorityWorkQueue.from_config(
+            system_config.get("priority_queue", {}), default_concurrency=llm_concurrency or DEFAULT_MAX_CONCURRENCY
+        )
+    return _get_or_create("work_queue", create)
+
+def get_database():
+    """Get the shared AsyncDatabaseManager"""
+    from src.utils.database import AsyncDatabaseManager
+    return _get_or_create("database", AsyncDatabaseManager)
+
+def get_job_queue():
+    """Get the shared JobQueue"""
+    from src.utils.config import load_config
+    from src.utils.database import PROJECT_ROOT
+    from src.utils.job_queue import JobQueue
+
+    def create():
+        return JobQueue.from_config(load_config()["system"].get("job_queue", {}), project_root=PROJECT_ROOT)
+    return _get_or_create("job_queue", create)
+
+def get_scheduler():
+    """Get the shared Scheduler"""
+    from src.utils.config import load_config
+    from src.utils.database import PROJECT_ROOT
+    from src.utils.scheduler import Scheduler
+
+    def create():
+        return Scheduler.from_config(
+            load_config()["system"].get("scheduler", {}), get_job_queue(), project_root=PROJECT_ROOT
+        )
+    return _get_or_create("scheduler", create)
+
+def get_webhook_dedup():
+    """Get the shared IdempotencyStore for incoming webhooks"""
+    from src.utils.config import load_config
+    from src.utils.database import PROJECT_ROOT
+    from src.utils.idempotency import IdempotencyStore
+
+    def create():
+        return IdempotencyStore.from_config(
+            load_config()["system"].get("webhook_dedup", {}), project_root=PROJECT_ROOT
+        )
+    return _get_or_create("webhook_dedup", create)
+
+def get_webhook_verifier():
+    """Get the shared WebhookVerifier"""
+    from src.api.webhook_signing import WebhookVerifier
+    return _get_or_create("webhook_verifier", WebhookVerifier.from_config)
+
+def get_fansly_client():
+    """Get the shared FanslyClient"""
+    from src.api.fansly_client import FanslyClient
+    return _get_or_create("fansly_client", FanslyClient)
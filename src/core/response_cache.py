@@ -0,0 +1,172 @@
+# src/core/response_cache.py
+from typing import Dict, FrozenSet, NamedTuple, Optional, Tuple
+from collections import OrderedDict
+import itertools
+import logging
+import re
+import time
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 3600
+DEFAULT_NGRAM_SIZE = 3
+DEFAULT_MAX_SIMILARITY_CANDIDATES = 64
+
+_WHITESPACE = re.compile(r"\s+")
+_REPEATED_CHARS = re.compile(r"(.)\1{2,}")
+
+class CacheEntry(NamedTuple):
+    response: str
+    expires_at: float
+    ngrams: FrozenSet[str]
+
+class ResponseCache:
+    """LRU + TTL cache of generated responses for repeated fan messages
+
+    Entries are keyed on a namespace (interaction type, platform, ...),
+    the personality version and the normalized message text. The
+    similarity tier is opt-in: with a similarity_threshold set, a miss
+    falls back to the closest cached message in the same namespace by
+    character n-gram Jaccard similarity, checking at most
+    max_similarity_candidates of its most recently cached messages.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        similarity_threshold: Optional[float] = None,
+        ngram_size: int = DEFAULT_NGRAM_SIZE,
+        max_similarity_candidates: int = DEFAULT_MAX_SIMILARITY_CANDIDATES
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.ngram_size = ngram_size
+        self.max_similarity_candidates = max_similarity_candidates
+        self._entries: "OrderedDict[Tuple[str, int, str], CacheEntry]" = OrderedDict()
+        # Keys grouped by (namespace, version) for the similarity scan
+        self._buckets: Dict[Tuple[str, int], Dict[str, FrozenSet[str]]] = {}
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_config(cls, cache_config: Dict) -> Optional["ResponseCache"]:
+        """Build a cache from the response_cache section of system_config.json"""
+        if not cache_config.get("enabled", False):
+            return None
+        return cls(
+            max_entries=cache_config.get("max_entries", DEFAULT_MAX_ENTRIES),
+            ttl_seconds=cache_config.get("ttl_seconds", DEFAULT_TTL_SECONDS),
+            similarity_threshold=cache_config.get("similarity_threshold"),
+            ngram_size=cache_config.get("ngram_size", DEFAULT_NGRAM_SIZE),
+            max_similarity_candidates=cache_config.get("max_similarity_candidates", DEFAULT_MAX_SIMILARITY_CANDIDATES)
+        )
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalize a message so trivial variations share a cache entry"""
+        text = unicodedata.normalize("NFKC", text).lower()
+        # Drop punctuation but keep emoji and other symbols
+        text = "".join(ch for ch in text if not unicodedata.category(ch).startswith("P"))
+        text = _REPEATED_CHARS.sub(r"\1\1", text)
+        return _WHITESPACE.sub(" ", text).strip()
+
+    def _ngrams(self, text: str) -> FrozenSet[str]:
+        padded = f" {text} "
+        if len(padded) <= self.ngram_size:
+            return frozenset([padded])
+        return frozenset(padded[i:i + self.ngram_size] for i in range(len(padded) - self.ngram_size + 1))
+
+    def get(self, namespace: str, version: int, text: str) -> Optional[str]:
+        """Look up a cached response, counting the hit or miss"""
+        normalized = self.normalize(text)
+        key = (namespace, version, normalized)
+        now = time.monotonic()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.response
+            self._remove(key)
+            self.expirations += 1
+
+        if self.similarity_threshold is not None:
+            similar_key = self._find_similar(namespace, version, normalized, now)
+            if similar_key is not None:
+                self._entries.move_to_end(similar_key)
+                self.similar_hits += 1
+                return self._entries[similar_key].response
+
+        self.misses += 1
+        return None
+
+    def put(self, namespace: str, version: int, text: str, response: str) -> None:
+        """Cache a generated response"""
+        normalized = self.normalize(text)
+        key = (namespace, version, normalized)
+        ngrams = self._ngrams(normalized)
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = CacheEntry(response, time.monotonic() + self.ttl_seconds, ngrams)
+        self._buckets.setdefault((namespace, version), {})[normalized] = ngrams
+
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._buckets.clear()
+
+    def _find_similar(self, namespace: str, version: int, normalized: str, now: float) -> Optional[Tuple[str, int, str]]:
+        bucket = self._buckets.get((namespace, version))
+        if not bucket:
+            return None
+
+        ngrams = self._ngrams(normalized)
+        best_key, best_score = None, self.similarity_threshold
+        # Newest first; dicts keep insertion order and put() re-inserts
+        candidates = itertools.islice(reversed(bucket.items()), self.max_similarity_candidates)
+        for candidate, candidate_ngrams in candidates:
+            # Jaccard can't exceed the ratio of the set sizes
+            smaller, larger = sorted((len(ngrams), len(candidate_ngrams)))
+            if smaller < best_score * larger:
+                continue
+            union = len(ngrams | candidate_ngrams)
+            score = len(ngrams & candidate_ngrams) / union if union else 0.0
+            if score >= best_score:
+                key = (namespace, version, candidate)
+                if self._entries[key].expires_at > now:
+                    best_key, best_score = key, score
+        return best_key
+
+    def _remove(self, key: Tuple[str, int, str]) -> None:
+        self._entries.pop(key, None)
+        namespace, version, normalized = key
+        bucket = self._buckets.get((namespace, version))
+        if bucket is not None:
+            bucket.pop(normalized, None)
+            if not bucket:
+                del self._buckets[(namespace, version)]
+
+    def stats(self) -> Dict:
+        """Get hit/miss metrics"""
+        lookups = self.hits + self.similar_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.similar_hits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
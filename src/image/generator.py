@@ -1,20 +1,20 @@
-# src/image/generator.py
-from typing import Dict, Optional
-import logging
-from src.utils.config import load_config
-
-logger = logging.getLogger(__name__)
-
-class ImageGenerator:
-    def __init__(self):
-        self.config = load_config()["image_generation"]
-        
-    async def generate_image(self, prompt: str, params: Optional[Dict] = None) -> str:
-        """Generate an image based on the prompt"""
-        try:
-            # TODO: Implement Stable Diffusion integration
-            logger.info(f"Generating image for prompt: {prompt}")
-            return "image_url_placeholder"
-        except Exception as e:
-            logger.error(f"Error generating image: {str(e)}")
+# src/image/generator.py
+from typing import Dict, Optional
+import logging
+from src.utils.config import load_config
+
+logger = logging.getLogger(__name__)
+
+class ImageGenerator:
+    def __init__(self):
+        self.config = load_config()["image_generation"]
+        
+    async def generate_image(self, prompt: str, params: Optional[Dict] = None) -> str:
+        """Generate an image based on the prompt"""
+        try:
+            # TODO: Implement Stable Diffusion integration
+            logger.debug("Generating image for prompt: %s", prompt)
+            return "image_url_placeholder"
+        except Exception as e:
+            logger.error(f"Error generating image: {str(e)}")
             raise
\ No newline at end of file
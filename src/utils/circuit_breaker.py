@@ -0,0 +1,69 @@
+# src/utils/circuit_breaker.py
+from typing import Dict
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open"""
+
+class CircuitBreaker:
+    """Stops calling a failing dependency for a while
+
+    After failure_threshold consecutive failures the circuit opens and
+    calls are refused for reset_timeout seconds. Then a single trial call
+    is let through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+
+    def check(self) -> None:
+        """Raise CircuitOpenError if a call shouldn't be made now"""
+        if self.state == CLOSED:
+            return
+        now = time.monotonic()
+        if now - self.opened_at >= self.reset_timeout:
+            # Let one trial call through; if it never reports back another
+            # one is allowed after a further reset_timeout
+            self.state = HALF_OPEN
+            self.opened_at = now
+            return
+        self.rejected += 1
+        raise CircuitOpenError(f"Circuit for {self.name} is open")
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+        self.state = CLOSED
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning(f"Circuit for {self.name} opened after {self.failures} failures")
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict:
+        return {"state": self.state, "failures": self.failures, "rejected": self.rejected}
@@ -1,66 +1,180 @@
-import json
-import os
-from typing import Dict
-from dotenv import load_dotenv
-
-load_dotenv()
-print(f"OpenAI Key loaded: {'OPENAI_API_KEY' in os.environ}")
-print(f"First few characters of key if present: {os.environ.get('OPENAI_API_KEY', 'NOT_FOUND')[:5]}...")
-
-def load_config() -> Dict:
-    """Load configuration from JSON files"""
-    config = {}
-    
-    # Define the config directory relative to this file
-    config_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'config')
-    
-    try:
-        # Load personality config
-        personality_path = os.path.join(config_dir, 'personality_config.json')
-        if os.path.exists(personality_path):
-            with open(personality_path, 'r', encoding='utf-8') as f:
-                config['personality'] = json.load(f)
-        
-        # Load system config
-        system_path = os.path.join(config_dir, 'system_config.json')
-        if os.path.exists(system_path):
-            with open(system_path, 'r', encoding='utf-8') as f:
-                config['system'] = json.load(f)
-        else:
-            config['system'] = {}
-
-        # Add required configurations if they don't exist
-        if 'content' not in config:
-            config['content'] = {
-                "post_template": {
-                    "standard": {
-                        "text_length": "100-150",
-                        "image_required": True
-                    }
-                }
-            }
-
-        if 'engagement' not in config:
-            config['engagement'] = {
-                "response_time": {
-                    "free_users": "2-4",
-                    "subscribers": "0.5-1"
-                },
-                "daily_limits": {
-                    "dms": 100,
-                    "posts": 3
-                }
-            }
-
-        if 'image_generation' not in config:
-            config['image_generation'] = {
-                "model": "stable-diffusion",
-                "safety_filters": True
-            }
-
-        return config
-
-    except Exception as e:
-        import traceback
-        print(f"Error stack trace: {traceback.format_exc()}")
-        raise Exception(f"Error loading configuration: {str(e)}")
\ No newline at end of file
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Callable, Dict, List, Optional
+from dotenv import load_dotenv
+from src.utils.metrics import timed_stage
+
+load_dotenv()
+print(f"OpenAI Key loaded: {'OPENAI_API_KEY' in os.environ}")
+print(f"First few characters of key if present: {os.environ.get('OPENAI_API_KEY', 'NOT_FOUND')[:5]}...")
+
+logger = logging.getLogger(__name__)
+
+# Define the config directory relative to this file
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'config')
+CONFIG_FILES = {
+    "personality": "personality_config.json",
+    "system": "system_config.json",
+}
+# How often (in seconds) the config files are stat'ed for changes
+DEFAULT_CHECK_INTERVAL = 1.0
+
+class ConfigStore:
+    """Parses the JSON config files once and reloads them only when they change"""
+
+    def __init__(self, config_dir: str = CONFIG_DIR, check_interval: float = DEFAULT_CHECK_INTERVAL):
+        self.config_dir = config_dir
+        self.check_interval = check_interval
+        self._config: Optional[Dict] = None
+        self._mtimes: Dict[str, Optional[int]] = {}
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self._subscribers: List[Callable[[], Optional[Callable[[Dict], None]]]] = []
+
+    def get(self) -> Dict:
+        """Return the current config, reloading it if a file changed on disk"""
+        config = self._config
+        if config is not None and time.monotonic() < self._next_check:
+            return config
+
+        reloaded = False
+        # Only the stat/parse path is timed; the cached path above is a clock check
+        with timed_stage("config.load"), self._lock:
+            mtimes = self._stat_files()
+            if self._config is None or mtimes != self._mtimes:
+                try:
+                    new_config = self._read_config()
+                except Exception:
+                    if self._config is None:
+                        raise
+                    # Keep serving the last good config (e.g. a half-saved file)
+                    logger.exception("Error reloading configuration, keeping previous version")
+                else:
+                    reloaded = self._config is not None
+                    self._config = new_config
+                    self._mtimes = mtimes
+            self._next_check = time.monotonic() + self.check_interval
+            config = self._config
+
+        if reloaded:
+            logger.info("Configuration files changed, reloaded config")
+            self._notify(config)
+        return config
+
+    def reload(self) -> Dict:
+        """Force the next lookup to re-check the config files"""
+        self._next_check = 0.0
+        self._mtimes = {}
+        return self.get()
+
+    def subscribe(self, callback: Callable[[Dict], None]) -> None:
+        """Call callback(config) whenever the config is reloaded
+
+        Bound methods are held weakly so subscribing doesn't keep the
+        owning object alive.
+        """
+        try:
+            ref = weakref.WeakMethod(callback)
+        except TypeError:
+            # Plain functions and builtins are held strongly
+            ref = lambda: callback
+        with self._lock:
+            self._subscribers.append(ref)
+
+    def _notify(self, config: Dict) -> None:
+        with self._lock:
+            callbacks = [ref() for ref in self._subscribers]
+            self._subscribers = [ref for ref, cb in zip(self._subscribers, callbacks) if cb is not None]
+        for callback in callbacks:
+            if callback is None:
+                continue
+            try:
+                callback(config)
+            except Exception:
+                logger.exception(f"Config subscriber {callback} failed")
+
+    def _stat_files(self) -> Dict[str, Optional[int]]:
+        mtimes = {}
+        for filename in CONFIG_FILES.values():
+            try:
+                mtimes[filename] = os.stat(os.path.join(self.config_dir, filename)).st_mtime_ns
+            except FileNotFoundError:
+                mtimes[filename] = None
+        return mtimes
+
+    def _read_config(self) -> Dict:
+        """Load configuration from JSON files"""
+        config = {}
+
+        try:
+            # Load personality config
+            personality_path = os.path.join(self.config_dir, CONFIG_FILES['personality'])
+            if os.path.exists(personality_path):
+                with open(personality_path, 'r', encoding='utf-8') as f:
+                    config['personality'] = json.load(f)
+
+            # Load system config
+            system_path = os.path.join(self.config_dir, CONFIG_FILES['system'])
+            if os.path.exists(system_path):
+                with open(system_path, 'r', encoding='utf-8') as f:
+                    config['system'] = json.load(f)
+            else:
+                config['system'] = {}
+
+            # Add required configurations if they don't exist
+            if 'content' not in config:
+                config['content'] = {
+                    "post_template": {
+                        "standard": {
+                            "text_length": "100-150",
+                            "image_required": True
+                        }
+                    }
+                }
+
+            if 'engagement' not in config:
+                config['engagement'] = {
+                    "response_time": {
+                        "free_users": "2-4",
+                        "subscribers": "0.5-1"
+                    },
+                    "daily_limits": {
+                        "dms": 100,
+                        "posts": 3
+                    }
+                }
+
+            if 'image_generation' not in config:
+                config['image_generation'] = {
+                    "model": "stable-diffusion",
+                    "safety_filters": True
+                }
+
+            return config
+
+        except Exception as e:
+            import traceback
+            print(f"Error stack trace: {traceback.format_exc()}")
+            raise Exception(f"Error loading configuration: {str(e)}")
+
+_store = ConfigStore()
+
+def get_config_store() -> ConfigStore:
+    """Get the process-wide config store"""
+    return _store
+
+def load_config() -> Dict:
+    """Load configuration from JSON files
+
+    The parsed config is cached and shared between callers, so treat the
+    returned dict as read-only.
+    """
+    return _store.get()
+
+def subscribe(callback: Callable[[Dict], None]) -> None:
+    """Register a callback for config reloads"""
+    _store.subscribe(callback)
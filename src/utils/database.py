@@ -1,61 +1,414 @@
-# src/utils/database.py
-import json
-from pathlib import Path
-from pymongo import MongoClient
-from typing import Dict, Any
-
-class DatabaseManager:
-    def __init__(self):
-        self.client = None
-        self.db = None
-        self._load_config()
-        self._initialize_connection()
-
-    def _load_config(self):
-        config_path = Path(__file__).parent.parent.parent / 'config' / 'system_config.json'
-        with open(config_path) as f:
-            self.config = json.load(f)['database']
-
-    def _initialize_connection(self):
-        """Initialize MongoDB connection"""
-        self.client = MongoClient(self.config['uri'])
-        self.db = self.client[self.config['database']]
-        
-        # Initialize collections if they don't exist
-        for collection_name in self.config['collections'].values():
-            if collection_name not in self.db.list_collection_names():
-                self.db.create_collection(collection_name)
-
-    def store_conversation(self, conversation_data: Dict[str, Any]) -> str:
-        """Store a conversation in the database"""
-        collection = self.db[self.config['collections']['conversations']]
-        result = collection.insert_one(conversation_data)
-        return str(result.inserted_id)
-
-    def store_content(self, content_data: Dict[str, Any]) -> str:
-        """Store content history in the database"""
-        collection = self.db[self.config['collections']['content_history']]
-        result = collection.insert_one(content_data)
-        return str(result.inserted_id)
-
-    def store_interaction(self, interaction_data: Dict[str, Any]) -> str:
-        """Store user interaction in the database"""
-        collection = self.db[self.config['collections']['user_interactions']]
-        result = collection.insert_one(interaction_data)
-        return str(result.inserted_id)
-
-    def store_metrics(self, metrics_data: Dict[str, Any]) -> str:
-        """Store metrics in the database"""
-        collection = self.db[self.config['collections']['metrics']]
-        result = collection.insert_one(metrics_data)
-        return str(result.inserted_id)
-
-    def get_conversation_history(self, user_id: str) -> list:
-        """Retrieve conversation history for a user"""
-        collection = self.db[self.config['collections']['conversations']]
-        return list(collection.find({'user_id': user_id}))
-
-    def close(self):
-        """Close the database connection"""
-        if self.client:
-            self.client.close()
\ No newline at end of file
+# src/utils/database.py
+from concurrent.futures import ThreadPoolExecutor
+from bson import ObjectId, json_util
+from pymongo import ASCENDING, DESCENDING, MongoClient
+from typing import Any, Callable, Dict, List, Optional
+from datetime import datetime, timezone
+import asyncio
+import base64
+import logging
+import os
+import threading
+from src.utils.config import CONFIG_DIR, load_config
+from src.utils.metrics import timed_stage
+from src.utils.write_behind import WriteBehindBuffer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_POOL_SIZE = 50
+DEFAULT_EXECUTOR_WORKERS = 16
+DEFAULT_OPERATION_TIMEOUT = 10.0
+DEFAULT_SERVER_SELECTION_TIMEOUT_MS = 5000
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+DEFAULT_METRICS_TTL_SECONDS = 7 * 24 * 3600
+PROJECT_ROOT = os.path.dirname(CONFIG_DIR)
+
+# Indexes declared per collection key and created at startup. History
+# queries page through (user_id, timestamp desc, _id desc), and raw
+# metrics expire through a TTL index on created_at.
+INDEXES = {
+    'conversations': [
+        {'keys': [('user_id', ASCENDING), ('timestamp', DESCENDING), ('_id', DESCENDING)],
+         'name': 'user_id_timestamp'},
+    ],
+    'user_interactions': [
+        {'keys': [('user_id', ASCENDING), ('timestamp', DESCENDING), ('_id', DESCENDING)],
+         'name': 'user_id_timestamp'},
+        {'keys': [('timestamp', DESCENDING), ('_id', DESCENDING)],
+         'name': 'timestamp'},
+    ],
+    'content_history': [
+        {'keys': [('timestamp', DESCENDING), ('_id', DESCENDING)],
+         'name': 'timestamp'},
+    ],
+    'metrics': [
+        {'keys': [('created_at', ASCENDING)],
+         'name': 'raw_metrics_ttl',
+         'ttl': True,
+         'partialFilterExpression': {'raw': True}},
+        # Checkpoint documents (engagement analytics, ...) looked up by kind
+        {'keys': [('kind', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)],
+         'name': 'kind_created_at'},
+    ],
+}
+
+def encode_cursor(sort_value: Any, doc_id: Any) -> str:
+    """Encode the position of the last item of a page"""
+    payload = json_util.dumps({'v': sort_value, 'id': doc_id})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        return json_util.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+class DatabaseManager:
+    def __init__(self, client: Optional[MongoClient] = None):
+        self.client = client
+        self.db = None
+        self._load_config()
+        self._initialize_connection()
+
+    def _load_config(self):
+        self.config = load_config()['system']['database']
+
+    def _initialize_connection(self):
+        """Initialize MongoDB connection"""
+        if self.client is None:
+            self.client = MongoClient(
+                self.config['uri'],
+                maxPoolSize=self.config.get('max_pool_size', DEFAULT_MAX_POOL_SIZE),
+                serverSelectionTimeoutMS=self.config.get(
+                    'server_selection_timeout_ms', DEFAULT_SERVER_SELECTION_TIMEOUT_MS
+                ),
+                timeoutMS=int(self.config.get('operation_timeout', DEFAULT_OPERATION_TIMEOUT) * 1000)
+            )
+        self.db = self.client[self.config['database']]
+
+        # Initialize collections if they don't exist
+        existing = set(self.db.list_collection_names())
+        for collection_name in self.config['collections'].values():
+            if collection_name not in existing:
+                self.db.create_collection(collection_name)
+
+    def ensure_indexes(self) -> List[str]:
+        """Create the declared indexes (a no-op for ones that already exist)"""
+        created = []
+        for collection_key, indexes in INDEXES.items():
+            collection = self.db[self.config['collections'][collection_key]]
+            for index in indexes:
+                options = {'name': index['name']}
+                if index.get('ttl'):
+                    options['expireAfterSeconds'] = self.config.get(
+                        'metrics_ttl_seconds', DEFAULT_METRICS_TTL_SECONDS
+                    )
+                if 'partialFilterExpression' in index:
+                    options['partialFilterExpression'] = index['partialFilterExpression']
+                created.append(collection.create_index(index['keys'], **options))
+        return created
+
+    @staticmethod
+    def stamp_document(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the timestamp the history indexes sort on"""
+        data.setdefault('timestamp', datetime.now().isoformat())
+        return data
+
+    @staticmethod
+    def stamp_metrics(metrics_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Mark metrics as raw so the TTL index expires them, unless told otherwise"""
+        metrics_data.setdefault('created_at', datetime.now(timezone.utc))
+        metrics_data.setdefault('raw', True)
+        return metrics_data
+
+    def store_conversation(self, conversation_data: Dict[str, Any]) -> str:
+        """Store a conversation in the database"""
+        collection = self.db[self.config['collections']['conversations']]
+        result = collection.insert_one(self.stamp_document(conversation_data))
+        return str(result.inserted_id)
+
+    def store_content(self, content_data: Dict[str, Any]) -> str:
+        """Store content history in the database"""
+        collection = self.db[self.config['collections']['content_history']]
+        result = collection.insert_one(self.stamp_document(content_data))
+        return str(result.inserted_id)
+
+    def store_interaction(self, interaction_data: Dict[str, Any]) -> str:
+        """Store user interaction in the database"""
+        collection = self.db[self.config['collections']['user_interactions']]
+        result = collection.insert_one(self.stamp_document(interaction_data))
+        return str(result.inserted_id)
+
+    def store_metrics(self, metrics_data: Dict[str, Any]) -> str:
+        """Store metrics in the database"""
+        collection = self.db[self.config['collections']['metrics']]
+        result = collection.insert_one(self.stamp_metrics(metrics_data))
+        return str(result.inserted_id)
+
+    def replace_metrics(self, query: Dict[str, Any], metrics_data: Dict[str, Any]) -> None:
+        """Replace the metrics document matching query, creating it if missing"""
+        collection = self.db[self.config['collections']['metrics']]
+        metrics_data['created_at'] = datetime.now(timezone.utc)
+        collection.replace_one(query, self.stamp_metrics(metrics_data), upsert=True)
+
+    def find_page(
+        self,
+        collection_key: str,
+        query: Optional[Dict[str, Any]] = None,
+        projection: Optional[List[str]] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        sort_field: str = 'timestamp'
+    ) -> Dict[str, Any]:
+        """Fetch one page of documents, newest first
+
+        Pages are keyed on (sort_field, _id) rather than skip/offset, so
+        every page is an index range scan no matter how deep it is. Pass
+        the returned next_cursor back in to get the following page.
+        """
+        collection = self.db[self.config['collections'][collection_key]]
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        query = dict(query or {})
+        if cursor:
+            position = decode_cursor(cursor)
+            after_cursor = {'$or': [
+                {sort_field: {'$lt': position['v']}},
+                {sort_field: position['v'], '_id': {'$lt': position['id']}},
+            ]}
+            # AND with the caller's filter so an $or of theirs isn't replaced
+            query = {'$and': [query, after_cursor]} if query else after_cursor
+
+        fields = None
+        if projection is not None:
+            fields = {field: 1 for field in projection}
+            fields[sort_field] = 1
+
+        documents = list(
+            collection.find(query, fields)
+            .sort([(sort_field, DESCENDING), ('_id', DESCENDING)])
+            .limit(limit + 1)
+        )
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            last = documents[-1]
+            next_cursor = encode_cursor(last.get(sort_field), last['_id'])
+
+        for document in documents:
+            document['_id'] = str(document['_id'])
+        return {'items': documents, 'next_cursor': next_cursor}
+
+    def find_slice(
+        self,
+        collection_key: str,
+        query: Optional[Dict[str, Any]] = None,
+        offset: int = 0,
+        limit: int = DEFAULT_PAGE_SIZE,
+        sort_field: str = 'timestamp'
+    ) -> List[Dict[str, Any]]:
+        """Fetch up to limit documents starting offset places from the newest
+
+        For callers that page by position; the skip still walks the
+        index, so prefer find_page for deep scans.
+        """
+        collection = self.db[self.config['collections'][collection_key]]
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        documents = list(
+            collection.find(dict(query or {}))
+            .sort([(sort_field, DESCENDING), ('_id', DESCENDING)])
+            .skip(max(0, offset))
+            .limit(limit)
+        )
+        for document in documents:
+            document['_id'] = str(document['_id'])
+        return documents
+
+    def get_conversation_page(
+        self,
+        user_id: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        projection: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Page through a user's conversation turns, newest first
+
+        Summary documents share the collection and are left out; documents
+        written before turns carried a kind count as turns.
+        """
+        query = {'user_id': user_id, 'kind': {'$in': ['turn', None]}}
+        return self.find_page('conversations', query, projection, limit, cursor)
+
+    def get_conversation_history(self, user_id: str, limit: int = DEFAULT_PAGE_SIZE) -> list:
+        """Retrieve the most recent conversation history for a user, oldest first"""
+        page = self.get_conversation_page(user_id, limit=limit)
+        return list(reversed(page['items']))
+
+    def insert_many(self, collection_key: str, documents: List[Dict[str, Any]]) -> int:
+        """Insert a batch of documents into a configured collection"""
+        collection = self.db[self.config['collections'][collection_key]]
+        result = collection.insert_many(documents, ordered=False)
+        return len(result.inserted_ids)
+
+    def close(self):
+        """Close the database connection"""
+        if self.client:
+            self.client.close()
+
+class AsyncDatabaseManager:
+    """Async facade over DatabaseManager for use from FastAPI handlers
+
+    Every operation runs on a bounded thread pool with a per-operation
+    timeout, so a slow MongoDB only ties up pool threads instead of the
+    event loop. The DatabaseManager itself is created lazily on a pool
+    thread, so constructing this class never blocks on a connection.
+    """
+
+    def __init__(
+        self,
+        manager: Optional[DatabaseManager] = None,
+        manager_factory: Callable[[], DatabaseManager] = DatabaseManager,
+        max_workers: Optional[int] = None,
+        operation_timeout: Optional[float] = None
+    ):
+        config = load_config()['system'].get('database', {})
+        self.max_workers = max_workers or config.get('executor_workers', DEFAULT_EXECUTOR_WORKERS)
+        self.operation_timeout = operation_timeout or config.get('operation_timeout', DEFAULT_OPERATION_TIMEOUT)
+        self._manager = manager
+        self._manager_factory = manager_factory
+        self._manager_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="mongo")
+        
+        # High-volume interaction and metrics writes (and buffered conversation turns) are batched
+        self.write_behind = self._create_write_behind(config.get('write_behind', {}))
+
+    def _create_write_behind(self, write_behind_config: Dict) -> Optional[WriteBehindBuffer]:
+        if not write_behind_config.get('enabled', False):
+            return None
+        dead_letter_path = write_behind_config.get('dead_letter_path')
+        if dead_letter_path and not os.path.isabs(dead_letter_path):
+            dead_letter_path = os.path.join(PROJECT_ROOT, dead_letter_path)
+        return WriteBehindBuffer(
+            flush=lambda collection_key, documents: self._run('insert_many', collection_key, documents),
+            batch_size=write_behind_config.get('batch_size', 500),
+            flush_interval=write_behind_config.get('flush_interval', 1.0),
+            max_pending=write_behind_config.get('max_pending', 10000),
+            dead_letter_path=dead_letter_path
+        )
+
+    @property
+    def manager(self) -> DatabaseManager:
+        """Get the underlying DatabaseManager, connecting on first use"""
+        if self._manager is None:
+            with self._manager_lock:
+                if self._manager is None:
+                    logger.info("Connecting to MongoDB")
+                    self._manager = self._manager_factory()
+        return self._manager
+
+    async def _run(self, operation: str, *args: Any) -> Any:
+        """Run a DatabaseManager method on the pool and wait for it with a timeout"""
+        loop = asyncio.get_running_loop()
+        try:
+            with timed_stage(f"db.{operation}"):
+                return await asyncio.wait_for(
+                    loop.run_in_executor(self._executor, lambda: getattr(self.manager, operation)(*args)),
+                    timeout=self.operation_timeout
+                )
+        except asyncio.TimeoutError:
+            logger.error(f"Database operation {operation} timed out after {self.operation_timeout}s")
+            raise
+
+    async def store_conversation(self, conversation_data: Dict[str, Any], buffered: bool = False) -> str:
+        """Store a conversation in the database
+
+        With buffered set the write goes through the write-behind buffer,
+        so it isn't readable until the next flush.
+        """
+        if buffered:
+            return await self._store_buffered('conversations', 'store_conversation', conversation_data)
+        return await self._run('store_conversation', conversation_data)
+
+    async def store_content(self, content_data: Dict[str, Any]) -> str:
+        """Store content history in the database"""
+        return await self._run('store_content', content_data)
+
+    async def _store_buffered(self, collection_key: str, operation: str, data: Dict[str, Any]) -> str:
+        """Queue a document for a batched write, or write it directly"""
+        if self.write_behind is None:
+            return await self._run(operation, data)
+        if collection_key == 'metrics':
+            DatabaseManager.stamp_metrics(data)
+        else:
+            DatabaseManager.stamp_document(data)
+        # Assign the id up front so callers get it back before the flush
+        data.setdefault('_id', ObjectId())
+        await self.write_behind.add(collection_key, data)
+        return str(data['_id'])
+
+    async def store_interaction(self, interaction_data: Dict[str, Any]) -> str:
+        """Store user interaction in the database"""
+        return await self._store_buffered('user_interactions', 'store_interaction', interaction_data)
+
+    async def store_metrics(self, metrics_data: Dict[str, Any]) -> str:
+        """Store metrics in the database"""
+        return await self._store_buffered('metrics', 'store_metrics', metrics_data)
+
+    async def replace_metrics(self, query: Dict[str, Any], metrics_data: Dict[str, Any]) -> None:
+        """Replace the metrics document matching query, creating it if missing"""
+        await self._run('replace_metrics', query, metrics_data)
+
+    async def get_conversation_history(self, user_id: str, limit: int = DEFAULT_PAGE_SIZE) -> list:
+        """Retrieve the most recent conversation history for a user, oldest first"""
+        return await self._run('get_conversation_history', user_id, limit)
+
+    async def get_conversation_page(
+        self,
+        user_id: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        projection: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Page through a user's conversation history, newest first"""
+        return await self._run('get_conversation_page', user_id, limit, cursor, projection)
+
+    async def find_page(
+        self,
+        collection_key: str,
+        query: Optional[Dict[str, Any]] = None,
+        projection: Optional[List[str]] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        sort_field: str = 'timestamp'
+    ) -> Dict[str, Any]:
+        """Fetch one page of documents, newest first"""
+        return await self._run('find_page', collection_key, query, projection, limit, cursor, sort_field)
+
+    async def find_slice(
+        self,
+        collection_key: str,
+        query: Optional[Dict[str, Any]] = None,
+        offset: int = 0,
+        limit: int = DEFAULT_PAGE_SIZE,
+        sort_field: str = 'timestamp'
+    ) -> List[Dict[str, Any]]:
+        """Fetch up to limit documents starting offset places from the newest"""
+        return await self._run('find_slice', collection_key, query, offset, limit, sort_field)
+
+    async def ensure_indexes(self) -> List[str]:
+        """Create the declared indexes"""
+        return await self._run('ensure_indexes')
+
+    async def flush(self) -> None:
+        """Write out everything in the write-behind buffer"""
+        if self.write_behind is not None:
+            await self.write_behind.flush()
+
+    async def close(self) -> None:
+        """Close the database connection and stop the worker threads"""
+        if self.write_behind is not None:
+            await self.write_behind.stop()
+        if self._manager is not None:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._manager.close)
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,49 @@
+# src/utils/histogram.py
+from typing import Dict, List, Optional, Sequence
+from bisect import bisect_left
+
+# Upper bounds in seconds; a final +Inf bucket catches the rest
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class Histogram:
+    """Fixed-bucket histogram of observations (e.g. latencies in seconds)
+
+    Recording is a bisect and an increment, so it is cheap enough for
+    every request; percentiles are estimated from the bucket bounds.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th quantile (0 < q <= 1)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def snapshot(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "buckets": {
+                **{str(bound): count for bound, count in zip(self.buckets, self.counts)},
+                "+Inf": self.counts[-1]
+            }
+        }
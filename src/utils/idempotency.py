@@ -0,0 +1,126 @@
+# src/utils/idempotency.py
+from typing import Dict
+from collections import OrderedDict
+import hashlib
+import logging
+import os
+import time
+from src.utils.sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 24 * 3600
+DEFAULT_MEMORY_SIZE = 10000
+# Expired keys are deleted from the database at most this often
+DEFAULT_PRUNE_INTERVAL = 300.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_keys (
+    key TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS seen_keys_expires_at ON seen_keys (expires_at);
+"""
+
+def event_key(payload: Dict, body: bytes) -> str:
+    """Idempotency key for a webhook: its event ID, or a hash of the raw body"""
+    event_id = payload.get("event_id") or payload.get("id")
+    if event_id:
+        return f"id:{event_id}"
+    return f"sha256:{hashlib.sha256(body).hexdigest()}"
+
+class IdempotencyStore:
+    """Remembers which keys have been seen so repeated deliveries are dropped
+
+    Keys are persisted in SQLite with a TTL so a restart doesn't let a
+    redelivered event through. An LRU of recently seen keys in front of
+    the database answers most duplicates (retries tend to arrive soon
+    after the original) without a query.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        memory_size: int = DEFAULT_MEMORY_SIZE,
+        prune_interval: float = DEFAULT_PRUNE_INTERVAL
+    ):
+        self.store = SQLiteStore(path, SCHEMA)
+        self.ttl_seconds = ttl_seconds
+        self.memory_size = memory_size
+        self.prune_interval = prune_interval
+        # key -> expiry time, least recently seen first
+        self._recent: "OrderedDict[str, float]" = OrderedDict()
+        self._last_prune = 0.0
+        self.accepted = 0
+        self.duplicates = 0
+        self.memory_hits = 0
+
+    @classmethod
+    def from_config(cls, dedup_config: Dict, project_root: str = "") -> "IdempotencyStore":
+        """Build a store from the webhook_dedup section of system_config.json"""
+        path = dedup_config.get("path", ":memory:")
+        if path != ":memory:" and not os.path.isabs(path):
+            path = os.path.join(project_root, path)
+        return cls(
+            path=path,
+            ttl_seconds=dedup_config.get("ttl_seconds", DEFAULT_TTL_SECONDS),
+            memory_size=dedup_config.get("memory_size", DEFAULT_MEMORY_SIZE),
+            prune_interval=dedup_config.get("prune_interval", DEFAULT_PRUNE_INTERVAL)
+        )
+
+    async def claim(self, key: str) -> bool:
+        """Record key as seen; False if it was already seen within the TTL"""
+        now = time.time()
+        expires_at = self._recent.get(key)
+        if expires_at is not None and expires_at > now:
+            self._recent.move_to_end(key)
+            self.memory_hits += 1
+            self.duplicates += 1
+            return False
+
+        # Insert the key, or take over a row whose TTL has run out
+        claimed = await self.store.write(
+            "INSERT INTO seen_keys (key, expires_at) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET expires_at = excluded.expires_at "
+            "WHERE seen_keys.expires_at <= ?",
+            (key, now + self.ttl_seconds, now)
+        )
+        if claimed:
+            self._remember(key, now + self.ttl_seconds)
+            self.accepted += 1
+        else:
+            self.duplicates += 1
+        if now - self._last_prune >= self.prune_interval:
+            self._last_prune = now
+            await self.prune()
+        return claimed > 0
+
+    async def release(self, key: str) -> None:
+        """Forget key, e.g. because the event it guarded could not be queued"""
+        self._recent.pop(key, None)
+        await self.store.write("DELETE FROM seen_keys WHERE key = ?", (key,))
+
+    async def prune(self) -> int:
+        """Delete expired keys and return how many were removed"""
+        removed = await self.store.write("DELETE FROM seen_keys WHERE expires_at <= ?", (time.time(),))
+        if removed:
+            logger.info(f"Pruned {removed} expired idempotency keys")
+        return removed
+
+    async def close(self) -> None:
+        await self.store.close()
+
+    def _remember(self, key: str, expires_at: float) -> None:
+        self._recent[key] = expires_at
+        self._recent.move_to_end(key)
+        while len(self._recent) > self.memory_size:
+            self._recent.popitem(last=False)
+
+    def stats(self) -> Dict:
+        return {
+            "accepted": self.accepted,
+            "duplicates_dropped": self.duplicates,
+            "memory_hits": self.memory_hits,
+            "memory_size": len(self._recent)
+        }
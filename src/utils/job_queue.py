@@ -0,0 +1,341 @@
+# src/utils/job_queue.py
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import time
+import uuid
+from src.utils.sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_MAX = 60.0
+DEFAULT_POLL_INTERVAL = 0.5
+DEFAULT_RETENTION_SECONDS = 7 * 24 * 3600
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+class RetryLater(Exception):
+    """Raised by a handler to run its job again after delay seconds
+
+    Unlike a failure this doesn't use up an attempt, so it suits work
+    that is waiting on something (like a rate limit) rather than broken.
+    """
+
+    def __init__(self, delay: float, reason: str = ""):
+        super().__init__(reason or f"retry in {delay:.1f}s")
+        self.delay = delay
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_after REAL NOT NULL,
+    ordering_key TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_run_after ON jobs (status, run_after);
+"""
+
+# Created on start, after tables from before ordering keys gain the column
+ORDERING_INDEX = "CREATE INDEX IF NOT EXISTS jobs_ordering_key ON jobs (ordering_key, status)"
+
+class JobQueue:
+    """Persistent queue of background jobs stored in SQLite
+
+    Jobs are dispatched by kind to handlers registered with register()
+    and run by a fixed pool of worker coroutines. A failing job is
+    retried with exponential backoff (with jitter) until max_attempts;
+    queued or running jobs can be cancelled. Jobs that were running when
+    the process stopped are queued again on the next start.
+
+    Jobs enqueued with the same ordering_key run one at a time in the
+    order they were enqueued, including across retries; jobs without a
+    key (or with different keys) run concurrently.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        workers: int = DEFAULT_WORKERS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_max: float = DEFAULT_BACKOFF_MAX,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        retention_seconds: float = DEFAULT_RETENTION_SECONDS
+    ):
+        self.store = SQLiteStore(path, SCHEMA)
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self._handlers: Dict[str, JobHandler] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._stopping = False
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.deferred = 0
+
+    @classmethod
+    def from_config(cls, queue_config: Dict, project_root: str = "") -> "JobQueue":
+        """Build a queue from the job_queue section of system_config.json"""
+        path = queue_config.get("path", ":memory:")
+        if path != ":memory:" and not os.path.isabs(path):
+            path = os.path.join(project_root, path)
+        return cls(
+            path=path,
+            workers=queue_config.get("workers", DEFAULT_WORKERS),
+            max_attempts=queue_config.get("max_attempts", DEFAULT_MAX_ATTEMPTS),
+            backoff_base=queue_config.get("backoff_base", DEFAULT_BACKOFF_BASE),
+            backoff_max=queue_config.get("backoff_max", DEFAULT_BACKOFF_MAX),
+            poll_interval=queue_config.get("poll_interval", DEFAULT_POLL_INTERVAL),
+            retention_seconds=queue_config.get("retention_seconds", DEFAULT_RETENTION_SECONDS)
+        )
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._worker_tasks)
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Route jobs of kind to handler, which receives the job payload"""
+        self._handlers[kind] = handler
+
+    async def start(self) -> None:
+        """Open the database, recover interrupted jobs and start the workers"""
+        if self.running:
+            return
+        await self.store.run(self._recover)
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._worker_tasks = [
+            asyncio.create_task(self._work(), name=f"job-worker-{i}") for i in range(self.workers)
+        ]
+        logger.info(f"Job queue started with {self.workers} workers")
+
+    async def stop(self) -> None:
+        """Stop the workers; interrupted jobs are retried on the next start"""
+        # wait_for can swallow a cancel that races with a wakeup, so the
+        # workers also check this flag before going round again
+        self._stopping = True
+        tasks = self._worker_tasks + list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._running.clear()
+        await self.store.close()
+
+    async def enqueue(
+        self,
+        kind: str,
+        payload: Optional[Dict[str, Any]] = None,
+        max_attempts: Optional[int] = None,
+        delay: float = 0.0,
+        job_id: Optional[str] = None,
+        ordering_key: Optional[str] = None
+    ) -> str:
+        """Add a job and return its ID
+        
+        Passing a job_id makes the enqueue idempotent: if a job with that
+        ID already exists nothing is added. Jobs sharing an ordering_key
+        never run concurrently and run in enqueue order.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind: {kind}")
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+        await self.store.write(
+            "INSERT OR IGNORE INTO jobs "
+            "(id, kind, payload, status, max_attempts, run_after, ordering_key, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, json.dumps(payload or {}, default=str), QUEUED,
+             max_attempts or self.max_attempts, now + delay, ordering_key, now, now)
+        )
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job's status, result and error"""
+        rows = await self.store.read("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return self._to_dict(rows[0]) if rows else None
+
+    async def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """List the most recent jobs, optionally only those with a status"""
+        if status:
+            rows = await self.store.read(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?", (status, limit)
+            )
+        else:
+            rows = await self.store.read("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,))
+        return [self._to_dict(row) for row in rows]
+
+    async def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; False if it had already finished"""
+        changed = await self.store.write(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status IN (?, ?)",
+            (CANCELLED, time.time(), job_id, QUEUED, RUNNING)
+        )
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        return changed > 0
+
+    async def _work(self) -> None:
+        while not self._stopping:
+            # Clear before claiming so an enqueue during the claim still wakes us
+            self._wakeup.clear()
+            job = await self.store.run(self._claim)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            task = asyncio.create_task(self._run_job(job))
+            self._running[job["id"]] = task
+            try:
+                await asyncio.shield(task)
+            except asyncio.CancelledError:
+                if not task.done():
+                    # The worker itself is being stopped
+                    task.cancel()
+                    raise
+            finally:
+                self._running.pop(job["id"], None)
+            if job["ordering_key"] is not None:
+                # The next job with this key may be waiting on this one
+                self._wakeup.set()
+
+    async def _run_job(self, job: Dict[str, Any]) -> None:
+        job_id, kind = job["id"], job["kind"]
+        handler = self._handlers.get(kind)
+        try:
+            if handler is None:
+                raise ValueError(f"No handler registered for job kind: {kind}")
+            result = await handler(job["payload"])
+        except asyncio.CancelledError:
+            logger.info(f"Job {job_id} ({kind}) cancelled")
+            return
+        except RetryLater as e:
+            await self._defer(job, e)
+            return
+        except Exception as e:
+            await self._record_failure(job, e)
+            return
+
+        await self.store.write(
+            "UPDATE jobs SET status = ?, result = ?, error = NULL, updated_at = ? WHERE id = ? AND status = ?",
+            (SUCCEEDED, json.dumps(result, default=str), time.time(), job_id, RUNNING)
+        )
+        self.completed += 1
+        logger.info("Job %s (%s) succeeded", job_id, kind)
+
+    async def _defer(self, job: Dict[str, Any], retry: RetryLater) -> None:
+        now = time.time()
+        await self.store.write(
+            "UPDATE jobs SET status = ?, attempts = attempts - 1, run_after = ?, error = ?, updated_at = ? "
+            "WHERE id = ? AND status = ?",
+            (QUEUED, now + max(0.0, retry.delay), str(retry), now, job["id"], RUNNING)
+        )
+        self.deferred += 1
+        logger.info("Job %s (%s) deferred: %s", job["id"], job["kind"], retry)
+
+    async def _record_failure(self, job: Dict[str, Any], error: Exception) -> None:
+        job_id, attempts = job["id"], job["attempts"]
+        now = time.time()
+        if attempts < job["max_attempts"]:
+            # Full jitter keeps retries of a burst of failures from lining up
+            backoff = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+            run_after = now + random.uniform(backoff / 2, backoff)
+            await self.store.write(
+                "UPDATE jobs SET status = ?, run_after = ?, error = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (QUEUED, run_after, str(error), now, job_id, RUNNING)
+            )
+            self.retried += 1
+            logger.warning(f"Job {job_id} ({job['kind']}) failed on attempt {attempts}, retrying: {str(error)}")
+        else:
+            await self.store.write(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (FAILED, str(error), now, job_id, RUNNING)
+            )
+            self.failed += 1
+            logger.error(f"Job {job_id} ({job['kind']}) failed after {attempts} attempts: {str(error)}")
+
+    def _recover(self, conn: sqlite3.Connection) -> None:
+        """Requeue jobs interrupted by a shutdown and prune old finished ones"""
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if "ordering_key" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN ordering_key TEXT")
+        conn.execute(ORDERING_INDEX)
+        now = time.time()
+        recovered = conn.execute(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?", (QUEUED, now, RUNNING)
+        ).rowcount
+        if recovered:
+            logger.info(f"Requeued {recovered} interrupted jobs")
+        conn.execute(
+            "DELETE FROM jobs WHERE status IN (?, ?, ?) AND updated_at < ?",
+            (*FINISHED_STATUSES, now - self.retention_seconds)
+        )
+
+    def _claim(self, conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+        """Mark the next due job as running and return it
+
+        A keyed job is only eligible when no job with the same key is
+        running or was enqueued before it and is still queued.
+        """
+        now = time.time()
+        row = conn.execute(
+            "UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ? "
+            "WHERE id = (SELECT id FROM jobs AS j WHERE status = ? AND run_after <= ? "
+            "AND (ordering_key IS NULL OR NOT EXISTS (SELECT 1 FROM jobs AS o "
+            "WHERE o.ordering_key = j.ordering_key AND (o.status = ? OR (o.status = ? AND o.rowid < j.rowid)))) "
+            "ORDER BY run_after, created_at LIMIT 1) RETURNING *",
+            (RUNNING, now, QUEUED, now, RUNNING, QUEUED)
+        ).fetchone()
+        return self._to_dict(row) if row else None
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    async def stats(self) -> Dict:
+        rows = await self.store.read("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status")
+        return {
+            "workers": self.workers,
+            "running": len(self._running),
+            "by_status": {row["status"]: row["count"] for row in rows},
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "deferred": self.deferred
+        }
@@ -0,0 +1,172 @@
+# src/utils/logging_setup.py
+from typing import Dict, Optional
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+from datetime import datetime, timezone
+
+DEFAULT_LOG_PATH = "app.log"
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_MAX_MESSAGE_CHARS = 2000
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else came in through extra=
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[QueueListener] = None
+
+def truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    return f"{text[:max_chars]}... [{len(text) - max_chars} chars truncated]"
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with extra= fields as top-level keys"""
+
+    def __init__(self, max_field_chars: int = DEFAULT_MAX_MESSAGE_CHARS):
+        super().__init__()
+        self.max_field_chars = max_field_chars
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                data[key] = value if isinstance(value, (int, float, bool)) or value is None else truncate(
+                    str(value), self.max_field_chars
+                )
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False)
+
+class SamplingFilter(logging.Filter):
+    """Keeps 1 in N INFO-and-below records from noisy loggers
+
+    Counting is per call site, so the first record from every line is
+    always kept and a rare message isn't drowned by a frequent one from
+    the same logger. Warnings and errors are never sampled.
+    """
+
+    def __init__(self, sample_every: Optional[Dict[str, int]] = None):
+        super().__init__()
+        self.sample_every = {name: every for name, every in (sample_every or {}).items() if every > 1}
+        self._counts: Dict[tuple, int] = {}
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.sample_every:
+            return True
+        every = self.sample_every.get(record.name)
+        if every is None:
+            return True
+        site = (record.pathname, record.lineno)
+        count = self._counts.get(site, 0)
+        self._counts[site] = count + 1
+        if count % every == 0:
+            return True
+        self.dropped += 1
+        return False
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to the listener thread without waiting on I/O
+
+    The caller only renders the message (clipped to max_message_chars);
+    JSON encoding and writes happen on the listener thread. When the
+    queue is full the record is dropped and counted rather than blocking
+    the event loop.
+    """
+
+    def __init__(self, log_queue: queue.Queue, max_message_chars: int = DEFAULT_MAX_MESSAGE_CHARS):
+        super().__init__(log_queue)
+        self.max_message_chars = max_message_chars
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        message = truncate(record.getMessage(), self.max_message_chars)
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = logging.Formatter().formatException(record.exc_info)
+        # Copy so other handlers still see the original record
+        record = copy.copy(record)
+        record.msg = record.message = message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = exc_text
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def setup_logging(log_config: Dict, project_root: str = "", logger: Optional[logging.Logger] = None) -> QueueListener:
+    """Route logging through a queue to a rotating JSON file and the console
+
+    Configures the root logger unless another logger is given, and
+    replaces any pipeline set up earlier. Call stop_logging() (also run
+    at exit) to flush what is still queued.
+    """
+    global _listener
+    stop_logging()
+    target = logger or logging.getLogger()
+
+    path = log_config.get("path", DEFAULT_LOG_PATH)
+    if project_root and not os.path.isabs(path):
+        path = os.path.join(project_root, path)
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    max_chars = log_config.get("max_message_chars", DEFAULT_MAX_MESSAGE_CHARS)
+
+    file_handler = RotatingFileHandler(
+        path,
+        maxBytes=log_config.get("max_bytes", DEFAULT_MAX_BYTES),
+        backupCount=log_config.get("backup_count", DEFAULT_BACKUP_COUNT),
+        encoding="utf-8"
+    )
+    file_handler.setFormatter(
+        JsonFormatter(max_chars) if log_config.get("json", True) else logging.Formatter(TEXT_FORMAT)
+    )
+    handlers = [file_handler]
+    if log_config.get("console", True):
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handlers.append(console_handler)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=log_config.get("queue_size", DEFAULT_QUEUE_SIZE))
+    queue_handler = NonBlockingQueueHandler(log_queue, max_chars)
+    queue_handler.addFilter(SamplingFilter(log_config.get("sample_every")))
+
+    for handler in list(target.handlers):
+        target.removeHandler(handler)
+        handler.close()
+    target.addHandler(queue_handler)
+    target.setLevel(log_config.get("level", "INFO"))
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def stop_logging() -> None:
+    """Write out queued records and stop the listener thread"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+atexit.register(stop_logging)
@@ -0,0 +1,220 @@
+# src/utils/metrics.py
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+import math
+import threading
+import time
+from src.utils.histogram import DEFAULT_LATENCY_BUCKETS, Histogram
+
+# (labels, value) pairs of one metric family
+Samples = List[Tuple[Dict[str, str], float]]
+# A collector returns (name, type, description, samples) families at scrape time
+Family = Tuple[str, str, str, Samples]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        if math.isnan(value):
+            return "NaN"
+    return repr(value)
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        # Guards the series: stages are entered from executor threads too
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, description, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield self.name, self._labels(key), value
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+class HistogramMetric(_Metric):
+    """A labelled family of fixed-bucket histograms"""
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._histograms: Dict[Tuple[str, ...], Histogram] = {}
+
+    def histogram(self, **labels: str) -> Histogram:
+        key = self._key(labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram(self.buckets))
+        return histogram
+
+    def observe(self, value: float, **labels: str) -> None:
+        histogram = self.histogram(**labels)
+        with self._lock:
+            histogram.observe(value)
+
+    def samples(self):
+        with self._lock:
+            # Copied under the lock so a scrape sees each series at one instant
+            series = [
+                (key, list(histogram.counts), histogram.count, histogram.sum)
+                for key, histogram in sorted(self._histograms.items())
+            ]
+        for key, counts, count, total in series:
+            labels = self._labels(key)
+            # Histogram keeps per-bucket counts; the exposition format is cumulative
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(float(bound))}, cumulative
+            yield f"{self.name}_bucket", {**labels, "le": "+Inf"}, count
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+class MetricsRegistry:
+    """Named metrics rendered in the Prometheus text format
+
+    Recording is a dict lookup and a locked add, so it can sit on every
+    request. Numbers that components already keep (cache hits, token
+    totals, ...) are read by collectors only when /metrics is scraped.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, *args, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+        return metric
+
+    def counter(self, name: str, description: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, description, labelnames)
+
+    def gauge(self, name: str, description: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, description, labelnames)
+
+    def histogram(self, name: str, description: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> HistogramMetric:
+        return self._get_or_create(HistogramMetric, name, description, labelnames, buckets)
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        families = [
+            (metric.name, metric.kind, metric.description, metric.samples()) for metric in self._metrics.values()
+        ]
+        for collector in self._collectors:
+            for name, kind, description, samples in collector():
+                families.append((name, kind, description, [(name, labels, value) for labels, value in samples]))
+        for name, kind, description, samples in families:
+            lines.append(f"# HELP {name} {_escape(description)}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "influencer_stage_duration_seconds", "Time spent in each processing stage", ["stage"]
+)
+STAGE_IN_FLIGHT = REGISTRY.gauge(
+    "influencer_stage_in_flight", "Calls currently inside each processing stage", ["stage"]
+)
+STAGE_ERRORS = REGISTRY.counter(
+    "influencer_stage_errors_total", "Calls that left a processing stage with an exception", ["stage"]
+)
+
+# Stage name -> its STAGE_SECONDS histogram, so timing a stage skips the label lookup
+_stage_histograms: Dict[str, Histogram] = {}
+_stage_histograms_lock = threading.Lock()
+
+class timed_stage:
+    """Context manager that records a stage's latency, in-flight count and errors
+
+    Usable around sync code and awaits alike:
+    `with timed_stage("llm.chain"): await chain.ainvoke(...)`
+    """
+    __slots__ = ("key", "histogram", "_start")
+
+    def __init__(self, stage: str):
+        self.key = (stage,)
+        histogram = _stage_histograms.get(stage)
+        if histogram is None:
+            with _stage_histograms_lock:
+                histogram = _stage_histograms.get(stage)
+                if histogram is None:
+                    histogram = _stage_histograms[stage] = STAGE_SECONDS.histogram(stage=stage)
+        self.histogram = histogram
+        self._start = 0.0
+
+    def __enter__(self) -> "timed_stage":
+        in_flight = STAGE_IN_FLIGHT._values
+        with STAGE_IN_FLIGHT._lock:
+            in_flight[self.key] = in_flight.get(self.key, 0) + 1
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        elapsed = time.perf_counter() - self._start
+        with STAGE_SECONDS._lock:
+            self.histogram.observe(elapsed)
+        with STAGE_IN_FLIGHT._lock:
+            STAGE_IN_FLIGHT._values[self.key] -= 1
+        if exc_type is not None:
+            STAGE_ERRORS.inc(stage=self.key[0])
+        return False
@@ -0,0 +1,154 @@
+# src/utils/priority_queue.py
+from typing import AsyncIterator, Deque, Dict, Optional
+from collections import deque
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+import time
+from src.utils.histogram import Histogram
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_AGING_SECONDS = 10.0
+# Lower rank is served first; unknown classes rank with "low"
+DEFAULT_RANKS = {"high": 0, "medium": 1, "low": 2}
+
+class _Waiter:
+    __slots__ = ("priority", "deadline", "enqueued_at", "future")
+
+    def __init__(self, priority: str, deadline: float, enqueued_at: float, future: asyncio.Future):
+        self.priority = priority
+        self.deadline = deadline
+        self.enqueued_at = enqueued_at
+        self.future = future
+
+class PriorityWorkQueue:
+    """Admits work by priority class, with aging and per-class caps
+
+    Callers wait for a slot with `async with queue.slot("high"):`; at
+    most max_concurrency slots are held at once and at most
+    class_limits[cls] by any one class. A free slot goes to the waiter
+    with the earliest enqueue time + rank * aging_seconds, so a "medium"
+    item that has waited aging_seconds longer than a "high" one goes
+    first and nothing starves. Within a class that order is FIFO, so
+    each class keeps its own deque and picking the next waiter only
+    compares the class heads.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        class_limits: Optional[Dict[str, int]] = None,
+        aging_seconds: float = DEFAULT_AGING_SECONDS,
+        ranks: Optional[Dict[str, int]] = None
+    ):
+        self.max_concurrency = max_concurrency
+        self.class_limits = dict(class_limits or {})
+        self.aging_seconds = aging_seconds
+        self.ranks = dict(ranks or DEFAULT_RANKS)
+        self._waiting: Dict[str, Deque[_Waiter]] = {}
+        self._running: Dict[str, int] = {}
+        self._total_running = 0
+        self.wait_times: Dict[str, Histogram] = {}
+        self.latencies: Dict[str, Histogram] = {}
+        self.completed: Dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls, queue_config: Dict, default_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> "PriorityWorkQueue":
+        """Build a queue from the priority_queue section of system_config.json"""
+        return cls(
+            max_concurrency=queue_config.get("max_concurrency", default_concurrency),
+            class_limits=queue_config.get("class_limits"),
+            aging_seconds=queue_config.get("aging_seconds", DEFAULT_AGING_SECONDS),
+            ranks=queue_config.get("ranks")
+        )
+
+    def _rank(self, priority: str) -> int:
+        return self.ranks.get(priority, max(self.ranks.values(), default=0))
+
+    def _has_room(self, priority: str) -> bool:
+        if self._total_running >= self.max_concurrency:
+            return False
+        limit = self.class_limits.get(priority)
+        return limit is None or self._running.get(priority, 0) < limit
+
+    def _start(self, priority: str) -> None:
+        self._running[priority] = self._running.get(priority, 0) + 1
+        self._total_running += 1
+
+    def _dispatch(self) -> None:
+        """Hand free slots to the most urgent eligible waiters"""
+        while self._total_running < self.max_concurrency:
+            best = None
+            for priority, waiters in self._waiting.items():
+                while waiters and waiters[0].future.done():
+                    # Cancelled while waiting
+                    waiters.popleft()
+                if waiters and self._has_room(priority) and (best is None or waiters[0].deadline < best.deadline):
+                    best = waiters[0]
+            if best is None:
+                return
+            self._waiting[best.priority].popleft()
+            self._start(best.priority)
+            best.future.set_result(None)
+
+    async def acquire(self, priority: str) -> float:
+        """Wait for a slot; returns the time spent waiting"""
+        now = time.monotonic()
+        waiters = self._waiting.setdefault(priority, deque())
+        if not waiters and self._has_room(priority):
+            self._start(priority)
+            self._observe_wait(priority, 0.0)
+            return 0.0
+
+        future = asyncio.get_running_loop().create_future()
+        waiters.append(_Waiter(priority, now + self._rank(priority) * self.aging_seconds, now, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted as we were cancelled
+                self.release(priority)
+            raise
+        waited = time.monotonic() - now
+        self._observe_wait(priority, waited)
+        return waited
+
+    def release(self, priority: str) -> None:
+        self._running[priority] -= 1
+        self._total_running -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: str) -> AsyncIterator[None]:
+        """Hold a slot of the given priority class for the duration of the block"""
+        start = time.monotonic()
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(priority)
+            self.latencies.setdefault(priority, Histogram()).observe(time.monotonic() - start)
+            self.completed[priority] = self.completed.get(priority, 0) + 1
+
+    def _observe_wait(self, priority: str, waited: float) -> None:
+        self.wait_times.setdefault(priority, Histogram()).observe(waited)
+
+    def stats(self) -> Dict:
+        classes = sorted(set(self._waiting) | set(self._running), key=self._rank)
+        return {
+            "max_concurrency": self.max_concurrency,
+            "running": self._total_running,
+            "classes": {
+                priority: {
+                    "running": self._running.get(priority, 0),
+                    "waiting": sum(1 for w in self._waiting.get(priority, ()) if not w.future.done()),
+                    "limit": self.class_limits.get(priority),
+                    "completed": self.completed.get(priority, 0),
+                    "wait_seconds": self.wait_times[priority].snapshot() if priority in self.wait_times else None,
+                    "latency_seconds": self.latencies[priority].snapshot() if priority in self.latencies else None
+                }
+                for priority in classes
+            }
+        }
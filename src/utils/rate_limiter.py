@@ -0,0 +1,137 @@
+# src/utils/rate_limiter.py
+from typing import Deque, Dict, List, Optional, Tuple
+from collections import deque
+import time
+
+# interaction_limits keys and the outbound action each one caps
+LIMIT_KEYS = {
+    "message": "max_daily_messages",
+    "comment": "max_comment_replies",
+}
+DEFAULT_WINDOW_SECONDS = 24 * 3600
+
+class RateLimitExceeded(Exception):
+    """Raised when an outbound action is over its quota"""
+
+    def __init__(self, platform: str, action: str, retry_after: float):
+        super().__init__(f"{action} limit reached on {platform}, next slot in {retry_after:.0f}s")
+        self.platform = platform
+        self.action = action
+        self.retry_after = retry_after
+
+class SlidingWindow:
+    """Allows at most limit events in any window-second span"""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self._events: Deque[float] = deque()
+
+    def _expire(self, now: float) -> None:
+        while self._events and self._events[0] <= now - self.window:
+            self._events.popleft()
+
+    def try_acquire(self, now: float) -> float:
+        """Record an event and return 0, or return seconds until one is allowed"""
+        self._expire(now)
+        if len(self._events) < self.limit:
+            self._events.append(now)
+            return 0.0
+        if self.limit <= 0:
+            return self.window
+        return self._events[len(self._events) - self.limit] + self.window - now
+
+    def release(self) -> None:
+        """Give back the most recent event"""
+        if self._events:
+            self._events.pop()
+
+    def used(self, now: float) -> int:
+        self._expire(now)
+        return len(self._events)
+
+class RateLimiter:
+    """Sliding-window quotas for outbound actions, per platform
+
+    Limits come from engagement_rules.interaction_limits and apply to
+    each platform separately; actions without a limit are not counted.
+    Check a quota with acquire() before spending an LLM call on a reply
+    that couldn't be sent anyway.
+
+    Usage is kept in process memory only: a restart starts every quota
+    over, and separate worker processes each count on their own.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, window: float = DEFAULT_WINDOW_SECONDS):
+        self.limits: Dict[str, int] = dict(limits or {})
+        self.window = window
+        self._windows: Dict[Tuple[str, str], SlidingWindow] = {}
+        self.allowed = 0
+        self.limited = 0
+
+    @classmethod
+    def from_config(cls, interaction_limits: Dict) -> "RateLimiter":
+        """Build a limiter from engagement_rules.interaction_limits"""
+        return cls(cls.limits_from_config(interaction_limits))
+
+    @staticmethod
+    def limits_from_config(interaction_limits: Dict) -> Dict[str, int]:
+        return {
+            action: interaction_limits[key] for action, key in LIMIT_KEYS.items() if key in interaction_limits
+        }
+
+    def set_limits(self, limits: Dict[str, int]) -> None:
+        """Change the limits, keeping the usage already counted
+
+        Usage for actions that no longer have a limit is dropped.
+        """
+        self.limits = dict(limits)
+        for key in list(self._windows):
+            action = key[1]
+            if action in self.limits:
+                self._windows[key].limit = self.limits[action]
+            else:
+                del self._windows[key]
+
+    def _window(self, platform: str, action: str) -> Optional[SlidingWindow]:
+        if action not in self.limits:
+            return None
+        key = (platform, action)
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = SlidingWindow(self.limits[action], self.window)
+        return window
+
+    def acquire(self, platform: str, action: str) -> None:
+        """Use one unit of quota, or raise RateLimitExceeded"""
+        window = self._window(platform, action)
+        if window is None:
+            return
+        retry_after = window.try_acquire(time.time())
+        if retry_after > 0:
+            self.limited += 1
+            raise RateLimitExceeded(platform, action, retry_after)
+        self.allowed += 1
+
+    def release(self, platform: str, action: str) -> None:
+        """Return a unit of quota taken for work that then failed"""
+        window = self._window(platform, action)
+        if window is not None:
+            window.release()
+
+    def stats(self, platforms: Optional[List[str]] = None) -> Dict:
+        """Quota usage per platform and action, including unused quotas for platforms"""
+        for platform in platforms or []:
+            for action in self.limits:
+                self._window(platform, action)
+        now = time.time()
+        quotas = {}
+        for (platform, action), window in sorted(self._windows.items()):
+            used = window.used(now)
+            quotas[f"{platform}:{action}"] = {
+                "limit": window.limit,
+                "used": used,
+                "remaining": max(0, window.limit - used),
+                "window_seconds": window.window
+            }
+        return {"quotas": quotas, "allowed": self.allowed, "limited": self.limited}
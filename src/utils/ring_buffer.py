@@ -0,0 +1,51 @@
+# src/utils/ring_buffer.py
+from typing import Generic, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+class RingBuffer(Generic[T]):
+    """Fixed-capacity buffer that overwrites its oldest item when full
+
+    Items live in a preallocated list with a moving head, so append is
+    O(1) with no reallocation, and newest-first reads index straight
+    into the slots. Unlike a deque, reading from the middle (offset
+    pagination) costs nothing extra.
+    """
+    __slots__ = ("capacity", "_items", "_head", "_size")
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("RingBuffer capacity must be at least 1")
+        self.capacity = capacity
+        self._items: List[Optional[T]] = [None] * capacity
+        # Slot the next append writes to
+        self._head = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, item: T) -> Optional[T]:
+        """Add an item; returns the item it overwrote, if the buffer was full"""
+        evicted = self._items[self._head] if self._size == self.capacity else None
+        self._items[self._head] = item
+        self._head = (self._head + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+        return evicted
+
+    def newest(self, limit: int, offset: int = 0) -> List[T]:
+        """Up to limit items, newest first, skipping the offset newest"""
+        stop = min(self._size, offset + limit)
+        return [self._items[(self._head - 1 - i) % self.capacity] for i in range(max(0, offset), stop)]
+
+    def __iter__(self) -> Iterator[T]:
+        """Iterate oldest first"""
+        start = self._head - self._size
+        for i in range(self._size):
+            yield self._items[(start + i) % self.capacity]
+
+    def clear(self) -> None:
+        self._items = [None] * self.capacity
+        self._head = 0
+        self._size = 0
@@ -0,0 +1,63 @@
+# src/utils/rolling_counter.py
+from typing import Dict, List, Optional
+import time
+
+class RollingCounter:
+    """Event count over a trailing window, kept in fixed time buckets
+
+    Adding and reading are O(1) amortised: old buckets are zeroed as the
+    clock moves past them and a running total is kept, so the cost never
+    depends on how many events were counted. The oldest bucket may be
+    partly outside the window, so the count is accurate to one bucket.
+    """
+    __slots__ = ("window_seconds", "bucket_seconds", "_counts", "_epoch", "_total")
+
+    def __init__(self, window_seconds: float, buckets: int):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = window_seconds / buckets
+        self._counts: List[int] = [0] * buckets
+        # Bucket number (time // bucket_seconds) of the newest bucket
+        self._epoch: Optional[int] = None
+        self._total = 0
+
+    def _advance(self, now: float) -> None:
+        epoch = int(now // self.bucket_seconds)
+        if self._epoch is None:
+            self._epoch = epoch
+            return
+        steps = epoch - self._epoch
+        if steps <= 0:
+            # Same bucket, or the clock went back; count into the newest one
+            return
+        buckets = len(self._counts)
+        if steps >= buckets:
+            self._counts = [0] * buckets
+            self._total = 0
+        else:
+            for expired in range(self._epoch + 1, epoch + 1):
+                index = expired % buckets
+                self._total -= self._counts[index]
+                self._counts[index] = 0
+        self._epoch = epoch
+
+    def add(self, amount: int = 1, now: Optional[float] = None) -> None:
+        self._advance(time.time() if now is None else now)
+        self._counts[self._epoch % len(self._counts)] += amount
+        self._total += amount
+
+    def total(self, now: Optional[float] = None) -> int:
+        self._advance(time.time() if now is None else now)
+        return self._total
+
+    def to_state(self) -> Dict:
+        return {"bucket_seconds": self.bucket_seconds, "epoch": self._epoch, "counts": list(self._counts)}
+
+    def load_state(self, state: Dict, now: Optional[float] = None) -> None:
+        """Restore buckets saved by to_state, if they have the same layout"""
+        counts = state.get("counts") or []
+        if state.get("bucket_seconds") != self.bucket_seconds or len(counts) != len(self._counts):
+            return
+        self._counts = [int(count) for count in counts]
+        self._epoch = state.get("epoch")
+        self._total = sum(self._counts)
+        self._advance(time.time() if now is None else now)
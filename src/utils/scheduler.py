@@ -0,0 +1,206 @@
+# src/utils/scheduler.py
+from typing import Any, Dict, List, Optional, Set, Tuple
+from datetime import datetime
+import asyncio
+import heapq
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from src.utils.database import decode_cursor, encode_cursor
+from src.utils.job_queue import JobQueue
+from src.utils.sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on how long the timer sleeps without re-checking the heap
+DEFAULT_MAX_SLEEP = 60.0
+
+SCHEDULED = "scheduled"
+DISPATCHED = "dispatched"
+CANCELLED = "cancelled"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scheduled_items (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    run_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    job_id TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scheduled_items_status_run_at ON scheduled_items (status, run_at, id);
+"""
+
+class Scheduler:
+    """Durable scheduler that hands items to the job queue when they come due
+
+    Items are persisted in SQLite. Pending ones are also kept in an
+    in-memory min-heap keyed on run time, so scheduling and firing an
+    item cost O(log n) and a single timer sleeps until the earliest one.
+    Cancelled items are dropped lazily when they reach the top of the
+    heap. Items that came due while the process was down fire on start.
+    Each item is enqueued under a job ID derived from its own ID, so a
+    crash between enqueueing and marking it dispatched can't run it twice.
+    """
+
+    def __init__(self, job_queue: JobQueue, path: str = ":memory:", max_sleep: float = DEFAULT_MAX_SLEEP):
+        self.job_queue = job_queue
+        self.store = SQLiteStore(path, SCHEMA)
+        self.max_sleep = max_sleep
+        self._heap: List[Tuple[float, str]] = []
+        self._cancelled: Set[str] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.dispatched = 0
+
+    @classmethod
+    def from_config(cls, scheduler_config: Dict, job_queue: JobQueue, project_root: str = "") -> "Scheduler":
+        """Build a scheduler from the scheduler section of system_config.json"""
+        path = scheduler_config.get("path", ":memory:")
+        if path != ":memory:" and not os.path.isabs(path):
+            path = os.path.join(project_root, path)
+        return cls(job_queue, path=path, max_sleep=scheduler_config.get("max_sleep", DEFAULT_MAX_SLEEP))
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Load pending items from the database and start the timer"""
+        if self.running:
+            return
+        rows = await self.store.read("SELECT run_at, id FROM scheduled_items WHERE status = ?", (SCHEDULED,))
+        self._heap = [(row["run_at"], row["id"]) for row in rows]
+        heapq.heapify(self._heap)
+        self._cancelled.clear()
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="scheduler-timer")
+        logger.info(f"Scheduler started with {len(self._heap)} pending items")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._stopping = True
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.store.close()
+
+    async def schedule(self, kind: str, payload: Dict[str, Any], run_at: Any) -> Dict[str, Any]:
+        """Schedule a job of kind to be enqueued at run_at (datetime, ISO string or epoch seconds)"""
+        run_at = self._to_timestamp(run_at)
+        item_id = uuid.uuid4().hex
+        now = time.time()
+        await self.store.write(
+            "INSERT INTO scheduled_items (id, kind, payload, run_at, status, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (item_id, kind, json.dumps(payload, default=str), run_at, SCHEDULED, now, now)
+        )
+        earliest = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap, (run_at, item_id))
+        if self._wakeup is not None and (earliest is None or run_at < earliest):
+            self._wakeup.set()
+        return await self.get(item_id)
+
+    async def cancel(self, item_id: str) -> bool:
+        """Cancel a scheduled item; False if it was already dispatched or cancelled"""
+        changed = await self.store.write(
+            "UPDATE scheduled_items SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+            (CANCELLED, time.time(), item_id, SCHEDULED)
+        )
+        if changed:
+            self._cancelled.add(item_id)
+        return changed > 0
+
+    async def get(self, item_id: str) -> Optional[Dict[str, Any]]:
+        rows = await self.store.read("SELECT * FROM scheduled_items WHERE id = ?", (item_id,))
+        return self._to_dict(rows[0]) if rows else None
+
+    async def list_upcoming(self, limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Get a page of pending items, soonest first
+
+        Returns {"items": [...], "next_cursor": str or None}; pass
+        next_cursor back to fetch the following page.
+        """
+        if cursor:
+            position = decode_cursor(cursor)
+            rows = await self.store.read(
+                "SELECT * FROM scheduled_items WHERE status = ? AND (run_at > ? OR (run_at = ? AND id > ?)) "
+                "ORDER BY run_at, id LIMIT ?",
+                (SCHEDULED, position["v"], position["v"], position["id"], limit + 1)
+            )
+        else:
+            rows = await self.store.read(
+                "SELECT * FROM scheduled_items WHERE status = ? ORDER BY run_at, id LIMIT ?", (SCHEDULED, limit + 1)
+            )
+        items = [self._to_dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(last["run_at"], last["id"])
+        return {"items": items, "next_cursor": next_cursor}
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.clear()
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now:
+                _, item_id = heapq.heappop(self._heap)
+                if item_id in self._cancelled:
+                    self._cancelled.discard(item_id)
+                    continue
+                try:
+                    await self._dispatch(item_id)
+                except Exception as e:
+                    logger.error(f"Failed to dispatch scheduled item {item_id}: {str(e)}")
+                    # Try again shortly rather than losing the item
+                    heapq.heappush(self._heap, (now + 1.0, item_id))
+                    break
+
+            timeout = self.max_sleep
+            if self._heap:
+                timeout = min(timeout, max(0.0, self._heap[0][0] - time.time()))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _dispatch(self, item_id: str) -> None:
+        item = await self.get(item_id)
+        if item is None or item["status"] != SCHEDULED:
+            return
+        job_id = await self.job_queue.enqueue(item["kind"], item["payload"], job_id=f"scheduled-{item_id}")
+        await self.store.write(
+            "UPDATE scheduled_items SET status = ?, job_id = ?, updated_at = ? WHERE id = ? AND status = ?",
+            (DISPATCHED, job_id, time.time(), item_id, SCHEDULED)
+        )
+        self.dispatched += 1
+        logger.info(f"Dispatched scheduled {item['kind']} item {item_id} as job {job_id}")
+
+    @staticmethod
+    def _to_timestamp(run_at: Any) -> float:
+        if isinstance(run_at, (int, float)):
+            return float(run_at)
+        if isinstance(run_at, str):
+            run_at = datetime.fromisoformat(run_at)
+        # Naive datetimes are taken as local time
+        return run_at.timestamp()
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        item = dict(row)
+        item["payload"] = json.loads(item["payload"])
+        item["scheduled_for"] = datetime.fromtimestamp(item["run_at"]).isoformat()
+        return item
+
+    def stats(self) -> Dict:
+        return {
+            "pending": len(self._heap) - len(self._cancelled),
+            "dispatched": self.dispatched
+        }
@@ -0,0 +1,68 @@
+# src/utils/sqlite_store.py
+from typing import Any, Callable, List, Optional
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+class SQLiteStore:
+    """A SQLite database used from asyncio code
+
+    Queries run on a worker thread so they never block the event loop,
+    and a lock serializes them on the single shared connection. The
+    schema script runs when the database is opened.
+    """
+
+    def __init__(self, path: str = ":memory:", schema: str = ""):
+        self.path = path
+        self.schema = schema
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._conn is not None
+
+    async def open(self) -> None:
+        """Open the database and create its tables"""
+        await self.run(lambda conn: None)
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await asyncio.to_thread(self._close)
+
+    async def run(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Call fn with the connection on a worker thread"""
+        return await asyncio.to_thread(self._locked, fn)
+
+    async def read(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        return await self.run(lambda conn: conn.execute(sql, params).fetchall())
+
+    async def write(self, sql: str, params: tuple = ()) -> int:
+        """Execute a statement and return the number of rows it changed"""
+        return await self.run(lambda conn: conn.execute(sql, params).rowcount)
+
+    def _locked(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        with self._lock:
+            if self._conn is None:
+                self._connect()
+            return fn(self._conn)
+
+    def _connect(self) -> None:
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        if self.schema:
+            conn.executescript(self.schema)
+        self._conn = conn
+
+    def _close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
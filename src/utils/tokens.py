@@ -0,0 +1,53 @@
+# src/utils/tokens.py
+from functools import lru_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Roughly four characters per token for English text
+CHARS_PER_TOKEN = 4
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """Load the tiktoken encoding used by the OpenAI chat models, if available"""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.info(f"tiktoken unavailable, estimating token counts: {str(e)}")
+        return None
+
+def count_tokens(text: str) -> int:
+    """Count the tokens in text"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+TRUNCATION_MARKER = " […] "
+
+def truncate_tokens(text: str, max_tokens: int, marker: str = TRUNCATION_MARKER) -> str:
+    """Deterministically cut text down to max_tokens
+
+    Keeps the first two thirds and last third of the budget, since both
+    the opening and the end of a message tend to carry its intent.
+    """
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    keep = max(1, max_tokens - count_tokens(marker))
+    head_tokens = (keep * 2 + 2) // 3
+    tail_tokens = keep - head_tokens
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        head = encoding.decode(tokens[:head_tokens])
+        tail = encoding.decode(tokens[len(tokens) - tail_tokens:]) if tail_tokens else ""
+    else:
+        head = text[:head_tokens * CHARS_PER_TOKEN]
+        tail = text[len(text) - tail_tokens * CHARS_PER_TOKEN:] if tail_tokens else ""
+    return f"{head.rstrip()}{marker}{tail.lstrip()}" if tail else f"{head.rstrip()}{marker.rstrip()}"
@@ -0,0 +1,158 @@
+# src/utils/write_behind.py
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from collections import defaultdict
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_MAX_PENDING = 10000
+
+FlushFunction = Callable[[str, List[Dict[str, Any]]], Awaitable[Any]]
+# Queued by flush() to write the batch being collected without waiting out flush_interval
+_FLUSH_NOW = object()
+
+class WriteBehindBuffer:
+    """Buffers documents in memory and writes them in batches
+
+    Documents are flushed per collection once batch_size of them are
+    pending or flush_interval seconds after the first one arrived. The
+    queue holds at most max_pending documents; beyond that add() waits,
+    pushing back on producers instead of growing without bound. Batches
+    that fail to write are appended to a JSON-lines dead-letter file.
+    """
+
+    def __init__(
+        self,
+        flush: FlushFunction,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        dead_letter_path: Optional[str] = None
+    ):
+        self._flush = flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.dead_letter_path = dead_letter_path
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.flushed_documents = 0
+        self.flushed_batches = 0
+        self.failed_documents = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the background flusher on the running event loop"""
+        if self.running:
+            return
+        self._stopping = False
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._task = asyncio.create_task(self._run(), name="write-behind-flusher")
+
+    async def add(self, collection_key: str, document: Dict[str, Any]) -> None:
+        """Queue a document, waiting if the buffer is full"""
+        if self._stopping:
+            raise RuntimeError("Write-behind buffer is shutting down")
+        if not self.running:
+            self.start()
+        await self._queue.put((collection_key, document))
+
+    async def flush(self) -> None:
+        """Write every queued document now and wait until it is written"""
+        if self.running:
+            await self._queue.put(_FLUSH_NOW)
+            await self._queue.join()
+
+    async def stop(self) -> None:
+        """Flush everything still pending and stop the flusher"""
+        if not self.running:
+            return
+        self._stopping = True
+        try:
+            await self._queue.join()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        finally:
+            self._task = None
+            self._stopping = False
+
+    async def _run(self) -> None:
+        while True:
+            items = [await self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while items[-1] is not _FLUSH_NOW and len(items) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 and not self._stopping:
+                    break
+                try:
+                    if self._stopping:
+                        items.append(self._queue.get_nowait())
+                    else:
+                        items.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                    break
+            batch = [item for item in items if item is not _FLUSH_NOW]
+            try:
+                if batch:
+                    await self._write(batch)
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+    async def _write(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        by_collection: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for collection_key, document in batch:
+            by_collection[collection_key].append(document)
+
+        for collection_key, documents in by_collection.items():
+            try:
+                await self._flush(collection_key, documents)
+                self.flushed_documents += len(documents)
+                self.flushed_batches += 1
+            except Exception as e:
+                logger.error(f"Failed to write {len(documents)} {collection_key} documents: {str(e)}")
+                self.failed_documents += len(documents)
+                await self._dead_letter(collection_key, documents, e)
+
+    async def _dead_letter(self, collection_key: str, documents: List[Dict[str, Any]], error: Exception) -> None:
+        if not self.dead_letter_path:
+            return
+        record = {
+            "collection": collection_key,
+            "error": str(error),
+            "failed_at": datetime.now().isoformat(),
+            "documents": documents
+        }
+        line = json.dumps(record, default=str) + "\n"
+        try:
+            await asyncio.to_thread(self._append_line, line)
+        except Exception:
+            logger.exception(f"Could not write dead-letter batch to {self.dead_letter_path}")
+
+    def _append_line(self, line: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.dead_letter_path)), exist_ok=True)
+        with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    def stats(self) -> Dict:
+        return {
+            "pending": self._queue.qsize() if self._queue else 0,
+            "max_pending": self.max_pending,
+            "flushed_documents": self.flushed_documents,
+            "flushed_batches": self.flushed_batches,
+            "failed_documents": self.failed_documents
+        }
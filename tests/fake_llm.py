@@ -0,0 +1,125 @@
+# tests/fake_llm.py
+from typing import Any, AsyncIterator, Callable, List, Optional
+import asyncio
+import math
+import random
+import time
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+# gpt-3.5-turbo list prices in USD per 1M tokens, used to estimate cost
+PROMPT_TOKEN_PRICE = 0.50
+COMPLETION_TOKEN_PRICE = 1.50
+
+def count_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)"""
+    return max(1, len(text) // 4)
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic stand-in for ChatOpenAI that tracks calls and tokens
+
+    Each call waits for a time to first token drawn from
+    latency_distribution ("constant", "uniform" within latency *
+    (1 +/- latency_spread), or "lognormal" with median latency and
+    sigma latency_spread), then for the completion tokens at
+    tokens_per_second (0 returns them at once). Draws come from a
+    generator seeded with seed, so a run is repeatable.
+
+    The benchmarks use it too. For the unit tests, responses are
+    returned in turn (cycling), reply and latency_for compute the
+    response (or raise) and the delay from the prompt, and the last
+    prompt, in-flight calls and streamed chunks are recorded.
+    """
+    latency: float = 0.05
+    latency_distribution: str = "constant"
+    latency_spread: float = 0.0
+    tokens_per_second: float = 0.0
+    seed: int = 0
+    response: str = "Hey y'all! Thanks so much for the love, it means the world to me! 🤠🇺🇸"
+    responses: List[str] = []
+    reply: Optional[Callable[[List[BaseMessage]], str]] = None
+    latency_for: Optional[Callable[[List[BaseMessage]], float]] = None
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    last_messages: List[BaseMessage] = []
+    in_flight: int = 0
+    max_in_flight: int = 0
+    chunks_sent: int = 0
+    closed_early: bool = False
+    _rng: random.Random = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    def first_token_delay(self, messages: Optional[List[BaseMessage]] = None) -> float:
+        if self.latency_for is not None and messages is not None:
+            return self.latency_for(messages)
+        if self.latency_distribution == "uniform":
+            low, high = self.latency * (1 - self.latency_spread), self.latency * (1 + self.latency_spread)
+            return max(0.0, self._rng.uniform(low, high))
+        if self.latency_distribution == "lognormal":
+            return self._rng.lognormvariate(math.log(self.latency), self.latency_spread) if self.latency > 0 else 0.0
+        return self.latency
+
+    def completion_delay(self) -> float:
+        if self.tokens_per_second <= 0:
+            return 0.0
+        return count_tokens(self.response) / self.tokens_per_second
+
+    def _respond(self, messages: List[BaseMessage]) -> str:
+        self.last_messages = messages
+        if self.reply is not None:
+            text = self.reply(messages)
+        elif self.responses:
+            text = self.responses[self.calls % len(self.responses)]
+        else:
+            text = self.response
+        self.calls += 1
+        self.prompt_tokens += sum(count_tokens(str(m.content)) for m in messages)
+        self.completion_tokens += count_tokens(text)
+        return text
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.first_token_delay(messages) + self.completion_delay())
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._respond(messages)))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.first_token_delay(messages) + self.completion_delay())
+        finally:
+            self.in_flight -= 1
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._respond(messages)))])
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        """Yield the response word by word at tokens_per_second"""
+        finished = False
+        try:
+            await asyncio.sleep(self.first_token_delay(messages))
+            words = self._respond(messages).split(" ")
+            for i, word in enumerate(words):
+                chunk = word if i == len(words) - 1 else f"{word} "
+                if self.tokens_per_second > 0:
+                    await asyncio.sleep(count_tokens(chunk) / self.tokens_per_second)
+                self.chunks_sent += 1
+                yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+            finished = True
+        finally:
+            # Set when the caller stopped reading before the last chunk
+            self.closed_early = not finished
+
+    @property
+    def estimated_cost(self) -> float:
+        return (self.prompt_tokens * PROMPT_TOKEN_PRICE + self.completion_tokens * COMPLETION_TOKEN_PRICE) / 1_000_000
@@ -0,0 +1,77 @@
+import json
+import os
+import pytest
+from src.utils.config import ConfigStore
+
+@pytest.fixture
+def config_dir(tmp_path):
+    (tmp_path / "personality_config.json").write_text(json.dumps({"base_traits": {"age": "early 30s"}}))
+    (tmp_path / "system_config.json").write_text(json.dumps({"llm": {"max_concurrency": 4}}))
+    return tmp_path
+
+def _touch(path, payload):
+    path.write_text(json.dumps(payload))
+    stat = os.stat(path)
+    # Make sure the change is visible even on coarse-grained filesystems
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+def test_config_is_parsed_once(config_dir):
+    store = ConfigStore(config_dir=str(config_dir), check_interval=0)
+
+    first = store.get()
+    second = store.get()
+
+    assert first is second
+    assert first["system"]["llm"]["max_concurrency"] == 4
+    assert "engagement" in first
+
+def test_changed_file_is_reloaded_and_subscribers_notified(config_dir):
+    store = ConfigStore(config_dir=str(config_dir), check_interval=0)
+    first = store.get()
+    seen = []
+    store.subscribe(seen.append)
+
+    _touch(config_dir / "personality_config.json", {"base_traits": {"age": "mid 30s"}})
+    reloaded = store.get()
+
+    assert reloaded is not first
+    assert reloaded["personality"]["base_traits"]["age"] == "mid 30s"
+    assert seen == [reloaded]
+
+def test_files_are_not_checked_within_interval(config_dir):
+    store = ConfigStore(config_dir=str(config_dir), check_interval=60)
+    first = store.get()
+
+    _touch(config_dir / "personality_config.json", {"base_traits": {"age": "mid 30s"}})
+
+    assert store.get() is first
+    assert store.reload()["personality"]["base_traits"]["age"] == "mid 30s"
+
+def test_invalid_file_keeps_last_good_config(config_dir):
+    store = ConfigStore(config_dir=str(config_dir), check_interval=0)
+    first = store.get()
+
+    (config_dir / "system_config.json").write_text("{not json")
+    _touch(config_dir / "personality_config.json", {"base_traits": {"age": "mid 30s"}})
+    (config_dir / "system_config.json").write_text("{not json")
+
+    assert store.get() is first
+
+def test_bound_method_subscribers_are_weak(config_dir):
+    store = ConfigStore(config_dir=str(config_dir), check_interval=0)
+    store.get()
+
+    class Listener:
+        calls = 0
+
+        def on_reload(self, config):
+            Listener.calls += 1
+
+    listener = Listener()
+    store.subscribe(listener.on_reload)
+    del listener
+
+    _touch(config_dir / "personality_config.json", {"base_traits": {"age": "mid 30s"}})
+    store.get()
+
+    assert Listener.calls == 0
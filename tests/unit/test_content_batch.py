@@ -0,0 +1,65 @@
+import time
+import pytest
+from src.core.content_manager import ContentManager
+from src.core.personality import PersonalityEngine
+from src.utils.job_queue import JobQueue
+from src.utils.scheduler import Scheduler
+
+LLM_LATENCY = 0.2
+
+def prompt(messages) -> str:
+    return str(messages[-1].content)
+
+def refuse_failed_prompts(messages) -> str:
+    if "FAIL" in prompt(messages):
+        raise RuntimeError("model refused")
+    return "generated post"
+
+@pytest.fixture
+def manager(fake_llm):
+    # Slow for "slow" prompts, failing for "FAIL" prompts
+    llm = fake_llm(
+        reply=refuse_failed_prompts,
+        latency_for=lambda messages: LLM_LATENCY * (2 if "slow" in prompt(messages) else 1)
+    )
+    engine = PersonalityEngine(llm=llm, max_concurrency=16)
+    # In-memory stores, so no registry singletons are backed by data/*.sqlite3
+    return ContentManager(personality=engine, scheduler=Scheduler(JobQueue()))
+
+@pytest.mark.asyncio
+async def test_batch_runs_items_concurrently(manager):
+    specs = [{"content_type": "post"} for _ in range(8)]
+
+    start = time.perf_counter()
+    results = [result async for result in manager.generate_batch(specs, max_concurrency=8)]
+    elapsed = time.perf_counter() - start
+
+    assert sorted(r["index"] for r in results) == list(range(8))
+    assert all(r["success"] and r["content"]["text"] == "generated post" for r in results)
+    assert elapsed < LLM_LATENCY * 2
+
+@pytest.mark.asyncio
+async def test_batch_respects_concurrency_limit(manager):
+    specs = [{"content_type": "post"} for _ in range(4)]
+
+    start = time.perf_counter()
+    results = [result async for result in manager.generate_batch(specs, max_concurrency=2)]
+    elapsed = time.perf_counter() - start
+
+    assert len(results) == 4
+    assert elapsed >= LLM_LATENCY * 2
+
+@pytest.mark.asyncio
+async def test_batch_reports_failures_per_item_in_completion_order(manager):
+    specs = [
+        {"content_type": "reply", "comment": "slow down"},
+        {"content_type": "reply", "comment": "FAIL"},
+        {"content_type": "post"}
+    ]
+
+    results = [result async for result in manager.generate_batch(specs)]
+
+    assert results[-1]["index"] == 0
+    failed = [r for r in results if not r["success"]]
+    assert [r["index"] for r in failed] == [1]
+    assert "model refused" in failed[0]["message"]
@@ -0,0 +1,108 @@
+import pytest
+from src.core.conversation_memory import ConversationMemoryStore
+from src.core.personality import PersonalityEngine
+from src.utils.write_behind import WriteBehindBuffer
+
+@pytest.mark.asyncio
+async def test_window_keeps_recent_turns_and_summarizes_older_ones():
+    store = ConversationMemoryStore(window_turns=3)
+
+    for i in range(5):
+        await store.add_exchange("fan_1", f"message {i}", f"response {i}")
+    memory = await store.get("fan_1")
+
+    assert [turn.message for turn in memory.turns] == ["message 2", "message 3", "message 4"]
+    assert "message 0" in memory.summary and "message 1" in memory.summary
+    assert store.total_tokens == memory.tokens > 0
+
+@pytest.mark.asyncio
+async def test_summary_stays_within_token_budget():
+    store = ConversationMemoryStore(window_turns=1, summary_max_tokens=30)
+
+    for i in range(20):
+        await store.add_exchange("fan_1", f"this is a fairly long message number {i}", f"and a reply {i}")
+    memory = await store.get("fan_1")
+
+    assert memory.summary_tokens <= 30
+    assert "number 18" in memory.summary
+
+@pytest.mark.asyncio
+async def test_least_recently_used_users_are_evicted():
+    store = ConversationMemoryStore(max_users=2)
+
+    await store.add_exchange("fan_1", "hi", "hey")
+    await store.add_exchange("fan_2", "hi", "hey")
+    await store.get("fan_1")
+    await store.add_exchange("fan_3", "hi", "hey")
+
+    assert store.stats()["users"] == 2
+    assert store.stats()["evictions"] == 1
+    assert "fan_2" not in store._users
+
+@pytest.mark.asyncio
+async def test_token_cap_evicts_users():
+    store = ConversationMemoryStore(max_total_tokens=50)
+
+    for i in range(10):
+        await store.add_exchange(f"fan_{i}", "a message with a handful of tokens in it", "a reply of similar size here")
+
+    assert store.total_tokens <= 50
+    assert store.stats()["evictions"] > 0
+
+@pytest.mark.asyncio
+async def test_evicted_user_is_reloaded_from_database(async_db):
+    store = ConversationMemoryStore(database=async_db, window_turns=2, max_users=1)
+
+    for i in range(4):
+        await store.add_exchange("fan_1", f"message {i}", f"response {i}")
+    summary = (await store.get("fan_1")).summary
+    await store.add_exchange("fan_2", "hi", "hey")
+
+    reloaded = await store.get("fan_1")
+
+    assert [turn.message for turn in reloaded.turns] == ["message 2", "message 3"]
+    assert reloaded.summary == summary
+    assert store.stats()["loads"] == 3
+
+@pytest.mark.asyncio
+async def test_turns_are_batched_and_visible_after_eviction(async_db):
+    calls = []
+
+    async def insert_many(collection_key, documents):
+        calls.append(len(documents))
+        return await async_db._run("insert_many", collection_key, documents)
+
+    async_db.write_behind = WriteBehindBuffer(insert_many, batch_size=100, flush_interval=60)
+    store = ConversationMemoryStore(database=async_db, window_turns=2, max_users=1)
+
+    for i in range(3):
+        await store.add_exchange("fan_1", f"message {i}", f"response {i}")
+    await store.add_exchange("fan_2", "hi", "hey")
+    reloaded = await store.get("fan_1")
+    await async_db.close()
+
+    assert [turn.message for turn in reloaded.turns] == ["message 1", "message 2"]
+    assert calls == [4]
+    assert store.stats()["turns"] == 2
+
+@pytest.mark.asyncio
+async def test_engine_includes_fan_history_in_prompt(fake_llm):
+    llm = fake_llm()
+    engine = PersonalityEngine(llm=llm, memory_store=ConversationMemoryStore())
+
+    await engine.generate_response("hi", context={"user_id": "fan_1"})
+    await engine.generate_response("how are you?", context={"user_id": "fan_1"})
+
+    # system prompt, previous human/ai turn, current message
+    assert len(llm.last_messages) == 4
+    assert llm.last_messages[1].content == "hi"
+    assert (await engine.get_personality_stats())["memory_size"] == 2
+
+@pytest.mark.asyncio
+async def test_cached_requests_do_not_use_fan_history(fake_llm):
+    llm = fake_llm()
+    engine = PersonalityEngine(llm=llm, memory_store=ConversationMemoryStore())
+
+    await engine.generate_response("hi", context={"user_id": "fan_1"}, cache_namespace="comment")
+
+    assert engine.memory_store.stats()["users"] == 0
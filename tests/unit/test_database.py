@@ -0,0 +1,168 @@
+import asyncio
+import time
+import mongomock
+import pytest
+from src.utils.database import AsyncDatabaseManager, DatabaseManager
+
+@pytest.fixture
+def db_manager():
+    return DatabaseManager(client=mongomock.MongoClient())
+
+@pytest.fixture
+def async_db(db_manager):
+    return AsyncDatabaseManager(manager=db_manager, max_workers=2, operation_timeout=1.0)
+
+def test_collections_are_created(db_manager):
+    names = set(db_manager.db.list_collection_names())
+    assert set(db_manager.config["collections"].values()) <= names
+
+@pytest.mark.asyncio
+async def test_async_store_and_get_round_trip(async_db):
+    inserted_id = await async_db.store_conversation({"user_id": "fan_1", "message": "hi"})
+    await async_db.store_conversation({"user_id": "fan_2", "message": "hello"})
+
+    history = await async_db.get_conversation_history("fan_1")
+
+    assert isinstance(inserted_id, str)
+    assert [doc["message"] for doc in history] == ["hi"]
+
+@pytest.mark.asyncio
+async def test_manager_is_created_lazily():
+    created = []
+
+    def factory():
+        created.append(True)
+        return DatabaseManager(client=mongomock.MongoClient())
+
+    async_db = AsyncDatabaseManager(manager_factory=factory)
+    assert created == []
+
+    await async_db.store_content({"text": "post"})
+    await async_db.store_metrics({"likes": 1})
+    await async_db.close()
+    assert created == [True]
+
+@pytest.mark.asyncio
+async def test_slow_queries_do_not_block_event_loop(db_manager, async_db, monkeypatch):
+    def slow_insert(data):
+        time.sleep(0.2)
+        return "slow_id"
+
+    monkeypatch.setattr(db_manager, "store_content", slow_insert)
+    ticks = 0
+
+    async def heartbeat():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    beat = asyncio.create_task(heartbeat())
+    assert await async_db.store_content({"text": "post"}) == "slow_id"
+    beat.cancel()
+
+    assert ticks >= 10
+
+@pytest.mark.asyncio
+async def test_pool_size_bounds_parallel_operations(db_manager, async_db, monkeypatch):
+    def slow_insert(data):
+        time.sleep(0.1)
+        return "id"
+
+    monkeypatch.setattr(db_manager, "store_content", slow_insert)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[async_db.store_content({}) for _ in range(4)])
+    elapsed = time.perf_counter() - start
+
+    # Two workers run four 100ms operations in two waves
+    assert 0.18 <= elapsed < 0.35
+
+@pytest.mark.asyncio
+async def test_operation_timeout(db_manager, monkeypatch):
+    async_db = AsyncDatabaseManager(manager=db_manager, operation_timeout=0.05)
+    monkeypatch.setattr(db_manager, "store_conversation", lambda data: time.sleep(0.2))
+
+    with pytest.raises(asyncio.TimeoutError):
+        await async_db.store_conversation({"user_id": "fan_1"})
+
+def test_declared_indexes_are_created(db_manager):
+    db_manager.ensure_indexes()
+
+    conversations = db_manager.db[db_manager.config["collections"]["conversations"]]
+    metrics = db_manager.db[db_manager.config["collections"]["metrics"]]
+    assert "user_id_timestamp" in conversations.index_information()
+    assert metrics.index_information()["raw_metrics_ttl"]["expireAfterSeconds"] > 0
+    assert "kind_created_at" in metrics.index_information()
+
+def test_pages_walk_history_newest_first(db_manager):
+    for i in range(7):
+        db_manager.store_conversation({"user_id": "fan_1", "message": f"m{i}", "timestamp": f"2026-01-0{i + 1}"})
+    db_manager.store_conversation({"user_id": "fan_2", "message": "other fan"})
+
+    messages, cursor = [], None
+    while True:
+        page = db_manager.get_conversation_page("fan_1", limit=3, cursor=cursor)
+        messages.extend(doc["message"] for doc in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert messages == [f"m{i}" for i in reversed(range(7))]
+
+def test_pages_break_timestamp_ties_by_id(db_manager):
+    for i in range(4):
+        db_manager.store_conversation({"user_id": "fan_1", "message": f"m{i}", "timestamp": "2026-01-01"})
+
+    first = db_manager.get_conversation_page("fan_1", limit=2)
+    second = db_manager.get_conversation_page("fan_1", limit=2, cursor=first["next_cursor"])
+
+    assert [d["message"] for d in first["items"] + second["items"]] == ["m3", "m2", "m1", "m0"]
+    assert second["next_cursor"] is None
+
+def test_cursor_keeps_callers_or_filter(db_manager):
+    for i in range(6):
+        db_manager.store_conversation({"user_id": f"fan_{i % 3}", "message": f"m{i}", "timestamp": f"2026-01-0{i + 1}"})
+    query = {"$or": [{"user_id": "fan_0"}, {"user_id": "fan_1"}]}
+
+    first = db_manager.find_page("conversations", query, limit=2)
+    second = db_manager.find_page("conversations", query, limit=2, cursor=first["next_cursor"])
+
+    assert [d["message"] for d in first["items"] + second["items"]] == ["m4", "m3", "m1", "m0"]
+    assert second["next_cursor"] is None
+
+def test_projection_limits_returned_fields(db_manager):
+    db_manager.store_conversation({"user_id": "fan_1", "message": "hi", "response": "hey", "raw": "x" * 1000})
+
+    page = db_manager.get_conversation_page("fan_1", projection=["message"])
+
+    assert set(page["items"][0]) == {"_id", "message", "timestamp"}
+
+def test_history_returns_latest_turns_in_order(db_manager):
+    for i in range(5):
+        db_manager.store_conversation({"user_id": "fan_1", "message": f"m{i}", "timestamp": f"2026-01-0{i + 1}"})
+
+    history = db_manager.get_conversation_history("fan_1", limit=3)
+
+    assert [doc["message"] for doc in history] == ["m2", "m3", "m4"]
+
+def test_history_leaves_out_summaries(db_manager):
+    db_manager.store_conversation({"user_id": "fan_1", "message": "legacy", "timestamp": "2026-01-01"})
+    db_manager.store_conversation({"user_id": "fan_1", "kind": "turn", "message": "turn", "timestamp": "2026-01-02"})
+    db_manager.store_conversation({"user_id": "fan_1", "kind": "summary", "summary": "chatty", "timestamp": "2026-01-03"})
+
+    history = db_manager.get_conversation_history("fan_1")
+
+    assert [doc["message"] for doc in history] == ["legacy", "turn"]
+
+def test_invalid_cursor_is_rejected(db_manager):
+    with pytest.raises(ValueError):
+        db_manager.get_conversation_page("fan_1", cursor="not-a-cursor")
+
+def test_metrics_are_marked_raw_for_ttl(db_manager):
+    db_manager.store_metrics({"likes": 1})
+    db_manager.store_metrics({"likes": 2, "raw": False})
+
+    metrics = db_manager.db[db_manager.config["collections"]["metrics"]]
+    assert metrics.count_documents({"raw": True}) == 1
+    assert all("created_at" in doc for doc in metrics.find())
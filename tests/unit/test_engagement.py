@@ -1,28 +1,74 @@
-# tests/unit/test_engagement.py
-import pytest
-from src.core.engagement import EngagementSystem
-
-async def test_engagement_initialization(mock_config, monkeypatch):
-    def mock_load_config():
-        return mock_config
-        
-    monkeypatch.setattr("src.utils.config.load_config", mock_load_config)
-    system = EngagementSystem()
-    
-    assert system.response_times == mock_config["engagement"]["response_time"]
-    assert system.daily_limits == mock_config["engagement"]["daily_limits"]
-
-async def test_process_interaction(mock_config, monkeypatch):
-    def mock_load_config():
-        return mock_config
-        
-    monkeypatch.setattr("src.utils.config.load_config", mock_load_config)
-    system = EngagementSystem()
-    
-    interaction_data = {"user_id": "123", "message": "Hello"}
-    result = await system.process_interaction(interaction_data)
-    
-    assert isinstance(result, dict)
-    assert "status" in result
-    assert "response" in result
-    assert "processed_at" in result
\ No newline at end of file
+# tests/unit/test_engagement.py
+import pytest
+from src.core.engagement import EngagementSystem
+from src.core.engagement_analytics import EngagementAnalytics
+from src.utils.priority_queue import PriorityWorkQueue
+from src.utils.rate_limiter import RateLimiter
+
+async def test_engagement_initialization(mock_config, monkeypatch):
+    def mock_load_config():
+        return mock_config
+        
+    monkeypatch.setattr("src.utils.config.load_config", mock_load_config)
+    system = EngagementSystem()
+    
+    assert system.response_times == mock_config["engagement"]["response_time"]
+    assert system.daily_limits == mock_config["engagement"]["daily_limits"]
+
+async def test_process_interaction(mock_config, monkeypatch):
+    def mock_load_config():
+        return mock_config
+        
+    monkeypatch.setattr("src.utils.config.load_config", mock_load_config)
+    system = EngagementSystem()
+    
+    interaction_data = {"user_id": "123", "message": "Hello"}
+    result = await system.process_interaction(interaction_data)
+    
+    assert isinstance(result, dict)
+    assert "status" in result
+    assert "response" in result
+    assert "processed_at" in result
+
+@pytest.fixture
+def history_system(async_db):
+    system = EngagementSystem(
+        personality=object(),
+        rate_limiter=RateLimiter(),
+        work_queue=PriorityWorkQueue(),
+        database=async_db,
+        history_capacity=3,
+        analytics=EngagementAnalytics()
+    )
+    return system, async_db
+
+@pytest.mark.asyncio
+async def test_recent_interactions_spill_past_the_window(history_system):
+    system, database = history_system
+
+    for n in range(7):
+        await system.record_interaction({"type": "tip", "user_id": f"fan_{n}", "amount": n})
+    newest = await system.get_recent_interactions(limit=2)
+    page = await system.get_recent_interactions(limit=3, offset=2)
+    await database.close()
+
+    assert len(system.recent_interactions) == 3
+    assert [item["user_id"] for item in newest] == ["fan_6", "fan_5"]
+    assert [item["user_id"] for item in page] == ["fan_4", "fan_3", "fan_2"]
+    assert page[1] == {
+        "id": page[1]["id"], "interaction_type": "tip", "processed_at": page[1]["processed_at"],
+        "user_id": "fan_3", "amount": 3
+    }
+
+@pytest.mark.asyncio
+async def test_persisted_history_is_read_back_from_the_database(history_system):
+    system, database = history_system
+
+    for n in range(2):
+        await system.record_interaction({"type": "subscription", "user_id": f"fan_{n}"})
+    await system.persist_history()
+    interactions = await system.get_recent_interactions(limit=10)
+    await database.close()
+
+    assert len(system.recent_interactions) == 0
+    assert [item["user_id"] for item in interactions] == ["fan_1", "fan_0"]
@@ -0,0 +1,44 @@
+import pytest
+from src.core.engagement_analytics import EngagementAnalytics
+from src.utils.rolling_counter import RollingCounter
+
+def test_rolling_counter_forgets_events_outside_the_window():
+    counter = RollingCounter(60, 60)
+
+    counter.add(now=1000.0)
+    counter.add(2, now=1030.0)
+
+    assert counter.total(now=1030.5) == 3
+    assert counter.total(now=1061.0) == 2
+    assert counter.total(now=5000.0) == 0
+
+def test_counts_by_dimension_and_window():
+    analytics = EngagementAnalytics()
+
+    analytics.record("fansly", "directMessage", "subscribers", now=1000.0)
+    analytics.record("fansly", "comment", "new_users", now=1000.0)
+    analytics.record("x", "comment", "new_users", now=1100.0)
+    snapshot = analytics.snapshot(now=1100.0)
+
+    assert snapshot["total"] == {"total": 3, "1m": 1, "1h": 3, "24h": 3}
+    assert snapshot["by_platform"]["fansly"] == {"total": 2, "1m": 0, "1h": 2, "24h": 2}
+    assert snapshot["by_interaction_type"]["comment"]["total"] == 2
+    assert snapshot["by_user_class"]["subscribers"]["total"] == 1
+
+@pytest.mark.asyncio
+async def test_checkpoint_is_restored_into_a_fresh_instance(async_db):
+    database = async_db
+    analytics = EngagementAnalytics(database=database)
+    for _ in range(2):
+        analytics.record("fansly", "tip", "unknown")
+
+    await analytics.checkpoint()
+    await analytics.checkpoint()
+    restored = EngagementAnalytics(database=database)
+    await restored.restore()
+    checkpoints = database.manager.db["metrics"].count_documents({"kind": "engagement_analytics"})
+    await database.close()
+
+    assert checkpoints == 1
+    assert restored.snapshot()["by_platform"]["fansly"]["total"] == 2
+    assert restored.snapshot()["total"]["1h"] == 2
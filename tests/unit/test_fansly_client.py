@@ -0,0 +1,143 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.api.fansly_client import FanslyAPIError, FanslyClient
+from src.utils.circuit_breaker import CircuitOpenError
+
+class StubFansly:
+    """Local stand-in for the Fansly API that replies from a scripted list of statuses"""
+
+    def __init__(self):
+        self.statuses = []
+        self.requests = []
+        self.peers = set()
+        self.latency = 0.0
+        self.retry_after_statuses = {429, 503}
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests.append((request.method, request.path, await request.json()))
+        self.peers.add(request.transport.get_extra_info("peername"))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        status = self.statuses.pop(0) if self.statuses else 200
+        if status == 200:
+            return web.json_response({"id": f"id-{len(self.requests)}"})
+        headers = {"Retry-After": "0"} if status in self.retry_after_statuses else {}
+        return web.Response(status=status, text="nope", headers=headers)
+
+@pytest_asyncio.fixture
+async def stub():
+    stub = StubFansly()
+    app = web.Application()
+    app.router.add_route("POST", "/{tail:.*}", stub.handle)
+    server = TestServer(app)
+    await server.start_server()
+    stub.url = str(server.make_url("")).rstrip("/")
+    yield stub
+    await server.close()
+
+def make_client(stub: StubFansly, **overrides) -> FanslyClient:
+    config = {"api_url": stub.url, "backoff_base": 0.01, "max_retries": 2, **overrides}
+    return FanslyClient(config)
+
+@pytest.mark.asyncio
+async def test_send_dm_posts_to_the_api(stub):
+    client = make_client(stub)
+
+    result = await client.send_dm("fan-1", "hey you")
+    await client.close()
+
+    assert result["status"] == "success"
+    assert result["message_id"] == "id-1"
+    assert stub.requests == [("POST", "/message", {"recipientId": "fan-1", "content": "hey you"})]
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried(stub):
+    client = make_client(stub)
+    stub.statuses = [503, 429]
+
+    result = await client.post_content({"text": "new post"})
+    await client.close()
+
+    assert result["post_id"] == "id-3"
+    assert len(stub.requests) == 3
+    assert client.retries == 2
+
+@pytest.mark.asyncio
+async def test_post_timeout_is_not_resent(stub):
+    client = make_client(stub, request_timeout=0.05)
+    stub.latency = 0.5
+
+    with pytest.raises(FanslyAPIError):
+        await client.send_dm("fan-1", "hey you")
+    await client.close()
+
+    assert len(stub.requests) == 1
+    assert client.retries == 0
+
+@pytest.mark.asyncio
+async def test_post_server_error_without_retry_after_is_not_resent(stub):
+    client = make_client(stub)
+    stub.retry_after_statuses = {429}
+    stub.statuses = [503]
+
+    with pytest.raises(FanslyAPIError) as error:
+        await client.send_dm("fan-1", "hey you")
+    await client.close()
+
+    assert error.value.status == 503
+    assert len(stub.requests) == 1
+
+@pytest.mark.asyncio
+async def test_post_is_retried_when_the_connection_is_refused(stub, unused_tcp_port):
+    client = make_client(stub, api_url=f"http://127.0.0.1:{unused_tcp_port}")
+
+    with pytest.raises(FanslyAPIError):
+        await client.send_dm("fan-1", "hey you")
+    await client.close()
+
+    assert client.requests == 3
+    assert client.retries == 2
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(stub):
+    client = make_client(stub)
+    stub.statuses = [400]
+
+    with pytest.raises(FanslyAPIError) as error:
+        await client.reply_to_comment("post-1", "nice!", "thank you")
+    await client.close()
+
+    assert error.value.status == 400
+    assert len(stub.requests) == 1
+    assert client.breaker.state == "closed"
+
+@pytest.mark.asyncio
+async def test_circuit_opens_after_repeated_failures_and_recovers(stub):
+    client = make_client(stub, max_retries=0, breaker_failure_threshold=2, breaker_reset_timeout=0.1)
+    stub.statuses = [500, 500]
+
+    for _ in range(2):
+        with pytest.raises(FanslyAPIError):
+            await client.send_dm("fan-1", "hi")
+    with pytest.raises(CircuitOpenError):
+        await client.send_dm("fan-1", "hi")
+    assert len(stub.requests) == 2
+
+    await asyncio.sleep(0.15)
+    assert (await client.send_dm("fan-1", "hi"))["status"] == "success"
+    assert client.breaker.state == "closed"
+    await client.close()
+
+@pytest.mark.asyncio
+async def test_connections_are_pooled_and_capped_per_host(stub):
+    client = make_client(stub, max_connections_per_host=4)
+    stub.latency = 0.01
+
+    await asyncio.gather(*(client.send_dm(f"fan-{n}", "hi") for n in range(40)))
+    await client.close()
+
+    assert len(stub.requests) == 40
+    assert len(stub.peers) <= 4
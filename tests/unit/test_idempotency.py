@@ -0,0 +1,60 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from src.utils.idempotency import IdempotencyStore, event_key
+
+@pytest_asyncio.fixture
+async def store(tmp_path):
+    store = IdempotencyStore(path=str(tmp_path / "seen.sqlite3"), ttl_seconds=60)
+    yield store
+    await store.close()
+
+@pytest.mark.asyncio
+async def test_second_claim_of_a_key_is_a_duplicate(store):
+    assert await store.claim("id:evt-1")
+    assert not await store.claim("id:evt-1")
+    assert await store.claim("id:evt-2")
+
+    stats = store.stats()
+    assert stats["accepted"] == 2
+    assert stats["duplicates_dropped"] == 1
+    assert stats["memory_hits"] == 1
+
+@pytest.mark.asyncio
+async def test_concurrent_claims_accept_exactly_one(store):
+    results = await asyncio.gather(*(store.claim("id:evt-1") for _ in range(10)))
+
+    assert results.count(True) == 1
+
+@pytest.mark.asyncio
+async def test_seen_keys_survive_a_restart(tmp_path):
+    path = str(tmp_path / "seen.sqlite3")
+    first = IdempotencyStore(path=path)
+    assert await first.claim("id:evt-1")
+    await first.close()
+
+    second = IdempotencyStore(path=path)
+    assert not await second.claim("id:evt-1")
+    assert second.stats()["memory_hits"] == 0
+    await second.close()
+
+@pytest.mark.asyncio
+async def test_key_can_be_claimed_again_after_ttl(tmp_path):
+    store = IdempotencyStore(path=str(tmp_path / "seen.sqlite3"), ttl_seconds=0.05)
+    assert await store.claim("id:evt-1")
+    await asyncio.sleep(0.1)
+
+    assert await store.claim("id:evt-1")
+    await store.close()
+
+@pytest.mark.asyncio
+async def test_released_key_can_be_claimed_again(store):
+    assert await store.claim("id:evt-1")
+    await store.release("id:evt-1")
+
+    assert await store.claim("id:evt-1")
+
+def test_event_key_prefers_event_id_over_body_hash():
+    assert event_key({"event_id": "abc"}, b"{}") == "id:abc"
+    assert event_key({}, b'{"a": 1}') == event_key({}, b'{"a": 1}')
+    assert event_key({}, b'{"a": 1}') != event_key({}, b'{"a": 2}')
@@ -0,0 +1,192 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from src.utils.job_queue import JobQueue, RetryLater
+
+async def wait_for_status(queue: JobQueue, job_id: str, status: str, timeout: float = 2.0) -> dict:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        job = await queue.get(job_id)
+        if job["status"] == status or asyncio.get_running_loop().time() > deadline:
+            return job
+        await asyncio.sleep(0.01)
+
+@pytest_asyncio.fixture
+async def queue(tmp_path):
+    queue = JobQueue(path=str(tmp_path / "jobs.sqlite3"), workers=2, backoff_base=0.01, poll_interval=0.02)
+    yield queue
+    await queue.stop()
+
+@pytest.mark.asyncio
+async def test_job_runs_and_stores_result(queue):
+    async def double(payload):
+        return {"value": payload["value"] * 2}
+    queue.register("double", double)
+    await queue.start()
+
+    job_id = await queue.enqueue("double", {"value": 21})
+    job = await wait_for_status(queue, job_id, "succeeded")
+
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"value": 42}
+    assert job["attempts"] == 1
+
+@pytest.mark.asyncio
+async def test_enqueue_returns_without_waiting_for_the_job(queue):
+    release = asyncio.Event()
+
+    async def slow(payload):
+        await release.wait()
+    queue.register("slow", slow)
+    await queue.start()
+
+    job_id = await asyncio.wait_for(queue.enqueue("slow"), timeout=0.5)
+    job = await wait_for_status(queue, job_id, "running")
+
+    assert job["status"] == "running"
+    release.set()
+    assert (await wait_for_status(queue, job_id, "succeeded"))["status"] == "succeeded"
+
+@pytest.mark.asyncio
+async def test_failing_job_is_retried_then_marked_failed(queue):
+    calls = []
+
+    async def flaky(payload):
+        calls.append(1)
+        if len(calls) < 2:
+            raise RuntimeError("upstream timeout")
+        return "ok"
+
+    async def broken(payload):
+        raise RuntimeError("always broken")
+
+    queue.register("flaky", flaky)
+    queue.register("broken", broken)
+    await queue.start()
+
+    flaky_id = await queue.enqueue("flaky")
+    broken_id = await queue.enqueue("broken", max_attempts=2)
+
+    flaky_job = await wait_for_status(queue, flaky_id, "succeeded")
+    broken_job = await wait_for_status(queue, broken_id, "failed")
+    assert flaky_job["attempts"] == 2
+    assert broken_job["attempts"] == 2
+    assert broken_job["error"] == "always broken"
+
+@pytest.mark.asyncio
+async def test_cancel_running_and_queued_jobs(queue):
+    started = asyncio.Event()
+
+    async def forever(payload):
+        started.set()
+        await asyncio.sleep(60)
+    queue.register("forever", forever)
+    await queue.start()
+
+    running_id = await queue.enqueue("forever")
+    await started.wait()
+    delayed_id = await queue.enqueue("forever", delay=60)
+
+    assert await queue.cancel(running_id)
+    assert await queue.cancel(delayed_id)
+    assert not await queue.cancel(delayed_id)
+    await asyncio.sleep(0.05)
+
+    assert (await queue.get(running_id))["status"] == "cancelled"
+    assert (await queue.get(delayed_id))["status"] == "cancelled"
+    assert (await queue.stats())["running"] == 0
+
+@pytest.mark.asyncio
+async def test_interrupted_jobs_resume_after_restart(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    started = asyncio.Event()
+    results = []
+
+    async def hang(payload):
+        started.set()
+        await asyncio.sleep(60)
+
+    async def finish(payload):
+        results.append(payload["n"])
+
+    first = JobQueue(path=path, workers=1, poll_interval=0.02)
+    first.register("work", hang)
+    await first.start()
+    job_id = await first.enqueue("work", {"n": 7})
+    await started.wait()
+    await first.stop()
+
+    second = JobQueue(path=path, workers=1, poll_interval=0.02)
+    second.register("work", finish)
+    await second.start()
+    job = await wait_for_status(second, job_id, "succeeded")
+    await second.stop()
+
+    assert job["status"] == "succeeded"
+    assert results == [7]
+
+@pytest.mark.asyncio
+async def test_unknown_job_kind_is_rejected(queue):
+    with pytest.raises(ValueError):
+        await queue.enqueue("missing")
+
+@pytest.mark.asyncio
+async def test_jobs_with_the_same_ordering_key_run_one_at_a_time_in_order(queue):
+    events = []
+
+    async def step(payload):
+        events.append(("start", payload["n"]))
+        await asyncio.sleep(payload.get("delay", 0))
+        events.append(("end", payload["n"]))
+    queue.register("step", step)
+
+    ids = [
+        await queue.enqueue("step", {"n": 1, "delay": 0.1}, ordering_key="user-1"),
+        await queue.enqueue("step", {"n": 2}, ordering_key="user-1"),
+        await queue.enqueue("step", {"n": 3}, ordering_key="user-2"),
+    ]
+    await queue.start()
+    for job_id in ids:
+        await wait_for_status(queue, job_id, "succeeded")
+
+    # user-2's job doesn't wait behind user-1's slow one
+    assert events.index(("end", 3)) < events.index(("end", 1))
+    assert events.index(("end", 1)) < events.index(("start", 2))
+
+@pytest.mark.asyncio
+async def test_ordering_key_holds_later_jobs_while_one_is_retried(queue):
+    order = []
+
+    async def flaky(payload):
+        order.append(payload["n"])
+        if payload["n"] == 1 and order.count(1) == 1:
+            raise RuntimeError("try again")
+    queue.register("flaky", flaky)
+
+    first = await queue.enqueue("flaky", {"n": 1}, ordering_key="user-1")
+    second = await queue.enqueue("flaky", {"n": 2}, ordering_key="user-1")
+    await queue.start()
+    await wait_for_status(queue, second, "succeeded")
+
+    assert (await queue.get(first))["status"] == "succeeded"
+    assert order == [1, 1, 2]
+
+@pytest.mark.asyncio
+async def test_retry_later_defers_without_using_an_attempt(queue):
+    calls = []
+
+    async def waiting(payload):
+        calls.append(1)
+        if len(calls) < 3:
+            raise RetryLater(0.02, "quota used up")
+        return "sent"
+    queue.register("waiting", waiting)
+    await queue.start()
+
+    job_id = await queue.enqueue("waiting", max_attempts=1)
+    job = await wait_for_status(queue, job_id, "succeeded")
+
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 1
+    assert len(calls) == 3
+    assert (await queue.stats())["deferred"] == 2
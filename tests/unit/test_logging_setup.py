@@ -0,0 +1,65 @@
+import json
+import logging
+import queue
+from src.utils.logging_setup import JsonFormatter, NonBlockingQueueHandler, SamplingFilter, setup_logging, stop_logging
+
+def make_record(message: str, level: int = logging.INFO, lineno: int = 1, **extra) -> logging.LogRecord:
+    record = logging.LogRecord("src.core.engagement", level, "engagement.py", lineno, message, (), None)
+    record.__dict__.update(extra)
+    return record
+
+def test_json_formatter_emits_extra_fields_and_clips_them():
+    formatter = JsonFormatter(max_field_chars=10)
+
+    data = json.loads(formatter.format(make_record("hello", user_id="fan_1", payload="x" * 50, attempt=2)))
+
+    assert data["message"] == "hello"
+    assert data["level"] == "INFO"
+    assert data["logger"] == "src.core.engagement"
+    assert data["user_id"] == "fan_1"
+    assert data["attempt"] == 2
+    assert data["payload"] == "x" * 10 + "... [40 chars truncated]"
+
+def test_sampling_keeps_one_in_n_per_call_site_and_all_warnings():
+    sampler = SamplingFilter({"src.core.engagement": 5})
+
+    kept = sum(sampler.filter(make_record("busy", lineno=10)) for _ in range(20))
+    rare = sampler.filter(make_record("rare", lineno=20))
+    warnings = sum(sampler.filter(make_record("bad", logging.WARNING, lineno=10)) for _ in range(3))
+
+    assert kept == 4
+    assert rare
+    assert warnings == 3
+    assert sampler.dropped == 16
+
+def test_queue_handler_clips_messages_and_drops_when_full():
+    log_queue = queue.Queue(maxsize=1)
+    handler = NonBlockingQueueHandler(log_queue, max_message_chars=5)
+
+    handler.handle(make_record("0123456789"))
+    handler.handle(make_record("dropped"))
+
+    assert log_queue.get_nowait().getMessage() == "01234... [5 chars truncated]"
+    assert handler.dropped == 1
+
+def test_pipeline_writes_rotated_json_lines(tmp_path):
+    logger = logging.getLogger("test_logging_setup.pipeline")
+    logger.propagate = False
+    setup_logging(
+        {"path": str(tmp_path / "app.log"), "max_bytes": 2000, "backup_count": 2, "console": False},
+        logger=logger
+    )
+    try:
+        for n in range(100):
+            logger.info("request %d handled", n, extra={"route": "/api/engagement/interact"})
+    finally:
+        stop_logging()
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+
+    lines = (tmp_path / "app.log").read_text(encoding="utf-8").splitlines()
+    assert (tmp_path / "app.log.1").exists()
+    assert not (tmp_path / "app.log.3").exists()
+    last = json.loads(lines[-1])
+    assert last["message"] == "request 99 handled"
+    assert last["route"] == "/api/engagement/interact"
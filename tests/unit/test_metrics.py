@@ -0,0 +1,84 @@
+import httpx
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import FastAPI
+from src.api.metrics import MetricsMiddleware, router
+from src.core import registry
+from src.core.conversation_memory import ConversationMemoryStore
+from src.core.personality import PersonalityEngine
+from src.utils.metrics import MetricsRegistry, REGISTRY, STAGE_ERRORS, STAGE_IN_FLIGHT, STAGE_SECONDS, timed_stage
+
+def test_render_uses_the_prometheus_text_format():
+    metrics = MetricsRegistry()
+    requests = metrics.counter("requests_total", "Requests", ["route"])
+    latency = metrics.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    requests.inc(route="/a")
+    requests.inc(2, route="/a")
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5.0)
+
+    lines = metrics.render().splitlines()
+
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{route="/a"} 3' in lines
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "latency_seconds_count 3" in lines
+
+def test_timed_stage_counts_errors():
+    before = STAGE_ERRORS.value(stage="test.failing")
+
+    with pytest.raises(RuntimeError):
+        with timed_stage("test.failing"):
+            raise RuntimeError("boom")
+
+    assert STAGE_ERRORS.value(stage="test.failing") == before + 1
+    assert STAGE_SECONDS.histogram(stage="test.failing").count >= 1
+
+def test_timed_stage_counts_are_exact_across_threads():
+    def run_stages(_):
+        for _ in range(2000):
+            with timed_stage("test.threaded"):
+                pass
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(run_stages, range(8)))
+
+    assert STAGE_SECONDS.histogram(stage="test.threaded").count == 16000
+    assert STAGE_IN_FLIGHT.value(stage="test.threaded") == 0
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_routes_stages_and_cache_hits(fake_llm):
+    registry.reset()
+    engine = PersonalityEngine(
+        llm=fake_llm(responses=["hello there", "hi again"]), memory_store=ConversationMemoryStore()
+    )
+    registry.register("personality_engine", engine)
+    for _ in range(2):
+        await engine.generate_response("hi", cache_namespace="comment:x:follower", cache_text="hi")
+
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(router)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"id": item_id}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get("/items/1")
+        await client.get("/items/2")
+        response = await client.get("/metrics")
+    registry.reset()
+
+    body = response.text
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'influencer_http_requests_total{method="GET",route="/items/{item_id}",status="200"} 2' in body
+    assert 'influencer_stage_duration_seconds_count{stage="llm.chain"}' in body
+    assert 'influencer_stage_duration_seconds_count{stage="prompt.assemble"}' in body
+    assert 'influencer_response_cache_lookups_total{result="hit"} 1' in body
+    assert 'influencer_llm_tokens_total{request_type="default",direction="output"}' in body
+    assert REGISTRY.render().count("# TYPE influencer_stage_duration_seconds histogram") == 1
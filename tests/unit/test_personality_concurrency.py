@@ -0,0 +1,51 @@
+import asyncio
+import time
+import pytest
+from src.core.personality import PersonalityEngine
+
+LLM_LATENCY = 0.2
+
+async def _run_concurrently(engine: PersonalityEngine, count: int) -> float:
+    start = time.perf_counter()
+    responses = await asyncio.gather(*[
+        engine.generate_response(f"Hello #{i}") for i in range(count)
+    ])
+    elapsed = time.perf_counter() - start
+    assert responses == [engine.llm.response] * count
+    return elapsed
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_take_about_one_llm_latency(fake_llm):
+    engine = PersonalityEngine(llm=fake_llm(latency=LLM_LATENCY), max_concurrency=16)
+
+    elapsed = await _run_concurrently(engine, 16)
+
+    # Serialized calls would take 16 * LLM_LATENCY
+    assert elapsed < LLM_LATENCY * 3
+    assert engine.llm.max_in_flight == 16
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_bounds_in_flight_calls(fake_llm):
+    engine = PersonalityEngine(llm=fake_llm(latency=LLM_LATENCY), max_concurrency=4)
+
+    elapsed = await _run_concurrently(engine, 8)
+
+    assert engine.llm.max_in_flight == 4
+    assert LLM_LATENCY * 2 <= elapsed < LLM_LATENCY * 4
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive_during_generation(fake_llm):
+    engine = PersonalityEngine(llm=fake_llm(latency=LLM_LATENCY))
+    ticks = 0
+
+    async def heartbeat():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    beat = asyncio.create_task(heartbeat())
+    await engine.generate_response("Hello!")
+    beat.cancel()
+
+    assert ticks >= 5
@@ -0,0 +1,72 @@
+import asyncio
+import copy
+import pytest
+from src.core.personality import PersonalityEngine
+
+def system_prompt(messages) -> str:
+    return messages[0].content
+
+@pytest.mark.asyncio
+async def test_update_bumps_version_and_rebuilds_chain(fake_llm):
+    engine = PersonalityEngine(llm=fake_llm(reply=system_prompt))
+    old_chain = engine.chain
+
+    await engine.update_personality({"base_traits": {"age": "mid 30s"}})
+
+    stats = await engine.get_personality_stats()
+    assert stats["version"] == 2
+    assert engine.chain is not old_chain
+    assert "mid 30s" in await engine.generate_response("Hello!")
+
+@pytest.mark.asyncio
+async def test_unchanged_update_keeps_version(fake_llm):
+    engine = PersonalityEngine(llm=fake_llm(reply=system_prompt))
+    age = engine.traits["age"]
+
+    await engine.update_personality({"base_traits": {"age": age}})
+
+    assert engine.version == 1
+
+@pytest.mark.asyncio
+async def test_in_flight_request_finishes_on_old_version(fake_llm):
+    engine = PersonalityEngine(llm=fake_llm(reply=system_prompt, latency=0.1))
+    old_age = engine.traits["age"]
+
+    in_flight = asyncio.create_task(engine.generate_response("Hello!"))
+    await asyncio.sleep(0.02)
+    await engine.update_personality({"base_traits": {"age": "mid 30s"}})
+
+    assert old_age in await in_flight
+    assert "mid 30s" in await engine.generate_response("Hello again!")
+
+@pytest.mark.asyncio
+async def test_reverting_traits_reuses_compiled_chain(fake_llm):
+    engine = PersonalityEngine(llm=fake_llm(reply=system_prompt))
+    original_chain = engine.chain
+    old_age = engine.traits["age"]
+
+    await engine.update_personality({"base_traits": {"age": "mid 30s"}})
+    await engine.update_personality({"base_traits": {"age": old_age}})
+
+    assert engine.chain is original_chain
+    assert engine.version == 3
+
+@pytest.mark.asyncio
+async def test_update_does_not_mutate_loaded_config(fake_llm):
+    engine = PersonalityEngine(llm=fake_llm(reply=system_prompt))
+    old_age = engine.config["base_traits"]["age"]
+
+    await engine.update_personality({"base_traits": {"age": "mid 30s"}})
+
+    assert engine.config["base_traits"]["age"] == old_age
+
+@pytest.mark.asyncio
+async def test_config_file_reload_swaps_personality(fake_llm):
+    engine = PersonalityEngine(llm=fake_llm(reply=system_prompt))
+    personality = copy.deepcopy(engine.config)
+    personality["base_traits"]["age"] = "late 30s"
+
+    engine._on_config_reload({"personality": personality})
+
+    assert engine.version == 2
+    assert "late 30s" in await engine.generate_response("Hello!")
@@ -0,0 +1,95 @@
+import asyncio
+import pytest
+from src.utils.histogram import Histogram
+from src.utils.priority_queue import PriorityWorkQueue
+
+async def run(queue: PriorityWorkQueue, priority: str, name: str, order: list, hold: float = 0.0) -> None:
+    async with queue.slot(priority):
+        order.append(name)
+        await asyncio.sleep(hold)
+
+async def enqueue(queue: PriorityWorkQueue, priority: str, name: str, order: list, hold: float = 0.0) -> asyncio.Task:
+    task = asyncio.create_task(run(queue, priority, name, order, hold))
+    await asyncio.sleep(0.001)  # let it start waiting, so enqueue order is fixed
+    return task
+
+@pytest.mark.asyncio
+async def test_high_priority_waiters_go_first():
+    queue = PriorityWorkQueue(max_concurrency=1, aging_seconds=60)
+    order = []
+    blocker = await enqueue(queue, "high", "blocker", order, hold=0.02)
+
+    tasks = [await enqueue(queue, "medium", f"medium-{n}", order) for n in range(3)]
+    tasks += [await enqueue(queue, "high", f"high-{n}", order) for n in range(2)]
+    await asyncio.gather(blocker, *tasks)
+
+    assert order == ["blocker", "high-0", "high-1", "medium-0", "medium-1", "medium-2"]
+
+@pytest.mark.asyncio
+async def test_waiting_long_enough_outranks_higher_priority():
+    queue = PriorityWorkQueue(max_concurrency=1, aging_seconds=0.01)
+    order = []
+    blocker = await enqueue(queue, "high", "blocker", order, hold=0.05)
+
+    old_medium = await enqueue(queue, "medium", "old-medium", order)
+    await asyncio.sleep(0.02)
+    new_high = await enqueue(queue, "high", "new-high", order)
+    await asyncio.gather(blocker, old_medium, new_high)
+
+    assert order == ["blocker", "old-medium", "new-high"]
+
+@pytest.mark.asyncio
+async def test_class_limit_keeps_slots_free_for_other_classes():
+    queue = PriorityWorkQueue(max_concurrency=4, class_limits={"medium": 2})
+    order = []
+
+    mediums = [await enqueue(queue, "medium", f"medium-{n}", order, hold=0.05) for n in range(4)]
+    assert queue.stats()["classes"]["medium"]["running"] == 2
+    assert queue.stats()["classes"]["medium"]["waiting"] == 2
+
+    high = await enqueue(queue, "high", "high", order)
+    await high
+    assert order == ["medium-0", "medium-1", "high"]
+    await asyncio.gather(*mediums)
+    assert queue.stats()["running"] == 0
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_a_slot():
+    queue = PriorityWorkQueue(max_concurrency=1)
+    order = []
+    blocker = await enqueue(queue, "high", "blocker", order, hold=0.02)
+    cancelled = await enqueue(queue, "high", "cancelled", order)
+    cancelled.cancel()
+    after = await enqueue(queue, "medium", "after", order)
+
+    await asyncio.gather(blocker, after)
+
+    assert order == ["blocker", "after"]
+    assert queue.stats()["running"] == 0
+
+@pytest.mark.asyncio
+async def test_high_priority_latency_holds_under_overload():
+    queue = PriorityWorkQueue(max_concurrency=2, aging_seconds=60)
+    order = []
+
+    tasks = [asyncio.create_task(run(queue, "medium", f"m{n}", order, hold=0.01)) for n in range(30)]
+    await asyncio.sleep(0.005)
+    tasks += [asyncio.create_task(run(queue, "high", f"h{n}", order, hold=0.01)) for n in range(4)]
+    await asyncio.gather(*tasks)
+
+    classes = queue.stats()["classes"]
+    assert classes["high"]["completed"] == 4
+    assert classes["high"]["wait_seconds"]["p99"] <= 0.05
+    assert classes["medium"]["wait_seconds"]["p99"] >= 0.1
+
+def test_histogram_percentiles_use_bucket_bounds():
+    histogram = Histogram(buckets=(0.01, 0.1, 1.0))
+    for value in [0.005] * 90 + [0.05] * 9 + [5.0]:
+        histogram.observe(value)
+
+    assert histogram.percentile(0.5) == 0.01
+    assert histogram.percentile(0.95) == 0.1
+    assert histogram.percentile(1.0) == float("inf")
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 100
+    assert snapshot["buckets"] == {"0.01": 90, "0.1": 9, "1.0": 0, "+Inf": 1}
@@ -0,0 +1,73 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from src.core.conversation_memory import ConversationMemoryStore
+from src.core.personality import PersonalityEngine
+from src.core.prompt_builder import PromptBudget, PromptBuilder, PromptTelemetry
+from src.utils.tokens import count_tokens, truncate_tokens
+
+def test_truncate_tokens_is_deterministic_and_within_budget():
+    text = " ".join(f"word{i}" for i in range(500))
+
+    first = truncate_tokens(text, 50)
+
+    assert first == truncate_tokens(text, 50)
+    assert count_tokens(first) <= 50
+    assert first.startswith("word0") and first.endswith("word499")
+
+def test_short_text_is_not_truncated():
+    builder = PromptBuilder()
+
+    assert builder.clip_message("interaction", "hey there") == "hey there"
+    assert not builder.truncations
+
+def test_clip_message_counts_truncations():
+    builder = PromptBuilder({"interaction": PromptBudget(max_message_tokens=10, max_prompt_tokens=100, max_history_tokens=100)})
+
+    clipped = builder.clip_message("interaction", "spam " * 200)
+
+    assert count_tokens(clipped) <= 10
+    assert builder.truncations["interaction"] == 1
+
+def test_from_config_overrides_defaults():
+    builder = PromptBuilder.from_config({"content": {"max_prompt_tokens": 42}})
+
+    assert builder.budget("content").max_prompt_tokens == 42
+    assert builder.budget("content").max_history_tokens == 0
+    assert builder.budget("unknown") == builder.budget("default")
+
+def test_clip_history_drops_oldest_turns_first():
+    builder = PromptBuilder({"interaction": PromptBudget(max_message_tokens=10, max_prompt_tokens=100, max_history_tokens=30)})
+    messages = [SystemMessage(content="Earlier conversation with this fan: they like cats")]
+    for i in range(10):
+        messages += [HumanMessage(content=f"message number {i}"), AIMessage(content=f"response number {i}")]
+
+    history = builder.clip_history("interaction", messages)
+
+    assert sum(count_tokens(str(m.content)) for m in history) <= 30
+    assert history[-1].content == "response number 9"
+    assert all(m.content != "message number 0" for m in history)
+
+def test_telemetry_tracks_per_request_type():
+    telemetry = PromptTelemetry()
+
+    telemetry.record("interaction", input_tokens=100, output_tokens=20)
+    telemetry.record("interaction", input_tokens=300, output_tokens=40)
+
+    stats = telemetry.stats()["interaction"]
+    assert stats["calls"] == 2
+    assert stats["avg_input_tokens"] == 200
+    assert stats["max_output_tokens"] == 40
+
+@pytest.mark.asyncio
+async def test_engine_clips_prompt_and_records_telemetry(fake_llm):
+    llm = fake_llm(response="a short reply")
+    engine = PersonalityEngine(llm=llm, memory_store=ConversationMemoryStore())
+    engine.prompt_builder = PromptBuilder({"webhook": PromptBudget(max_message_tokens=20, max_prompt_tokens=20, max_history_tokens=0)})
+
+    await engine.generate_response("blah " * 500, context={"user_id": "fan_1"}, request_type="webhook")
+
+    assert count_tokens(llm.last_messages[-1].content) <= 20
+    stats = (await engine.get_personality_stats())["prompt_telemetry"]["webhook"]
+    assert stats["calls"] == 1
+    assert stats["max_input_tokens"] <= engine._active.system_prompt_tokens + 20
+    assert stats["output_tokens"] == count_tokens("a short reply")
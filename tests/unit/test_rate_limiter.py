@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from src.core.engagement import EngagementSystem
+from src.core.engagement_analytics import EngagementAnalytics
+from src.core.personality import PersonalityEngine
+from src.utils.priority_queue import PriorityWorkQueue
+from src.utils.rate_limiter import RateLimiter, RateLimitExceeded
+
+def test_allows_up_to_the_limit_then_raises():
+    limiter = RateLimiter({"message": 2}, window=60)
+
+    limiter.acquire("fansly", "message")
+    limiter.acquire("fansly", "message")
+    with pytest.raises(RateLimitExceeded) as error:
+        limiter.acquire("fansly", "message")
+
+    assert 59 < error.value.retry_after <= 60
+    assert limiter.stats()["limited"] == 1
+
+def test_quotas_are_per_platform_and_unlimited_actions_pass():
+    limiter = RateLimiter({"message": 1}, window=60)
+
+    limiter.acquire("fansly", "message")
+    limiter.acquire("x", "message")
+    for _ in range(10):
+        limiter.acquire("fansly", "like")
+
+    quotas = limiter.stats()["quotas"]
+    assert quotas["fansly:message"]["remaining"] == 0
+    assert quotas["x:message"]["used"] == 1
+    assert "fansly:like" not in quotas
+
+@pytest.mark.asyncio
+async def test_quota_frees_up_as_the_window_slides():
+    limiter = RateLimiter({"comment": 1}, window=0.05)
+
+    limiter.acquire("x", "comment")
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire("x", "comment")
+    await asyncio.sleep(0.06)
+
+    limiter.acquire("x", "comment")
+
+def test_released_quota_can_be_used_again():
+    limiter = RateLimiter({"message": 1}, window=60)
+
+    limiter.acquire("fansly", "message")
+    limiter.release("fansly", "message")
+
+    limiter.acquire("fansly", "message")
+
+def test_limits_come_from_interaction_limits_and_reload_keeps_usage():
+    limiter = RateLimiter.from_config(
+        {"max_daily_messages": 1, "max_comment_replies": 5, "min_response_time": "1 minute"}
+    )
+    assert limiter.limits == {"message": 1, "comment": 5}
+
+    limiter.acquire("fansly", "message")
+    limiter.set_limits({"message": 2, "comment": 5})
+
+    limiter.acquire("fansly", "message")
+    assert limiter.stats(["x"])["quotas"]["x:comment"] == {
+        "limit": 5, "used": 0, "remaining": 5, "window_seconds": limiter.window
+    }
+
+def test_removed_limits_drop_their_usage():
+    limiter = RateLimiter({"message": 1, "comment": 1})
+    limiter.acquire("fansly", "message")
+    limiter.acquire("fansly", "comment")
+
+    limiter.set_limits({"message": 1})
+
+    assert list(limiter.stats()["quotas"]) == ["fansly:message"]
+    limiter.acquire("fansly", "comment")
+
+@pytest.mark.asyncio
+async def test_engagement_checks_quota_before_generating(fake_llm):
+    llm = fake_llm(responses=["hey!", "hey again!"])
+    engagement = EngagementSystem(
+        PersonalityEngine(llm=llm),
+        rate_limiter=RateLimiter({"message": 1}),
+        work_queue=PriorityWorkQueue(),
+        analytics=EngagementAnalytics()
+    )
+    dm = {"type": "directMessage", "user_id": "fan-1", "message": "hi", "platform": "fansly"}
+
+    await engagement.process_interaction(dm)
+    with pytest.raises(RateLimitExceeded):
+        await engagement.process_interaction(dm)
+
+    assert llm.calls == 1
+    assert engagement.rate_limiter.stats()["quotas"]["fansly:message"]["used"] == 1
@@ -0,0 +1,30 @@
+import pytest
+from src.core import registry
+from src.core.personality import PersonalityEngine
+
+@pytest.fixture
+def shared_engine(fake_llm):
+    registry.reset()
+    engine = PersonalityEngine(llm=fake_llm())
+    registry.register("personality_engine", engine)
+    yield engine
+    registry.reset()
+
+def test_subsystems_share_one_personality_engine(shared_engine):
+    content_manager = registry.get_content_manager()
+    engagement_system = registry.get_engagement_system()
+
+    assert content_manager.personality is shared_engine
+    assert engagement_system.personality is shared_engine
+    assert registry.get_personality_engine() is shared_engine
+
+def test_registry_returns_same_instance(shared_engine):
+    assert registry.get_content_manager() is registry.get_content_manager()
+    assert registry.get_engagement_system() is registry.get_engagement_system()
+
+@pytest.mark.asyncio
+async def test_personality_update_is_seen_by_every_subsystem(shared_engine):
+    await shared_engine.update_personality({"base_traits": {"age": "mid 30s"}})
+
+    assert registry.get_content_manager().personality.traits["age"] == "mid 30s"
+    assert registry.get_engagement_system().personality.traits["age"] == "mid 30s"
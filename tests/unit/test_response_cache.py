@@ -0,0 +1,93 @@
+import pytest
+from src.core.personality import PersonalityEngine
+from src.core.response_cache import ResponseCache
+from src.utils.config import load_config
+
+def test_normalize_collapses_trivial_variations():
+    assert ResponseCache.normalize("  Love your CONTENT!!! ") == "love your content"
+    assert ResponseCache.normalize("hiiiii") == ResponseCache.normalize("Hii!")
+    assert ResponseCache.normalize("🔥🔥🔥🔥") == "🔥🔥"
+
+def test_exact_hit_is_scoped_to_namespace_and_version():
+    cache = ResponseCache()
+    cache.put("comment:x:follower", 1, "Love your content!", "Thanks babe!")
+
+    assert cache.get("comment:x:follower", 1, "love your content") == "Thanks babe!"
+    assert cache.get("comment:x:follower", 2, "love your content") is None
+    assert cache.get("directMessage:x:follower", 1, "love your content") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.core.response_cache.time.monotonic", lambda: now[0])
+    cache = ResponseCache(ttl_seconds=60)
+    cache.put("comment", 1, "hi", "hey!")
+
+    now[0] += 61
+
+    assert cache.get("comment", 1, "hi") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["size"] == 0
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.put("comment", 1, "hi", "hey!")
+    cache.put("comment", 1, "hello", "howdy!")
+    cache.get("comment", 1, "hi")
+    cache.put("comment", 1, "yo", "sup!")
+
+    assert cache.get("comment", 1, "hi") == "hey!"
+    assert cache.get("comment", 1, "hello") is None
+    assert cache.stats()["evictions"] == 1
+
+def test_similarity_tier_matches_near_duplicates():
+    cache = ResponseCache(similarity_threshold=0.6)
+    cache.put("comment", 1, "love your content so much", "Love you more!")
+
+    assert cache.get("comment", 1, "love your content so so much") == "Love you more!"
+    assert cache.get("comment", 1, "what gun do you use") is None
+    assert cache.stats()["similar_hits"] == 1
+
+def test_similarity_tier_is_off_by_default():
+    cache = ResponseCache()
+    cache.put("comment", 1, "love your content so much", "Love you more!")
+
+    assert cache.get("comment", 1, "love your content so so much") is None
+
+def test_similarity_scan_checks_only_the_newest_candidates():
+    cache = ResponseCache(similarity_threshold=0.6, max_similarity_candidates=2)
+    cache.put("comment", 1, "love your content so much", "Love you more!")
+    cache.put("comment", 1, "what gun do you use", "A Glock!")
+    cache.put("comment", 1, "where are you from", "Texas!")
+
+    assert cache.get("comment", 1, "love your content so so much") is None
+    assert cache.get("comment", 1, "where are you from today") == "Texas!"
+
+def test_shipped_config_leaves_similarity_tier_off():
+    cache = ResponseCache.from_config(load_config()["system"]["response_cache"])
+
+    assert cache is None or cache.similarity_threshold is None
+
+@pytest.mark.asyncio
+async def test_engine_serves_repeated_messages_from_cache(fake_llm):
+    llm = fake_llm(responses=["first", "second"])
+    engine = PersonalityEngine(llm=llm, response_cache=ResponseCache())
+
+    first = await engine.generate_response("prompt 1", cache_namespace="comment", cache_text="hi!")
+    second = await engine.generate_response("prompt 2", cache_namespace="comment", cache_text="Hi")
+    uncached = await engine.generate_response("prompt 3")
+
+    assert first == second == "first"
+    assert uncached == "second"
+    assert (await engine.get_personality_stats())["response_cache"]["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_personality_update_invalidates_cached_responses(fake_llm):
+    llm = fake_llm(responses=["old personality", "new personality"])
+    engine = PersonalityEngine(llm=llm, response_cache=ResponseCache())
+
+    await engine.generate_response("hi", cache_namespace="comment")
+    await engine.update_personality({"base_traits": {"age": "mid 30s"}})
+
+    assert await engine.generate_response("hi", cache_namespace="comment") == "new personality"
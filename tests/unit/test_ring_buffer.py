@@ -0,0 +1,25 @@
+import pytest
+from src.utils.ring_buffer import RingBuffer
+
+def test_append_overwrites_the_oldest_item_once_full():
+    buffer = RingBuffer(3)
+
+    evicted = [buffer.append(n) for n in range(5)]
+
+    assert evicted == [None, None, None, 0, 1]
+    assert len(buffer) == 3
+    assert list(buffer) == [2, 3, 4]
+
+def test_newest_reads_pages_newest_first():
+    buffer = RingBuffer(4)
+    for n in range(6):
+        buffer.append(n)
+
+    assert buffer.newest(2) == [5, 4]
+    assert buffer.newest(2, offset=2) == [3, 2]
+    assert buffer.newest(10, offset=3) == [2]
+    assert buffer.newest(5, offset=4) == []
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        RingBuffer(0)
@@ -0,0 +1,104 @@
+import asyncio
+import time
+import pytest
+import pytest_asyncio
+from src.utils.job_queue import JobQueue
+from src.utils.scheduler import Scheduler
+
+async def wait_until(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+
+def make_scheduler(tmp_path, fired: list):
+    queue = JobQueue(path=str(tmp_path / "jobs.sqlite3"), workers=1, poll_interval=0.01)
+
+    async def publish(payload):
+        fired.append(payload["n"])
+    queue.register("publish", publish)
+    return queue, Scheduler(queue, path=str(tmp_path / "scheduler.sqlite3"))
+
+@pytest_asyncio.fixture
+async def scheduler_and_fired(tmp_path):
+    fired = []
+    queue, scheduler = make_scheduler(tmp_path, fired)
+    await queue.start()
+    await scheduler.start()
+    yield scheduler, fired
+    await scheduler.stop()
+    await queue.stop()
+
+@pytest.mark.asyncio
+async def test_items_fire_in_time_order(scheduler_and_fired):
+    scheduler, fired = scheduler_and_fired
+    now = time.time()
+
+    for n, delay in [(3, 0.15), (1, 0.05), (2, 0.1)]:
+        await scheduler.schedule("publish", {"n": n}, now + delay)
+    await wait_until(lambda: len(fired) == 3 and scheduler.stats()["dispatched"] == 3)
+
+    assert fired == [1, 2, 3]
+    assert scheduler.stats() == {"pending": 0, "dispatched": 3}
+
+@pytest.mark.asyncio
+async def test_items_do_not_fire_early(scheduler_and_fired):
+    scheduler, fired = scheduler_and_fired
+
+    item = await scheduler.schedule("publish", {"n": 1}, time.time() + 60)
+    await asyncio.sleep(0.1)
+
+    assert fired == []
+    assert (await scheduler.get(item["id"]))["status"] == "scheduled"
+
+@pytest.mark.asyncio
+async def test_cancelled_items_never_fire(scheduler_and_fired):
+    scheduler, fired = scheduler_and_fired
+
+    item = await scheduler.schedule("publish", {"n": 1}, time.time() + 0.05)
+    assert await scheduler.cancel(item["id"])
+    await scheduler.schedule("publish", {"n": 2}, time.time() + 0.1)
+    await wait_until(lambda: fired)
+    await asyncio.sleep(0.05)
+
+    assert fired == [2]
+    assert not await scheduler.cancel(item["id"])
+
+@pytest.mark.asyncio
+async def test_schedule_survives_restart(tmp_path):
+    fired = []
+    queue, scheduler = make_scheduler(tmp_path, fired)
+    await scheduler.schedule("publish", {"n": 1}, time.time() + 0.05)
+    await scheduler.schedule("publish", {"n": 2}, time.time() + 0.3)
+    await scheduler.stop()
+    # Down while the first item came due
+    await asyncio.sleep(0.1)
+
+    queue, scheduler = make_scheduler(tmp_path, fired)
+    await queue.start()
+    await scheduler.start()
+    await wait_until(lambda: len(fired) == 2)
+    await scheduler.stop()
+    await queue.stop()
+
+    assert fired == [1, 2]
+
+@pytest.mark.asyncio
+async def test_list_upcoming_pages_in_time_order(scheduler_and_fired):
+    scheduler, _ = scheduler_and_fired
+    now = time.time()
+    for n in range(5):
+        await scheduler.schedule("publish", {"n": n}, now + 3600 - n)
+
+    first = await scheduler.list_upcoming(limit=3)
+    second = await scheduler.list_upcoming(limit=3, cursor=first["next_cursor"])
+
+    assert [item["payload"]["n"] for item in first["items"]] == [4, 3, 2]
+    assert [item["payload"]["n"] for item in second["items"]] == [1, 0]
+    assert second["next_cursor"] is None
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_rejected(scheduler_and_fired):
+    scheduler, _ = scheduler_and_fired
+
+    with pytest.raises(ValueError):
+        await scheduler.list_upcoming(cursor="not-a-cursor")
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import pytest
+from typing import List
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from src.api.streaming import sse_response
+from src.core.conversation_memory import ConversationMemoryStore
+from src.core.personality import PersonalityEngine
+
+WORDS = ["hey ", "there ", "cutie"]
+# One token per word, so each word takes 1 / WORDS_PER_SECOND to stream
+WORDS_PER_SECOND = 100
+
+def _parse_events(body: str) -> List[tuple]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+@pytest.mark.asyncio
+async def test_stream_response_yields_chunks_and_records_exchange(fake_llm):
+    llm = fake_llm(response="".join(WORDS), tokens_per_second=WORDS_PER_SECOND)
+    engine = PersonalityEngine(llm=llm, memory_store=ConversationMemoryStore())
+
+    chunks = [chunk async for chunk in engine.stream_response("hi", context={"user_id": "fan_1"})]
+
+    assert chunks == WORDS
+    memory = await engine.memory_store.get("fan_1")
+    assert memory.turns[0].response == "hey there cutie"
+    assert engine.telemetry.stats()["default"]["calls"] == 1
+
+@pytest.mark.asyncio
+async def test_closing_stream_cancels_upstream_call(fake_llm):
+    llm = fake_llm(response="".join(WORDS), tokens_per_second=20)
+    engine = PersonalityEngine(llm=llm, max_concurrency=1, memory_store=ConversationMemoryStore())
+
+    stream = engine.stream_response("hi", context={"user_id": "fan_1"})
+    assert await stream.__anext__() == WORDS[0]
+    await stream.aclose()
+    # LangChain lets the in-flight read finish before closing the model stream
+    await asyncio.sleep(0.1)
+
+    assert llm.closed_early
+    assert llm.chunks_sent == 1
+    assert engine.memory_store.stats()["turns"] == 0
+    # The LLM slot was released
+    assert await engine.generate_response("hello again") == "hey there cutie"
+
+def test_sse_response_sends_tokens_then_done(fake_llm):
+    engine = PersonalityEngine(llm=fake_llm(response="".join(WORDS), tokens_per_second=WORDS_PER_SECOND))
+    app = FastAPI()
+
+    @app.post("/generate")
+    async def generate(request: Request):
+        return sse_response(request, engine.stream_response("hi"))
+
+    response = TestClient(app).post("/generate")
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_events(response.text)
+    assert [data["text"] for event, data in events if event == "token"] == WORDS
+    assert events[-1] == ("done", {"success": True, "response": "hey there cutie"})
+
+def test_sse_response_reports_errors_as_events():
+    async def failing_chunks():
+        yield "partial "
+        raise RuntimeError("upstream failed")
+
+    app = FastAPI()
+
+    @app.post("/generate")
+    async def generate(request: Request):
+        return sse_response(request, failing_chunks())
+
+    events = _parse_events(TestClient(app).post("/generate").text)
+
+    assert events[0] == ("token", {"text": "partial "})
+    assert events[-1] == ("error", {"success": False, "message": "upstream failed"})
@@ -0,0 +1,46 @@
+import hashlib
+import hmac
+from src.api.webhook_signing import WebhookVerifier, configured_secrets
+
+BODY = b'{"type": "message", "user_id": "fan-1"}'
+
+def sign(secret: str, body: bytes = BODY) -> str:
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+def test_accepts_a_valid_signature_and_rejects_others():
+    verifier = WebhookVerifier(["current"])
+
+    assert verifier.verify(BODY, sign("current"))
+    assert not verifier.verify(BODY, sign("someone-else"))
+    assert not verifier.verify(BODY + b" ", sign("current"))
+    assert not verifier.verify(BODY, "not-hex")
+
+def test_any_active_secret_is_accepted_during_rotation():
+    verifier = WebhookVerifier(["new", "old"])
+
+    assert verifier.verify(BODY, sign("new"))
+    assert verifier.verify(BODY, sign("old"))
+
+    verifier.set_secrets(["new"])
+    assert not verifier.verify(BODY, sign("old"))
+
+def test_no_secrets_rejects_everything():
+    verifier = WebhookVerifier()
+
+    assert not verifier.has_secrets
+    assert not verifier.verify(BODY, sign(""))
+
+def test_secrets_come_from_env_and_config(monkeypatch):
+    monkeypatch.setenv("FANSLY_WEBHOOK_SECRET", "env-new, env-old")
+    config = {"system": {"fansly": {"webhook_secrets": ["cfg", "env-old"]}}}
+
+    assert configured_secrets(config) == ["env-new", "env-old", "cfg"]
+
+def test_config_reload_swaps_the_keys(monkeypatch):
+    monkeypatch.delenv("FANSLY_WEBHOOK_SECRET", raising=False)
+    verifier = WebhookVerifier(["old"])
+
+    verifier._on_config_reload({"system": {"fansly": {"webhook_secret": "new"}}})
+
+    assert verifier.verify(BODY, sign("new"))
+    assert not verifier.verify(BODY, sign("old"))
@@ -0,0 +1,186 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+import httpx
+import pytest
+import pytest_asyncio
+from typing import Optional
+from fastapi import FastAPI
+from src.api.webhook_handlers import WEBHOOK_JOB_KIND, router, run_fansly_event_job
+from src.api.webhook_signing import WebhookVerifier
+from src.core import registry
+from src.core.personality import PersonalityEngine
+from src.utils.idempotency import IdempotencyStore
+from src.utils.job_queue import JobQueue
+from src.utils.rate_limiter import RateLimiter
+
+SECRET = "test-secret"
+LLM_LATENCY = 0.3
+
+class FakeFanslyClient:
+    def __init__(self):
+        self.sent = []
+
+    async def send_dm(self, user_id: str, message: str) -> dict:
+        self.sent.append((user_id, message))
+        return {"status": "success"}
+
+def sign(body: bytes) -> str:
+    return hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+
+@pytest_asyncio.fixture
+async def webhook_env(tmp_path, fake_llm):
+    registry.reset()
+    llm = fake_llm(latency=LLM_LATENCY, response="thanks hun")
+    fansly = FakeFanslyClient()
+    queue = JobQueue(path=str(tmp_path / "jobs.sqlite3"), workers=2, poll_interval=0.02)
+    queue.register(WEBHOOK_JOB_KIND, run_fansly_event_job)
+    registry.register("personality_engine", PersonalityEngine(llm=llm))
+    registry.register("fansly_client", fansly)
+    registry.register("job_queue", queue)
+    registry.register("webhook_verifier", WebhookVerifier([SECRET]))
+    registry.register("webhook_dedup", IdempotencyStore(path=str(tmp_path / "seen.sqlite3")))
+    await queue.start()
+
+    app = FastAPI()
+    app.include_router(router)
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    yield client, queue, llm, fansly
+    await client.aclose()
+    await queue.stop()
+    await registry.get_webhook_dedup().close()
+    registry.reset()
+
+async def post_event(client: httpx.AsyncClient, event: dict, signature: Optional[str] = None) -> httpx.Response:
+    body = json.dumps(event).encode()
+    headers = {"X-Fansly-Signature": signature or sign(body), "Content-Type": "application/json"}
+    return await client.post("/webhook/fansly", content=body, headers=headers)
+
+async def wait_for_job(queue: JobQueue, job_id: str, timeout: float = 3.0) -> dict:
+    deadline = time.monotonic() + timeout
+    job = await queue.get(job_id)
+    while job["status"] not in ("succeeded", "failed") and time.monotonic() < deadline:
+        await asyncio.sleep(0.02)
+        job = await queue.get(job_id)
+    return job
+
+@pytest.mark.asyncio
+async def test_webhook_is_acknowledged_before_the_reply_is_generated(webhook_env):
+    client, queue, llm, fansly = webhook_env
+
+    start = time.perf_counter()
+    response = await post_event(client, {"type": "message", "user_id": "fan-1", "message": "hi!"})
+    elapsed = time.perf_counter() - start
+
+    assert response.status_code == 202
+    assert elapsed < LLM_LATENCY
+    assert fansly.sent == []
+
+    job = await wait_for_job(queue, response.json()["job_id"])
+    assert job["status"] == "succeeded"
+    assert fansly.sent == [("fan-1", "thanks hun")]
+    # The reply is generated once, not again when the interaction is recorded
+    assert llm.calls == 1
+
+@pytest.mark.asyncio
+async def test_failed_bookkeeping_does_not_resend_the_reply(webhook_env, monkeypatch):
+    client, queue, llm, fansly = webhook_env
+
+    async def database_down(record: dict) -> None:
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(registry.get_engagement_system(), "record_interaction", database_down)
+
+    response = await post_event(client, {"type": "message", "event_id": "evt-1", "user_id": "fan-1", "message": "hi!"})
+    job = await wait_for_job(queue, response.json()["job_id"])
+
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 1
+    assert len(fansly.sent) == 1
+    assert llm.calls == 1
+
+@pytest.mark.asyncio
+async def test_bad_signature_is_rejected_without_queueing(webhook_env):
+    client, queue, _, _ = webhook_env
+
+    response = await post_event(client, {"type": "message", "user_id": "fan-1"}, signature="forged")
+
+    assert response.status_code == 401
+    assert await queue.list_jobs() == []
+
+@pytest.mark.asyncio
+async def test_unsupported_event_is_ignored(webhook_env):
+    client, queue, _, _ = webhook_env
+
+    response = await post_event(client, {"type": "poke", "user_id": "fan-1"})
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "ignored"
+    assert await queue.list_jobs() == []
+
+@pytest.mark.asyncio
+async def test_messages_from_one_fan_are_answered_in_order(webhook_env):
+    client, queue, _, fansly = webhook_env
+
+    job_ids = []
+    for n in range(3):
+        event = {"type": "message", "event_id": f"evt-{n}", "user_id": "fan-1", "message": f"msg {n}"}
+        response = await post_event(client, event)
+        job_ids.append(response.json()["job_id"])
+    for job_id in job_ids:
+        await wait_for_job(queue, job_id)
+
+    jobs = [await queue.get(job_id) for job_id in job_ids]
+    assert all(job["ordering_key"] == "fansly:fan-1" for job in jobs)
+    finished = [job["updated_at"] for job in jobs]
+    # Each reply waits for the previous one even though two workers are free
+    assert all(later - earlier >= LLM_LATENCY * 0.9 for earlier, later in zip(finished, finished[1:]))
+    assert len(fansly.sent) == 3
+
+@pytest.mark.asyncio
+async def test_redelivered_event_is_dropped_before_generation(webhook_env):
+    client, queue, llm, fansly = webhook_env
+    event = {"type": "message", "event_id": "evt-1", "user_id": "fan-1", "message": "hi!"}
+
+    first = await post_event(client, event)
+    retry = await post_event(client, event)
+    await wait_for_job(queue, first.json()["job_id"])
+
+    assert first.status_code == 202
+    assert retry.status_code == 200
+    assert retry.json()["status"] == "duplicate"
+    assert len(await queue.list_jobs()) == 1
+    assert llm.calls == 1
+    assert len(fansly.sent) == 1
+    assert registry.get_webhook_dedup().stats()["duplicates_dropped"] == 1
+
+@pytest.mark.asyncio
+async def test_malformed_body_is_rejected(webhook_env):
+    client, queue, _, _ = webhook_env
+    body = b"not json"
+
+    response = await client.post("/webhook/fansly", content=body, headers={"X-Fansly-Signature": sign(body)})
+
+    assert response.status_code == 400
+    assert await queue.list_jobs() == []
+
+@pytest.mark.asyncio
+async def test_event_over_the_reply_quota_waits_in_the_queue(webhook_env):
+    client, queue, llm, fansly = webhook_env
+    registry.register("rate_limiter", RateLimiter({"message": 1}, window=0.5))
+
+    first = await post_event(client, {"type": "message", "event_id": "evt-1", "user_id": "fan-1", "message": "hi"})
+    second = await post_event(client, {"type": "tip", "event_id": "evt-2", "user_id": "fan-2", "amount": 5})
+    await wait_for_job(queue, first.json()["job_id"])
+    await asyncio.sleep(0.1)
+
+    deferred = await queue.get(second.json()["job_id"])
+    assert deferred["status"] == "queued"
+    assert "limit reached" in deferred["error"]
+    assert llm.calls == 1
+
+    assert (await wait_for_job(queue, second.json()["job_id"]))["status"] == "succeeded"
+    assert llm.calls == 2
+    assert [user for user, _ in fansly.sent] == ["fan-1", "fan-2"]
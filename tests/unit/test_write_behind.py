@@ -0,0 +1,112 @@
+import asyncio
+import json
+import pytest
+from src.utils.write_behind import WriteBehindBuffer
+
+class RecordingFlush:
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.batches = []
+        self.delay = delay
+        self.fail = fail
+
+    async def __call__(self, collection_key, documents):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("mongo is down")
+        self.batches.append((collection_key, list(documents)))
+
+@pytest.mark.asyncio
+async def test_flushes_when_batch_size_reached():
+    flush = RecordingFlush()
+    buffer = WriteBehindBuffer(flush, batch_size=3, flush_interval=60)
+
+    for i in range(6):
+        await buffer.add("user_interactions", {"n": i})
+    await buffer.flush()
+
+    assert [len(docs) for _, docs in flush.batches] == [3, 3]
+    await buffer.stop()
+
+@pytest.mark.asyncio
+async def test_flushes_after_interval():
+    flush = RecordingFlush()
+    buffer = WriteBehindBuffer(flush, batch_size=100, flush_interval=0.05)
+
+    await buffer.add("metrics", {"likes": 1})
+    await asyncio.sleep(0.15)
+
+    assert flush.batches == [("metrics", [{"likes": 1}])]
+    await buffer.stop()
+
+@pytest.mark.asyncio
+async def test_batches_are_split_per_collection():
+    flush = RecordingFlush()
+    buffer = WriteBehindBuffer(flush, batch_size=4, flush_interval=60)
+
+    for key in ["metrics", "user_interactions", "metrics", "user_interactions"]:
+        await buffer.add(key, {"key": key})
+    await buffer.flush()
+
+    assert sorted((key, len(docs)) for key, docs in flush.batches) == [("metrics", 2), ("user_interactions", 2)]
+    await buffer.stop()
+
+@pytest.mark.asyncio
+async def test_full_buffer_applies_backpressure():
+    flush = RecordingFlush(delay=0.1)
+    buffer = WriteBehindBuffer(flush, batch_size=1, flush_interval=60, max_pending=2)
+
+    # One document is being written, two more fill the queue
+    for i in range(3):
+        await buffer.add("metrics", {"n": i})
+    blocked = asyncio.create_task(buffer.add("metrics", {"n": 3}))
+    await asyncio.sleep(0.02)
+
+    assert not blocked.done()
+    await blocked
+    await buffer.stop()
+    assert len(flush.batches) == 4
+
+@pytest.mark.asyncio
+async def test_stop_flushes_pending_documents():
+    flush = RecordingFlush()
+    buffer = WriteBehindBuffer(flush, batch_size=100, flush_interval=60)
+
+    for i in range(5):
+        await buffer.add("metrics", {"n": i})
+    await buffer.stop()
+
+    assert sum(len(docs) for _, docs in flush.batches) == 5
+    assert not buffer.running
+
+@pytest.mark.asyncio
+async def test_failed_batches_go_to_dead_letter_file(tmp_path):
+    dead_letter = tmp_path / "dead_letter.jsonl"
+    buffer = WriteBehindBuffer(RecordingFlush(fail=True), batch_size=2, flush_interval=60,
+                               dead_letter_path=str(dead_letter))
+
+    await buffer.add("metrics", {"n": 1})
+    await buffer.add("metrics", {"n": 2})
+    await buffer.stop()
+
+    records = [json.loads(line) for line in dead_letter.read_text().splitlines()]
+    assert records[0]["collection"] == "metrics"
+    assert records[0]["documents"] == [{"n": 1}, {"n": 2}]
+    assert buffer.stats()["failed_documents"] == 2
+
+@pytest.mark.asyncio
+async def test_database_manager_batches_interactions_with_insert_many(async_db):
+    manager = async_db.manager
+    async_db.write_behind = WriteBehindBuffer(
+        lambda key, docs: async_db._run('insert_many', key, docs),
+        batch_size=10,
+        flush_interval=60
+    )
+
+    ids = [await async_db.store_interaction({"user_id": f"fan_{i}"}) for i in range(10)]
+    await async_db.flush()
+
+    collection = manager.db[manager.config['collections']['user_interactions']]
+    assert collection.count_documents({}) == 10
+    assert {str(doc["_id"]) for doc in collection.find()} == set(ids)
+    assert async_db.write_behind.stats()["flushed_batches"] == 1
+    await async_db.close()